@@ -1,5 +1,7 @@
 from pathlib import Path
+from urllib.parse import urlsplit
 from decouple import config, Csv
+from django.core.exceptions import ImproperlyConfigured
 import dj_database_url
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -54,6 +56,17 @@ TEMPLATES = [
     },
 ]
 
+if not DEBUG:
+    # Parse each template once per process. Django already does this by default;
+    # spelled out so adding a loader later cannot silently turn caching off.
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'E-Commerce.wsgi.application'
 
 # Database: PostgreSQL (local)
@@ -87,6 +100,31 @@ else:
     }
 }
 
+# Cache shared by all workers. CACHE_URL picks the backend:
+#   locmem://                    per process (default; lost on restart, not shared between workers)
+#   file:///var/tmp/invoxia-cache  a directory every worker on this host can write
+#   redis://127.0.0.1:6379/1     Redis or any server speaking its protocol (`manage.py fake_redis_server` locally)
+# Keys of one store are prefixed with its owner (store.caching.tenant_key), so stores never share entries.
+CACHE_URL = config('CACHE_URL', default='locmem://')
+_cache_url = urlsplit(CACHE_URL)
+if _cache_url.scheme in ('redis', 'rediss', 'unix'):
+    _cache_backend, _cache_location = 'store.caching.RedisCache', CACHE_URL
+elif _cache_url.scheme == 'file':
+    _cache_backend, _cache_location = 'store.caching.FileBasedCache', _cache_url.path
+elif _cache_url.scheme == 'locmem':
+    _cache_backend, _cache_location = 'store.caching.LocMemCache', _cache_url.netloc or 'invoxia'
+else:
+    raise ImproperlyConfigured(f'Unsupported CACHE_URL scheme: {CACHE_URL!r}')
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': _cache_location,
+        'KEY_PREFIX': config('CACHE_KEY_PREFIX', default='invoxia'),
+        'KEY_FUNCTION': 'store.caching.make_key',
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+    },
+}
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
@@ -139,4 +177,28 @@ SESSION_SAVE_EVERY_REQUEST = True
 # Login/Logout URLs
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/'
-LOGOUT_REDIRECT_URL = '/'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = '/'
+
+# Storefront catalogue (store/catalog.py): products per page and lifetime of cached pages
+STORE_CATALOG_PAGE_SIZE = config('STORE_CATALOG_PAGE_SIZE', default=48, cast=int)
+STORE_CATALOG_CACHE_TIMEOUT = config('STORE_CATALOG_CACHE_TIMEOUT', default=600, cast=int)
+# In-process storefront cache (store/storefront_cache.py): memory cap across all stores, and the
+# longest a process may serve product data another process changed when CACHES is not shared
+STORE_TENANT_CACHE_MAX_BYTES = config('STORE_TENANT_CACHE_MAX_BYTES', default=32 * 1024 * 1024, cast=int)
+STORE_TENANT_CACHE_TTL = config('STORE_TENANT_CACHE_TTL', default=60, cast=int)
+# Product / customer search (store/search.py): 'auto' uses the database's index, 'icontains' forces the plain filter
+STORE_SEARCH_BACKEND = config('STORE_SEARCH_BACKEND', default='auto')
+
+# Invoice PDF rendering (store/pdf_renderer.py)
+# Chromium browsers kept warm in this process; also the concurrency limit per process
+INVOICE_PDF_BROWSERS = config('INVOICE_PDF_BROWSERS', default=2, cast=int)
+# Pages rendered on one browser context before it is recycled
+INVOICE_PDF_CONTEXT_MAX_PAGES = config('INVOICE_PDF_CONTEXT_MAX_PAGES', default=200, cast=int)
+INVOICE_PDF_TIMEOUT = config('INVOICE_PDF_TIMEOUT', default=30, cast=int)
+# host:port of a `manage.py invoice_pdf_server` worker; empty renders in-process
+INVOICE_PDF_SERVER = config('INVOICE_PDF_SERVER', default='')
+# Queue PDF downloads for `manage.py run_invoice_jobs` instead of rendering in the request
+INVOICE_PDF_ASYNC = config('INVOICE_PDF_ASYNC', default=False, cast=bool)
+INVOICE_PDF_JOB_MAX_ATTEMPTS = config('INVOICE_PDF_JOB_MAX_ATTEMPTS', default=3, cast=int)
+# A running job not finished after this long is assumed orphaned (worker killed) and re-queued
+INVOICE_PDF_JOB_STALE_SECONDS = config('INVOICE_PDF_JOB_STALE_SECONDS', default=300, cast=int)
@@ -0,0 +1,29 @@
+"""
+Settings for the test suite:
+
+    python manage.py test --settings=E-Commerce.test_settings
+
+The repository ships no migrations (each install runs makemigrations), so the
+test database is created straight from the models. The tests always run on
+SQLite with a per-process cache; the secrets settings.py reads from .env fall
+back to throwaway values.
+"""
+import os
+
+os.environ['DB_SQLITE'] = 'True'
+for _name in ('SECRET_KEY', 'EMAIL_HOST_USER', 'EMAIL_HOST_PASSWORD'):
+    os.environ.setdefault(_name, 'test')
+
+from .settings import *  # noqa: E402,F401,F403
+
+MIGRATION_MODULES = {app: None for app in ('accounts', 'core', 'store')}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'store.caching.LocMemCache',
+        'LOCATION': 'tests',
+        'KEY_FUNCTION': 'store.caching.make_key',
+    },
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
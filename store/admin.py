@@ -0,0 +1,53 @@
+from django.contrib import admin, messages
+
+from .models import InvoicePdfJob, Order, StockMovement
+from .order_numbers import resequence_orders
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ('invoice_number', 'order_number', 'store_owner', 'customer', 'order_date', 'total_price', 'is_deleted')
+    list_filter = ('is_deleted', 'status')
+    search_fields = ('invoice_number', 'store_owner__username', 'customer__name')
+    actions = ['resequence_owner_orders']
+
+    @admin.action(description="Resequence order numbers of the selected orders' store owners")
+    def resequence_owner_orders(self, request, queryset):
+        owners = {order.store_owner for order in queryset.select_related('store_owner')}
+        changed = sum(len(resequence_orders(owner)) for owner in owners)
+        self.message_user(
+            request,
+            f'Renumbered {changed} orders for {len(owners)} store owner(s).',
+            messages.SUCCESS,
+        )
+
+
+@admin.register(InvoicePdfJob)
+class InvoicePdfJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'store_owner', 'order', 'status', 'attempts', 'worker', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('store_owner__username', 'order__invoice_number')
+    actions = ['requeue_jobs']
+
+    @admin.action(description='Re-queue the selected PDF jobs')
+    def requeue_jobs(self, request, queryset):
+        count = queryset.update(status=InvoicePdfJob.STATUS_PENDING, attempts=0, error='', started_at=None)
+        self.message_user(request, f'Re-queued {count} PDF job(s).', messages.SUCCESS)
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    """The ledger is append-only; fix it with rebuild_stock_ledger, not by hand."""
+    list_display = ('product', 'moved_on', 'kind', 'quantity', 'balance', 'order', 'store_owner')
+    list_filter = ('kind',)
+    search_fields = ('product__name', 'store_owner__username', 'order__invoice_number')
+    date_hierarchy = 'moved_on'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
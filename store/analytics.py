@@ -1,39 +1,128 @@
 # store/analytics.py - Final Complete File
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
-from django.db.models import Sum, Count
+from django.db.models import Sum, Count, Max, OuterRef, Subquery, DecimalField
+from django.db.models.functions import Coalesce
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 import traceback
 import datetime
 import calendar
-import csv
+from collections import defaultdict
 from decimal import Decimal
-from .models import Product, SalesReport, OrderItem
+from .models import Product, SalesReport, OrderItem, MonthlySalesRollup
+from .csv_export import stream_csv_response, order_by_tax_table, iter_tax_table_rows
+from .tax import extract_tax, in_batches, split_gst
+from .money import Money
 from accounts.models import CustomUser
 
 
-def _tax_amount_from_total(total_with_tax, rate_percent) -> Decimal:
-    """Extract tax component from a tax-inclusive total: total - total/(1+rate)."""
-    total_with_tax = total_with_tax or Decimal('0.00')
-    rate = Decimal(str(rate_percent or 0)) / Decimal('100')
-    divisor = Decimal('1') + rate
-    if divisor <= 1:
-        return Decimal('0.00')
-    return total_with_tax - (total_with_tax / divisor)
+def _product_sales_stats(store_owner):
+    """
+    Per-product sales figures for one store owner in one grouped query.
+    Returns {product_id: {'total_sold', 'total_orders', 'last_sale_date'}};
+    products without sales are absent (see _empty_sales_stats).
+    """
+    sales_rows = SalesReport.objects.filter(
+        store_owner=store_owner,
+        is_deleted=False,
+    ).values('product').annotate(
+        total_sold=Sum('quantity'),
+        total_orders=Count('order', distinct=True),
+        last_sale_date=Max('sale_date'),
+    )
+    return {
+        row['product']: {
+            'total_sold': row['total_sold'] or 0,
+            'total_orders': row['total_orders'] or 0,
+            'last_sale_date': row['last_sale_date'],
+        }
+        for row in sales_rows
+    }
+
+
+def _empty_sales_stats():
+    return {
+        'total_sold': 0,
+        'total_orders': 0,
+        'last_sale_date': None,
+    }
 
 
-def _month_sales_totals(store_owner, product, year, month):
-    qs = SalesReport.objects.filter(
+def _order_line_totals(store_owner, product=None):
+    """
+    Tax-inclusive totals of the store owner's live order lines (of one product,
+    if given), as {product_id: [(total_price, number of lines), ...]}. Lines with
+    the same amount are counted together; each splits into the same tax.
+    """
+    lines = OrderItem.objects.filter(order__store_owner=store_owner, order__is_deleted=False)
+    if product is not None:
+        lines = lines.filter(product=product)
+    line_totals = defaultdict(list)
+    for product_id, total_price, count in lines.values('product', 'total_price').annotate(
+        lines=Count('id'),
+    ).values_list('product', 'total_price', 'lines').order_by('product', 'total_price'):
+        line_totals[product_id].append((total_price, count))
+    return line_totals
+
+
+def _tax_breakdowns(products, line_totals):
+    """
+    Tax in each product's order lines from _order_line_totals(), split line by
+    line at the product's rate as on invoices and at checkout, then summed per
+    product; one store.tax batch for all products. Amounts are Money, so
+    summaries add int paise and float() for JSON is a single division.
+    """
+    owners, counts, amounts, gst_rates, igst_rates = [], [], [], [], []
+    for index, p in enumerate(products):
+        for total_price, count in line_totals.get(p.id, ()):
+            owners.append(index)
+            counts.append(count)
+            amounts.append(total_price)
+            gst_rates.append(p.gst)
+            igst_rates.append(p.igst)
+    taxes = extract_tax(amounts, gst_rates, igst_rates)
+
+    names = ('cgst', 'sgst', 'gst', 'igst', 'without_tax', 'with_tax')
+    columns = [taxes.money(name) for name in ('cgst', 'sgst', 'gst', 'igst', 'taxable', 'total')]
+    paise = [[0] * len(names) for _ in products]
+    for row, (index, count) in enumerate(zip(owners, counts)):
+        sums = paise[index]
+        for column, values in enumerate(columns):
+            sums[column] += values[row].paise * count
+    return [{name: Money(amount) for name, amount in zip(names, sums)} for sums in paise]
+
+
+def _ad_month_products(store_owner, year, month):
+    """
+    Store owner's products annotated with the month's sales in a single query:
+    month_sold_qty and month_sales_amt (tax inclusive). Shared by the AD page,
+    API and CSV export.
+    """
+    month_rollup = MonthlySalesRollup.objects.filter(
         store_owner=store_owner,
-        product=product,
-        order__is_deleted=False,
-        sale_date__year=year,
-        sale_date__month=month,
+        product=OuterRef('pk'),
+        year=year,
+        month=month,
     )
-    sold_qty = qs.aggregate(total=Sum('quantity'))['total'] or 0
-    sales_total = qs.aggregate(total=Sum('total_price'))['total'] or Decimal('0.00')
-    return int(sold_qty), sales_total
+    return Product.objects.filter(store_owner=store_owner).order_by('pk').annotate(
+        month_sold_qty=Coalesce(Subquery(month_rollup.values('quantity_sold')[:1]), 0),
+        month_sales_amt=Coalesce(
+            Subquery(month_rollup.values('total_amount')[:1]),
+            Decimal('0.00'),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        ),
+    )
+
+
+def _ad_month_taxes(products):
+    """store.tax split of the month's tax-inclusive sales for _ad_month_products() rows."""
+    return extract_tax(
+        [p.month_sales_amt for p in products],
+        [p.gst for p in products],
+        [p.igst for p in products],
+    )
+
 
 def _product_purchase_export_fields(product):
     return {
@@ -74,7 +163,7 @@ def user_item_analytics_api(request, username):
         
         print(f"User-specific analytics request for: {store_owner.username}")
         
-        products = Product.objects.filter(store_owner=store_owner)
+        products = Product.objects.filter(store_owner=store_owner).order_by('pk')
         
         if not products.exists():
             return JsonResponse({
@@ -92,78 +181,31 @@ def user_item_analytics_api(request, username):
             })
         
         analytics_data = []
-        
-        for product in products:
-            # Calculate sold quantity from SalesReport for THIS store owner only
-            sales_data = SalesReport.objects.filter(
-                store_owner=store_owner,
-                product=product,
-                order__is_deleted=False
-            ).aggregate(
-                total_sold=Sum('quantity'),
-                total_revenue=Sum('total_price'),
-                total_orders=Count('order', distinct=True)
-            )
-            
-            total_sold = sales_data['total_sold'] or 0
-            total_revenue = sales_data['total_revenue'] or Decimal('0.00')
-            total_orders = sales_data['total_orders'] or 0
-            
-            # Get detailed order items for THIS store owner only
-            order_items = OrderItem.objects.filter(
-                order__store_owner=store_owner,
-                order__is_deleted=False,
-                product=product
-            )
-            
-            # Calculate tax breakdown
-            total_revenue_with_tax = Decimal('0.00')
-            total_revenue_without_tax = Decimal('0.00')
-            total_gst_amount = Decimal('0.00')
-            total_cgst_amount = Decimal('0.00')
-            total_sgst_amount = Decimal('0.00')
-            total_igst_amount = Decimal('0.00')
-            
-            uses_igst = product.igst is not None and product.igst > 0
-
-            for item in order_items:
-                item_total_with_tax = item.total_price
-                if uses_igst:
-                    item_igst = _tax_amount_from_total(item_total_with_tax, product.igst)
-                    item_subtotal = item_total_with_tax - item_igst
-                    item_cgst = Decimal('0.00')
-                    item_sgst = Decimal('0.00')
-                    item_gst_amount = Decimal('0.00')
-                    total_igst_amount += item_igst
-                else:
-                    item_gst_amount = _tax_amount_from_total(item_total_with_tax, product.gst)
-                    item_subtotal = item_total_with_tax - item_gst_amount
-                    item_cgst = item_gst_amount / Decimal('2')
-                    item_sgst = item_gst_amount / Decimal('2')
-                    item_igst = Decimal('0.00')
-                    total_gst_amount += item_gst_amount
-                    total_cgst_amount += item_cgst
-                    total_sgst_amount += item_sgst
-                
-                total_revenue_without_tax += item_subtotal
-                total_revenue_with_tax += item_total_with_tax
-            
+        sales_stats = _product_sales_stats(store_owner)
+        products = list(products)
+        # Tax breakdown of the tax-inclusive revenue (rate is fixed per product)
+        tax_breakdowns = _tax_breakdowns(products, _order_line_totals(store_owner))
+
+        for product, tax in zip(products, tax_breakdowns):
+            stats = sales_stats.get(product.id) or _empty_sales_stats()
+            total_orders = stats['total_orders']
+
+            total_revenue_with_tax = tax['with_tax']
+            total_revenue_without_tax = tax['without_tax']
+            total_gst_amount = tax['gst']
+            total_cgst_amount = tax['cgst']
+            total_sgst_amount = tax['sgst']
+            total_igst_amount = tax['igst']
+
             # Calculate stock information
-            sold_quantity = total_sold
+            sold_quantity = stats['total_sold']
             current_stock = product.quantity
             total_stock = sold_quantity + current_stock
-            
-            # Get last sale date
-            last_sale = SalesReport.objects.filter(
-                store_owner=store_owner,
-                product=product,
-                order__is_deleted=False
-            ).order_by('-sale_date').first()
-            
+
             last_sale_date = None
-            if last_sale:
-                last_sale_date = last_sale.sale_date.isoformat()
-            
+            if stats['last_sale_date']:
+                last_sale_date = stats['last_sale_date'].isoformat()
+
             # Build item analytics
             item_data = {
                 'product_id': product.id,
@@ -186,7 +228,7 @@ def user_item_analytics_api(request, username):
                 'total_igst_collected': float(total_igst_amount),
                 'total_revenue_with_gst': float(total_revenue_with_tax),
                 'total_orders': total_orders,
-                'revenue_per_unit': float(total_revenue_with_tax / sold_quantity) if sold_quantity > 0 else 0,
+                'revenue_per_unit': float(total_revenue_with_tax.decimal / sold_quantity) if sold_quantity > 0 else 0,
                 'is_fast_moving': sold_quantity > (total_stock * 0.7) if total_stock > 0 else False,
                 'stock_status': 'Out of Stock' if current_stock == 0 else (
                     'Low Stock' if current_stock < 10 else 'In Stock'
@@ -201,10 +243,10 @@ def user_item_analytics_api(request, username):
         # Sort by total revenue (descending)
         analytics_data.sort(key=lambda x: x['total_revenue_with_gst'], reverse=True)
         
-        # Calculate summary statistics
+        # Calculate summary statistics (exact paise sums, not sums of the floats)
         total_products = len(analytics_data)
-        total_revenue_all = sum(item['total_revenue_with_gst'] for item in analytics_data)
-        total_gst_all = sum(item['total_gst_collected'] for item in analytics_data)
+        total_revenue_all = float(Money.sum(tax['with_tax'] for tax in tax_breakdowns))
+        total_gst_all = float(Money.sum(tax['gst'] for tax in tax_breakdowns))
         total_items_sold = sum(item['sold_quantity'] for item in analytics_data)
         total_items_in_stock = sum(item['current_stock'] for item in analytics_data)
         
@@ -256,7 +298,7 @@ def user_single_item_analytics_api(request, username, product_id):
         sales_data = SalesReport.objects.filter(
             store_owner=store_owner,
             product=product,
-            order__is_deleted=False
+            is_deleted=False
         ).aggregate(
             total_sold=Sum('quantity'),
             total_orders=Count('order', distinct=True)
@@ -265,49 +307,20 @@ def user_single_item_analytics_api(request, username, product_id):
         total_sold = sales_data['total_sold'] or 0
         total_orders = sales_data['total_orders'] or 0
         
-        # Get order items for GST calculations
-        order_items = OrderItem.objects.filter(
-            order__store_owner=store_owner,
-            order__is_deleted=False,
-            product=product
-        )
-        
-        total_revenue_with_tax = Decimal('0.00')
-        total_revenue_without_tax = Decimal('0.00')
-        total_gst_amount = Decimal('0.00')
-        total_cgst_amount = Decimal('0.00')
-        total_sgst_amount = Decimal('0.00')
-        total_igst_amount = Decimal('0.00')
-
-        uses_igst = product.igst is not None and product.igst > 0
-        
-        for item in order_items:
-            item_total_with_tax = item.total_price
-            if uses_igst:
-                item_igst = _tax_amount_from_total(item_total_with_tax, product.igst)
-                item_subtotal = item_total_with_tax - item_igst
-                item_cgst = Decimal('0.00')
-                item_sgst = Decimal('0.00')
-                item_gst = Decimal('0.00')
-                total_igst_amount += item_igst
-            else:
-                item_gst = _tax_amount_from_total(item_total_with_tax, product.gst)
-                item_subtotal = item_total_with_tax - item_gst
-                item_cgst = item_gst / Decimal('2')
-                item_sgst = item_gst / Decimal('2')
-                item_igst = Decimal('0.00')
-                total_gst_amount += item_gst
-                total_cgst_amount += item_cgst
-                total_sgst_amount += item_sgst
-            
-            total_revenue_without_tax += item_subtotal
-            total_revenue_with_tax += item_total_with_tax
-        
+        # Tax of the product's order lines, split as in the item and category APIs
+        tax = _tax_breakdowns([product], _order_line_totals(store_owner, product))[0]
+        total_revenue_with_tax = tax['with_tax']
+        total_revenue_without_tax = tax['without_tax']
+        total_gst_amount = tax['gst']
+        total_cgst_amount = tax['cgst']
+        total_sgst_amount = tax['sgst']
+        total_igst_amount = tax['igst']
+
         # Get recent sales
         recent_sales = SalesReport.objects.filter(
             store_owner=store_owner,
             product=product,
-            order__is_deleted=False
+            is_deleted=False
         ).order_by('-sale_date')[:10]
         
         recent_sales_data = []
@@ -354,7 +367,7 @@ def user_single_item_analytics_api(request, username, product_id):
                 'total_gst_collected': float(total_gst_amount),
                 'total_igst_collected': float(total_igst_amount),
                 'total_revenue_with_tax': float(total_revenue_with_tax),
-                'revenue_per_unit_in_stock': float(total_revenue_with_tax / current_stock) if current_stock > 0 else 0
+                'revenue_per_unit_in_stock': float(total_revenue_with_tax.decimal / current_stock) if current_stock > 0 else 0
             },
             'sales_analytics': {
                 'total_orders': total_orders,
@@ -387,7 +400,7 @@ def user_category_analytics_api(request, username):
                 'message': 'Access denied.'
             }, status=403)
         
-        products = Product.objects.filter(store_owner=store_owner)
+        products = Product.objects.filter(store_owner=store_owner).order_by('pk')
         
         if not products.exists():
             return JsonResponse({
@@ -402,77 +415,51 @@ def user_category_analytics_api(request, username):
             })
         
         category_data = {}
-        
-        for product in products:
+        sales_stats = _product_sales_stats(store_owner)
+        products = list(products)
+        tax_breakdowns = _tax_breakdowns(products, _order_line_totals(store_owner))
+
+        for product, tax in zip(products, tax_breakdowns):
             category = product.category or 'Uncategorized'
-            
+
             if category not in category_data:
                 category_data[category] = {
                     'category_name': category,
                     'total_products': 0,
-                    'total_revenue_with_gst': Decimal('0.00'),
-                    'total_gst_collected': Decimal('0.00'),
+                    # Amounts in paise
+                    'total_revenue_with_gst': 0,
+                    'total_gst_collected': 0,
+                    'total_igst_collected': 0,
                     'total_sold_quantity': 0,
                     'total_current_stock': 0,
                     'products': []
                 }
             
-            # Calculate sales for this product for THIS store owner only
-            sales_data = SalesReport.objects.filter(
-                store_owner=store_owner,
-                product=product,
-                order__is_deleted=False
-            ).aggregate(
-                total_sold=Sum('quantity')
-            )
-            
-            total_sold = sales_data['total_sold'] or 0
-            
-            # Calculate GST for this product for THIS store owner only
-            order_items = OrderItem.objects.filter(
-                order__store_owner=store_owner,
-                order__is_deleted=False,
-                product=product
-            )
-            
-            product_revenue_with_tax = Decimal('0.00')
-            product_gst_amount = Decimal('0.00')
-            product_igst_amount = Decimal('0.00')
-            
-            uses_igst = product.igst is not None and product.igst > 0
-
-            for item in order_items:
-                item_total_with_tax = item.total_price
-                if uses_igst:
-                    item_igst = _tax_amount_from_total(item_total_with_tax, product.igst)
-                    product_igst_amount += item_igst
-                else:
-                    item_gst = _tax_amount_from_total(item_total_with_tax, product.gst)
-                    product_gst_amount += item_gst
-                product_revenue_with_tax += item_total_with_tax
-            
+            stats = sales_stats.get(product.id) or _empty_sales_stats()
+            total_sold = stats['total_sold']
+
             # Add to category totals
             category_data[category]['total_products'] += 1
-            category_data[category]['total_revenue_with_gst'] += product_revenue_with_tax
-            category_data[category]['total_gst_collected'] += product_gst_amount
-            category_data[category]['total_igst_collected'] = category_data[category].get('total_igst_collected', Decimal('0.00')) + product_igst_amount
+            category_data[category]['total_revenue_with_gst'] += tax['with_tax'].paise
+            category_data[category]['total_gst_collected'] += tax['gst'].paise
+            category_data[category]['total_igst_collected'] += tax['igst'].paise
             category_data[category]['total_sold_quantity'] += total_sold
             category_data[category]['total_current_stock'] += product.quantity
         
         # Convert to list and add percentages
         categories_list = []
-        total_revenue_all_categories = sum(float(cat['total_revenue_with_gst']) for cat in category_data.values())
+        total_revenue_all_categories = float(Money(sum(cat['total_revenue_with_gst'] for cat in category_data.values())))
         
         for category_info in category_data.values():
-            category_revenue = float(category_info['total_revenue_with_gst'])
+            category_revenue = float(Money(category_info['total_revenue_with_gst']))
             revenue_percentage = round((category_revenue / total_revenue_all_categories) * 100, 2) if total_revenue_all_categories > 0 else 0
             
             categories_list.append({
                 'category_name': category_info['category_name'],
                 'total_products': category_info['total_products'],
                 'total_revenue_with_gst': category_revenue,
-                'total_gst_collected': float(category_info['total_gst_collected']),
-                'total_igst_collected': float(category_info.get('total_igst_collected', 0)),
+                'total_gst_collected': float(Money(category_info['total_gst_collected'])),
+                'total_igst_collected': float(Money(category_info['total_igst_collected'])),
                 'total_sold_quantity': category_info['total_sold_quantity'],
                 'total_current_stock': category_info['total_current_stock'],
                 'revenue_percentage': revenue_percentage,
@@ -511,7 +498,7 @@ def item_analytics_api(request):
     """
     try:
         store_owner = request.user
-        products = Product.objects.filter(store_owner=store_owner)
+        products = Product.objects.filter(store_owner=store_owner).order_by('pk')
         
         if not products.exists():
             return JsonResponse({
@@ -529,40 +516,19 @@ def item_analytics_api(request):
             })
         
         analytics_data = []
-        
-        for product in products:
-            sales_data = SalesReport.objects.filter(
-                store_owner=store_owner,
-                product=product,
-                order__is_deleted=False
-            ).aggregate(
-                total_sold=Sum('quantity'),
-                total_orders=Count('order', distinct=True)
-            )
-            
-            total_sold = sales_data['total_sold'] or 0
-            total_orders = sales_data['total_orders'] or 0
-            
-            order_items = OrderItem.objects.filter(
-                order__store_owner=store_owner,
-                order__is_deleted=False,
-                product=product
-            )
-            
-            total_revenue_with_tax = Decimal('0.00')
-            total_gst_amount = Decimal('0.00')
-            total_igst_amount = Decimal('0.00')
-            
-            uses_igst = product.igst is not None and product.igst > 0
-
-            for item in order_items:
-                item_total_with_tax = item.total_price
-                if uses_igst:
-                    total_igst_amount += _tax_amount_from_total(item_total_with_tax, product.igst)
-                else:
-                    total_gst_amount += _tax_amount_from_total(item_total_with_tax, product.gst)
-                total_revenue_with_tax += item_total_with_tax
-            
+        sales_stats = _product_sales_stats(store_owner)
+        products = list(products)
+        tax_breakdowns = _tax_breakdowns(products, _order_line_totals(store_owner))
+
+        for product, tax in zip(products, tax_breakdowns):
+            stats = sales_stats.get(product.id) or _empty_sales_stats()
+            total_sold = stats['total_sold']
+            total_orders = stats['total_orders']
+
+            total_revenue_with_tax = tax['with_tax']
+            total_gst_amount = tax['gst']
+            total_igst_amount = tax['igst']
+
             current_stock = product.quantity
             total_stock = total_sold + current_stock
             
@@ -596,8 +562,8 @@ def item_analytics_api(request):
         analytics_data.sort(key=lambda x: x['total_revenue_with_gst'], reverse=True)
         
         total_products = len(analytics_data)
-        total_revenue_all = sum(item['total_revenue_with_gst'] for item in analytics_data)
-        total_gst_all = sum(item['total_gst_collected'] for item in analytics_data)
+        total_revenue_all = float(Money.sum(tax['with_tax'] for tax in tax_breakdowns))
+        total_gst_all = float(Money.sum(tax['gst'] for tax in tax_breakdowns))
         total_items_sold = sum(item['sold_quantity'] for item in analytics_data)
         total_items_in_stock = sum(item['current_stock'] for item in analytics_data)
         
@@ -637,7 +603,7 @@ def single_item_analytics_api(request, product_id):
         sales_data = SalesReport.objects.filter(
             store_owner=store_owner,
             product=product,
-            order__is_deleted=False
+            is_deleted=False
         ).aggregate(
             total_sold=Sum('quantity'),
             total_orders=Count('order', distinct=True)
@@ -685,7 +651,7 @@ def category_analytics_api(request):
     """Global category analytics using request.user"""
     try:
         store_owner = request.user
-        products = Product.objects.filter(store_owner=store_owner)
+        products = Product.objects.filter(store_owner=store_owner).order_by('pk')
         
         if not products.exists():
             return JsonResponse({
@@ -742,19 +708,16 @@ def ad_section_api(request):
         year = int(request.GET.get('year', now.year))
         month = int(request.GET.get('month', now.month))
 
-        products = Product.objects.filter(store_owner=user)
+        products = list(_ad_month_products(user, year, month))
+        taxes = _ad_month_taxes(products)
+        gst_amounts = taxes.money('gst')
+        igst_amounts = taxes.money('igst')
         results = []
 
-        for product in products:
-            sold_qty, sales_amt = _month_sales_totals(user, product, year, month)
-            uses_igst = product.igst is not None and product.igst > 0
-            
-            if uses_igst:
-                igst_amt = _tax_amount_from_total(sales_amt, product.igst)
-                gst_amt = Decimal('0.00')
-            else:
-                gst_amt = _tax_amount_from_total(sales_amt, product.gst)
-                igst_amt = Decimal('0.00')
+        for index, product in enumerate(products):
+            sold_qty = product.month_sold_qty
+            gst_amt = gst_amounts[index]
+            igst_amt = igst_amounts[index]
 
             current_stock = int(product.quantity)
             initial_stock_month_start = current_stock + sold_qty
@@ -808,19 +771,16 @@ def ad_section_view(request):
     year = int(request.GET.get('year', now.year))
     month = int(request.GET.get('month', now.month))
 
-    products = Product.objects.filter(store_owner=user)
+    products = list(_ad_month_products(user, year, month))
+    taxes = _ad_month_taxes(products)
     data_list = []
 
-    for product in products:
-        sold_qty, sales_amt = _month_sales_totals(user, product, year, month)
-        
-        uses_igst = product.igst is not None and product.igst > 0
-        if uses_igst:
-            igst_amt = _tax_amount_from_total(sales_amt, product.igst)
-            gst_amt = Decimal('0.00')
-        else:
-            gst_amt = _tax_amount_from_total(sales_amt, product.gst)
-            igst_amt = Decimal('0.00')
+    for index, product in enumerate(products):
+        sold_qty = product.month_sold_qty
+        sales_amt = product.month_sales_amt
+        gst_amt = taxes.gst[index]
+        igst_amt = taxes.igst[index]
+        uses_igst = taxes.uses_igst[index]
 
         current_stock = int(product.quantity)
         initial_stock = current_stock + sold_qty
@@ -863,6 +823,75 @@ def ad_section_view(request):
     }
     return render(request, 'ad_section.html', context)
 
+AD_EXPORT_HEADERS = [
+    'Company/Supplier', 'GSTIN', 'Purchase Date', 'Invoice #', 'Product', 'Category',
+    'GST%', 'IGST%', 'HSN', 'Batch #', 'Qty (Stock)', 'Unit', 'Unit Amt', 'Net Amt',
+    'Initial Stock', 'Current Stock', 'Units Sold', 'Sold Value', 'Sold CGST', 'Sold SGST', 'Sold IGST',
+    'Rem. Taxable Value', 'Rem. CGST', 'Rem. SGST', 'Rem. IGST', 'Rem. Total Value'
+]
+
+AD_EXPORT_TOTAL_FIELDS = (
+    'sales_amt', 'sold_cgst', 'sold_sgst', 'sold_igst',
+    'rem_taxable', 'rem_cgst', 'rem_sgst', 'rem_igst', 'rem_total',
+)
+
+
+def _ad_export_records(products):
+    """AD figures for _ad_month_products() rows; CGST/SGST or IGST columns are zero depending on their table."""
+    taxes = _ad_month_taxes(products)
+    records = []
+    for index, product in enumerate(products):
+        current_stock = int(product.quantity)
+        remaining_stock_taxable_value = product.taxable_unit_amount * Decimal(str(current_stock))
+        remaining_stock_total_value = product.total_unit_amount * Decimal(str(current_stock))
+        rem_gst = remaining_stock_total_value - remaining_stock_taxable_value
+
+        record = dict.fromkeys(AD_EXPORT_TOTAL_FIELDS, Decimal('0.00'))
+        record.update(
+            product=product,
+            sold_qty=product.month_sold_qty,
+            current_stock=current_stock,
+            initial_stock=current_stock + product.month_sold_qty,
+            sales_amt=product.month_sales_amt,
+            sold_cgst=taxes.cgst[index],
+            sold_sgst=taxes.sgst[index],
+            sold_igst=taxes.igst[index],
+            rem_taxable=remaining_stock_taxable_value,
+            rem_total=remaining_stock_total_value,
+        )
+        if taxes.uses_igst[index]:
+            record['rem_igst'] = rem_gst
+        else:
+            record['rem_cgst'], record['rem_sgst'] = split_gst(rem_gst)
+        records.append(record)
+    return records
+
+
+def _ad_export_row(r):
+    product = r['product']
+    return [
+        product.purchased_from or '—', product.company_gstin or '—',
+        product.purchase_date.strftime('%d/%m/%Y') if product.purchase_date else '—',
+        product.purchase_invoice_number or '—', product.name, product.category or 'General',
+        product.gst, product.igst, product.hsn_code or '—', product.batch_number or '—',
+        product.quantity, product.get_measurement_type_display(),
+        f"{product.unit_amount:.2f}", f"{product.net_amount:.2f}",
+        r['initial_stock'], r['current_stock'], r['sold_qty'], f"{r['sales_amt']:.2f}",
+        f"{r['sold_cgst']:.2f}", f"{r['sold_sgst']:.2f}", f"{r['sold_igst']:.2f}",
+        f"{r['rem_taxable']:.2f}", f"{r['rem_cgst']:.2f}", f"{r['rem_sgst']:.2f}", f"{r['rem_igst']:.2f}",
+        f"{r['rem_total']:.2f}"
+    ]
+
+
+def _ad_export_total_row(kind, s):
+    return [
+        'TOTAL', '', '', '', '', '', '', '', '', '', '', '', '', '', '', '', '',
+        f"{s['sales_amt']:.2f}", f"{s['sold_cgst']:.2f}", f"{s['sold_sgst']:.2f}", f"{s['sold_igst']:.2f}",
+        f"{s['rem_taxable']:.2f}", f"{s['rem_cgst']:.2f}", f"{s['rem_sgst']:.2f}", f"{s['rem_igst']:.2f}",
+        f"{s['rem_total']:.2f}"
+    ]
+
+
 @login_required
 def export_ad_section_csv(request):
     """
@@ -872,115 +901,19 @@ def export_ad_section_csv(request):
     now = datetime.datetime.now()
     year = int(request.GET.get('year', now.year))
     month = int(request.GET.get('month', now.month))
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="ad_section_{year}_{month}.csv"'
-    
-    writer = csv.writer(response)
-    # Section 1: GST TABLE
-    writer.writerow(["--- SECTION 1: GST TABLE (CGST + SGST) ---"])
-    writer.writerow([])
-    for rate in [5, 12, 18]:
-        writer.writerow([f"Table: {rate}% GST"])
-        writer.writerow([
-            'Company/Supplier', 'GSTIN', 'Purchase Date', 'Invoice #', 'Product', 'Category',
-            'GST%', 'IGST%', 'HSN', 'Batch #', 'Qty (Stock)', 'Unit', 'Unit Amt', 'Net Amt',
-            'Initial Stock', 'Current Stock', 'Units Sold', 'Sold Value', 'Sold CGST', 'Sold SGST', 'Sold IGST',
-            'Rem. Taxable Value', 'Rem. CGST', 'Rem. SGST', 'Rem. IGST', 'Rem. Total Value'
-        ])
-        table_products = Product.objects.filter(store_owner=user, igst=0, gst=rate)
-        
-        s_sold_val = s_sold_cgst = s_sold_sgst = s_sold_igst = s_rem_taxable = s_rem_cgst = s_rem_sgst = s_rem_igst = s_rem_total = Decimal('0.00')
-        
-        for product in table_products:
-            sold_qty, sales_amt = _month_sales_totals(user, product, year, month)
-            gst_amt = _tax_amount_from_total(sales_amt, product.gst)
-            sold_cgst = gst_amt / Decimal('2')
-            sold_sgst = gst_amt / Decimal('2')
-            
-            current_stock = int(product.quantity)
-            initial_stock = current_stock + sold_qty
-            remaining_stock_taxable_value = product.taxable_unit_amount * Decimal(str(current_stock))
-            remaining_stock_total_value = product.total_unit_amount * Decimal(str(current_stock))
-            rem_gst = remaining_stock_total_value - remaining_stock_taxable_value
-            rem_cgst = rem_gst / Decimal('2')
-            rem_sgst = rem_gst / Decimal('2')
-
-            writer.writerow([
-                product.purchased_from or '—', product.company_gstin or '—',
-                product.purchase_date.strftime('%d/%m/%Y') if product.purchase_date else '—',
-                product.purchase_invoice_number or '—', product.name, product.category or 'General',
-                product.gst, product.igst, product.hsn_code or '—', product.batch_number or '—',
-                product.quantity, product.get_measurement_type_display(),
-                f"{product.unit_amount:.2f}", f"{product.net_amount:.2f}",
-                initial_stock, current_stock, sold_qty, f"{sales_amt:.2f}",
-                f"{sold_cgst:.2f}", f"{sold_sgst:.2f}", "0.00",
-                f"{remaining_stock_taxable_value:.2f}", f"{rem_cgst:.2f}", f"{rem_sgst:.2f}", "0.00",
-                f"{remaining_stock_total_value:.2f}"
-            ])
-            s_sold_val += sales_amt
-            s_sold_cgst += sold_cgst
-            s_sold_sgst += sold_sgst
-            s_rem_taxable += remaining_stock_taxable_value
-            s_rem_cgst += rem_cgst
-            s_rem_sgst += rem_sgst
-            s_rem_total += remaining_stock_total_value
-            
-        writer.writerow([
-            'TOTAL', '', '', '', '', '', '', '', '', '', '', '', '', '', '', '', '',
-            f"{s_sold_val:.2f}", f"{s_sold_cgst:.2f}", f"{s_sold_sgst:.2f}", "0.00",
-            f"{s_rem_taxable:.2f}", f"{s_rem_cgst:.2f}", f"{s_rem_sgst:.2f}", "0.00", f"{s_rem_total:.2f}"
-        ])
-        writer.writerow([])
-
-    # Section 2: IGST TABLE
-    writer.writerow(["--- SECTION 2: IGST TABLE ---"])
-    writer.writerow([])
-    for rate in [5, 12, 18]:
-        writer.writerow([f"Table: {rate}% IGST"])
-        writer.writerow([
-            'Company/Supplier', 'GSTIN', 'Purchase Date', 'Invoice #', 'Product', 'Category',
-            'GST%', 'IGST%', 'HSN', 'Batch #', 'Qty (Stock)', 'Unit', 'Unit Amt', 'Net Amt',
-            'Initial Stock', 'Current Stock', 'Units Sold', 'Sold Value', 'Sold CGST', 'Sold SGST', 'Sold IGST',
-            'Rem. Taxable Value', 'Rem. CGST', 'Rem. SGST', 'Rem. IGST', 'Rem. Total Value'
-        ])
-        table_products = Product.objects.filter(store_owner=user, igst=rate)
-        
-        s_sold_val = s_sold_cgst = s_sold_sgst = s_sold_igst = s_rem_taxable = s_rem_cgst = s_rem_sgst = s_rem_igst = s_rem_total = Decimal('0.00')
-        
-        for product in table_products:
-            sold_qty, sales_amt = _month_sales_totals(user, product, year, month)
-            sold_igst = _tax_amount_from_total(sales_amt, product.igst)
-            
-            current_stock = int(product.quantity)
-            initial_stock = current_stock + sold_qty
-            remaining_stock_taxable_value = product.taxable_unit_amount * Decimal(str(current_stock))
-            remaining_stock_total_value = product.total_unit_amount * Decimal(str(current_stock))
-            rem_igst = remaining_stock_total_value - remaining_stock_taxable_value
-
-            writer.writerow([
-                product.purchased_from or '—', product.company_gstin or '—',
-                product.purchase_date.strftime('%d/%m/%Y') if product.purchase_date else '—',
-                product.purchase_invoice_number or '—', product.name, product.category or 'General',
-                product.gst, product.igst, product.hsn_code or '—', product.batch_number or '—',
-                product.quantity, product.get_measurement_type_display(),
-                f"{product.unit_amount:.2f}", f"{product.net_amount:.2f}",
-                initial_stock, current_stock, sold_qty, f"{sales_amt:.2f}",
-                "0.00", "0.00", f"{sold_igst:.2f}",
-                f"{remaining_stock_taxable_value:.2f}", "0.00", "0.00", f"{rem_igst:.2f}",
-                f"{remaining_stock_total_value:.2f}"
-            ])
-            s_sold_val += sales_amt
-            s_sold_igst += sold_igst
-            s_rem_taxable += remaining_stock_taxable_value
-            s_rem_igst += rem_igst
-            s_rem_total += remaining_stock_total_value
-            
-        writer.writerow([
-            'TOTAL', '', '', '', '', '', '', '', '', '', '', '', '', '', '', '', '',
-            f"{s_sold_val:.2f}", "0.00", "0.00", f"{s_sold_igst:.2f}",
-            f"{s_rem_taxable:.2f}", "0.00", "0.00", f"{s_rem_igst:.2f}", f"{s_rem_total:.2f}"
-        ])
-        writer.writerow([])
-    
-    return response
+
+    # One product query for all six rate tables, streamed in table order
+    products = order_by_tax_table(_ad_month_products(user, year, month), 'pk').iterator()
+    records = in_batches(_ad_export_records, products)
+    return stream_csv_response(
+        f"ad_section_{year}_{month}.csv",
+        iter_tax_table_rows(
+            records,
+            headers=AD_EXPORT_HEADERS,
+            rates_of=lambda r: (r['product'].gst, r['product'].igst),
+            row_cells=_ad_export_row,
+            total_fields=AD_EXPORT_TOTAL_FIELDS,
+            total_row=_ad_export_total_row,
+        ),
+        content_type='text/csv',
+    )
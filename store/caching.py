@@ -0,0 +1,148 @@
+"""
+Cache plumbing shared by the catalogue, storefront and invoice caches.
+
+- tenant_key(): every per-store key starts with `t<owner pk>:`, so two stores can
+  never read each other's entries, whichever backend CACHE_URL selects.
+- make_key(): KEY_FUNCTION for CACHES. It keeps readable keys and replaces long
+  or unsafe ones (spaces, control characters) with a digest, keeping the tenant
+  prefix so per-store keys stay grouped.
+- StatsMixin backends: count hits and misses per key family (the first key
+  segment after the tenant, e.g. `catalog`) and add them to shared counters in
+  the cache every STATS_FLUSH_OPS lookups or STATS_FLUSH_SECONDS, which is what
+  `manage.py cache_stats` reports.
+
+This module must not import models: settings and cache backends load it before
+the app registry is ready.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import Counter
+
+from django.core.cache.backends.filebased import FileBasedCache as DjangoFileBasedCache
+from django.core.cache.backends.locmem import LocMemCache as DjangoLocMemCache
+from django.core.cache.backends.redis import RedisCache as DjangoRedisCache
+
+STATS_PREFIX = 'cache-stats'
+STATS_FLUSH_OPS = 100
+STATS_FLUSH_SECONDS = 10
+MAX_KEY_LENGTH = 200
+
+_TENANT_RE = re.compile(r'^t(?P<pk>[^:]+):')
+_UNSAFE_RE = re.compile(r'[\x00-\x20\x7f]')
+
+
+def tenant_key(store_owner_pk, *parts):
+    """Cache key scoped to one store: t<pk>:part:part..."""
+    return ':'.join([f't{store_owner_pk}', *(str(part) for part in parts)])
+
+
+def make_key(key, key_prefix, version):
+    if len(key) > MAX_KEY_LENGTH or _UNSAFE_RE.search(key):
+        tenant = _TENANT_RE.match(key)
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        key = f'{tenant.group(0)}#{digest}' if tenant else f'#{digest}'
+    return f'{key_prefix}:{version}:{key}'
+
+
+def key_family(key):
+    """`catalog` for t5:catalog:..., `template` for template.cache.*; used to group stats."""
+    key = _TENANT_RE.sub('', key, count=1)
+    return re.split(r'[:.]', key, maxsplit=1)[0] or 'other'
+
+
+def stats_key(family, outcome):
+    return f'{STATS_PREFIX}:{family}:{outcome}'
+
+
+class StatsMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._stats = Counter()
+        self._stats_ops = 0
+        self._stats_flushed = time.monotonic()
+
+    def _record(self, key, hit):
+        if key.startswith(STATS_PREFIX):
+            return
+        with self._stats_lock:
+            self._stats[(key_family(key), 'hits' if hit else 'misses')] += 1
+            self._stats_ops += 1
+            due = (
+                self._stats_ops >= STATS_FLUSH_OPS
+                or time.monotonic() - self._stats_flushed >= STATS_FLUSH_SECONDS
+            )
+            if not due:
+                return
+            pending, self._stats = self._stats, Counter()
+            self._stats_ops = 0
+            self._stats_flushed = time.monotonic()
+        self.flush_stats(pending)
+
+    def flush_stats(self, pending=None):
+        """Add counts to the shared counters (and the family list) in the cache."""
+        if pending is None:
+            with self._stats_lock:
+                pending, self._stats = self._stats, Counter()
+                self._stats_ops = 0
+        if not pending:
+            return
+        families = set(super().get(f'{STATS_PREFIX}:families') or ())
+        for (family, outcome), count in pending.items():
+            families.add(family)
+            key = stats_key(family, outcome)
+            # add() creates the counter; incr() is atomic on Redis once it exists
+            if not super().add(key, count, None):
+                try:
+                    super().incr(key, count)
+                except ValueError:
+                    super().set(key, count, None)
+        super().set(f'{STATS_PREFIX}:families', sorted(families), None)
+
+    def read_stats(self):
+        """{family: (hits, misses)} from the shared counters."""
+        get = super().get  # uncounted read
+        return {
+            family: (get(stats_key(family, 'hits'), 0), get(stats_key(family, 'misses'), 0))
+            for family in get(f'{STATS_PREFIX}:families') or []
+        }
+
+    def reset_stats(self):
+        families = super().get(f'{STATS_PREFIX}:families') or []
+        keys = [stats_key(family, outcome) for family in families for outcome in ('hits', 'misses')]
+        super().delete_many(keys + [f'{STATS_PREFIX}:families'])
+
+    _MISSING = object()
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, self._MISSING, version=version)
+        self._record(key, value is not self._MISSING)
+        return default if value is self._MISSING else value
+
+    def get_many(self, keys, version=None):
+        found = super().get_many(keys, version=version)
+        for key in keys:
+            self._record(key, key in found)
+        return found
+
+
+class LocMemCache(StatsMixin, DjangoLocMemCache):
+    pass
+
+
+class FileBasedCache(StatsMixin, DjangoFileBasedCache):
+    pass
+
+
+class RedisCache(StatsMixin, DjangoRedisCache):
+    def server_info(self):
+        """Keyspace hits/misses and key count as reported by the server itself."""
+        client = self._cache.get_client(None)
+        info = client.info('stats')
+        return {
+            'keyspace_hits': info.get('keyspace_hits', 0),
+            'keyspace_misses': info.get('keyspace_misses', 0),
+            'keys': client.dbsize(),
+        }
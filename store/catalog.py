@@ -0,0 +1,149 @@
+"""
+Storefront catalogue pages: keyset pagination and a per-tenant fragment cache.
+
+Pages follow the (category, name, id) order of the active-catalogue index. A page
+is requested with an opaque `after` cursor holding the last row of the previous
+page, so the database seeks straight to it instead of counting past an OFFSET.
+
+The rendered product cards of a page are cached under the store owner's catalogue
+version. Any product save/delete (store.signals) or stock change at checkout
+bumps the version, which orphans every cached page of that store at once.
+"""
+import base64
+import binascii
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .caching import tenant_key
+from .models import Product
+from .search import search_products
+
+CATALOG_CARDS_TEMPLATE = 'store_products_cards.html'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _version_key(store_owner_pk):
+    return tenant_key(store_owner_pk, 'catalog', 'version')
+
+
+def catalog_version(store_owner_pk):
+    """Current catalogue version of a store (created on first use)."""
+    version = cache.get(_version_key(store_owner_pk))
+    if version is None:
+        version = time.time_ns()
+        # add() so two processes starting at once agree on one value
+        if not cache.add(_version_key(store_owner_pk), version, None):
+            version = cache.get(_version_key(store_owner_pk), version)
+    return version
+
+
+def bump_catalog_version(store_owner_pk):
+    """
+    Invalidate every cached catalogue page of a store. Runs after the surrounding
+    transaction commits so a concurrent request cannot re-cache the old rows under
+    the new version.
+    """
+    transaction.on_commit(lambda: cache.set(_version_key(store_owner_pk), time.time_ns(), None))
+
+
+def encode_cursor(product):
+    raw = json.dumps([product.category, product.name, product.pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """(category, name, pk) from a cursor; raises InvalidCursor for anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        category, name, pk = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidCursor(token)
+    if not (category is None or isinstance(category, str)) or not isinstance(name, str) or not isinstance(pk, int):
+        raise InvalidCursor(token)
+    return category, name, pk
+
+
+def _after(category, name, pk):
+    """
+    Rows after (category, name, pk) in ORDER BY category, name, id. NULL categories
+    sort first on SQLite and last on PostgreSQL, so the NULL block is placed the
+    way the backend orders it.
+    """
+    nulls_last = connection.features.nulls_order_largest
+    if category is None:
+        after = Q(category__isnull=True) & (Q(name__gt=name) | Q(name=name, pk__gt=pk))
+        return after if nulls_last else after | Q(category__isnull=False)
+    after = Q(category__gt=category) | Q(category=category, name__gt=name) | Q(category=category, name=name, pk__gt=pk)
+    return after | Q(category__isnull=True) if nulls_last else after
+
+
+def catalog_products(store_owner):
+    return Product.objects.filter(store_owner=store_owner, is_archived=False).order_by('category', 'name', 'pk')
+
+
+def catalog_page(store_owner, *, after=None, size=None):
+    """
+    (products, next_cursor) for one page; next_cursor is None on the last page.
+    `after` is a cursor string from a previous page.
+    """
+    size = size or settings.STORE_CATALOG_PAGE_SIZE
+    products = catalog_products(store_owner)
+    if after:
+        products = products.filter(_after(*decode_cursor(after)))
+    # One extra row tells us whether there is a next page without a COUNT
+    rows = list(products[:size + 1])
+    next_cursor = encode_cursor(rows[size - 1]) if len(rows) > size else None
+    return rows[:size], next_cursor
+
+
+def search_page(store_owner, query, *, size=None):
+    """Best `size` matches for a storefront search, best first (no further pages)."""
+    size = size or settings.STORE_CATALOG_PAGE_SIZE
+    return list(search_products(catalog_products(store_owner), query)[:size]), None
+
+
+def _page_payload(store_owner, products, next_cursor, query=''):
+    context = {'products': products, 'store_owner': store_owner, 'search_query': query}
+    return {
+        'html': render_to_string(CATALOG_CARDS_TEMPLATE, context),
+        'next_cursor': next_cursor,
+        'products': [
+            {
+                'id': product.pk,
+                'name': product.name,
+                'category': product.category,
+                'quantity': product.quantity,
+                'gst': str(product.gst),
+                'unit_label': product.get_unit_label(),
+            }
+            for product in products
+        ],
+    }
+
+
+def rendered_catalog_page(store_owner, *, after=None, query=''):
+    """
+    {'html', 'next_cursor', 'products'} for one page. Pages without a search query
+    come from the cache; search results are ranked and rendered each time (too many
+    distinct keys to be worth keeping).
+    """
+    if query:
+        return _page_payload(store_owner, *search_page(store_owner, query), query=query)
+
+    key = tenant_key(store_owner.pk, 'catalog', catalog_version(store_owner.pk), after or 'first')
+    payload = cache.get(key)
+    if payload is None:
+        payload = _page_payload(store_owner, *catalog_page(store_owner, after=after))
+        cache.set(key, payload, settings.STORE_CATALOG_CACHE_TIMEOUT)
+    payload['html'] = mark_safe(payload['html'])
+    return payload
@@ -0,0 +1,191 @@
+"""Checkout: turn a customer's cart into an order, its lines and sales rows in one transaction."""
+from collections import defaultdict
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, When
+from django.utils import timezone
+
+from .catalog import bump_catalog_version
+from .models import Cart, Order, OrderItem, Product, SalesReport, StockMovement
+from .rollups import record_order_sales
+from .stock_ledger import record_order_stock
+from .storefront_cache import storefront_cache
+from .tax import add_tax
+
+
+class InsufficientStock(Exception):
+    """A cart line asks for more units than the (locked) product has in stock."""
+
+    def __init__(self, product, requested):
+        self.product = product
+        self.requested = requested
+        super().__init__(
+            f'Insufficient stock for {product.name}: {product.quantity} available, {requested} requested.'
+        )
+
+
+def price_cart_lines(lines):
+    """
+    Tax breakdown for (cart item, product) pairs, priced together by store.tax;
+    IGST takes priority over CGST + SGST. The cart page and checkout both use this,
+    so the cart shows the figures the order is saved with.
+    """
+    unit_prices = [item.unit_price if item.unit_price > 0 else product.price for item, product in lines]
+    subtotals = [price * item.quantity for price, (item, _) in zip(unit_prices, lines)]
+    taxes = add_tax(
+        subtotals,
+        [product.gst for _, product in lines],
+        [product.igst for _, product in lines],
+    )
+    return [
+        {
+            'cart_item': item,
+            'product': product,
+            'quantity': item.quantity,
+            'unit_price': unit_price,
+            'subtotal': taxes.taxable[index],
+            'gst_rate': product.gst,
+            'igst_rate': product.igst,
+            'uses_igst': taxes.uses_igst[index],
+            'cgst_amount': taxes.cgst[index],
+            'sgst_amount': taxes.sgst[index],
+            'gst_amount': taxes.gst[index],
+            'igst_amount': taxes.igst[index],
+            'total': taxes.total[index],
+        }
+        for index, ((item, product), unit_price) in enumerate(zip(lines, unit_prices))
+    ]
+
+
+def place_order(store_owner, customer):
+    """
+    Create an order from the customer's cart and return it (None if the cart is empty).
+
+    Products are locked with select_for_update, the cart is priced once, stock is
+    decremented in a single UPDATE and order items / sales rows are bulk-inserted,
+    so the query count does not grow with the number of lines. Raises
+    InsufficientStock (and writes nothing) if any line exceeds the locked stock.
+    """
+    with transaction.atomic():
+        cart_items = list(Cart.objects.filter(store_owner=store_owner, customer=customer).order_by('pk'))
+        if not cart_items:
+            return None
+
+        # Lock in primary-key order so concurrent checkouts cannot deadlock
+        products = {
+            p.pk: p
+            for p in Product.objects.select_for_update().filter(
+                pk__in=[item.product_id for item in cart_items]
+            ).order_by('pk')
+        }
+        for item in cart_items:
+            product = products[item.product_id]
+            if item.quantity > product.quantity:
+                raise InsufficientStock(product, item.quantity)
+
+        lines = price_cart_lines([(item, products[item.product_id]) for item in cart_items])
+
+        subtotal = sum((line['subtotal'] for line in lines), Decimal('0.00'))
+        total_cgst = sum((line['cgst_amount'] for line in lines), Decimal('0.00'))
+        total_sgst = sum((line['sgst_amount'] for line in lines), Decimal('0.00'))
+        total_igst = sum((line['igst_amount'] for line in lines), Decimal('0.00'))
+        total_gst = total_cgst + total_sgst
+        grand_total = subtotal + total_gst + total_igst
+
+        line_dates = [item.transaction_date for item in cart_items if item.transaction_date]
+        invoice_date = max(line_dates) if line_dates else timezone.now().date()
+
+        order = Order.objects.create(
+            store_owner=store_owner,
+            customer=customer,
+            total_price=grand_total,
+            subtotal=subtotal,
+            total_cgst=total_cgst,
+            total_sgst=total_sgst,
+            total_gst=total_gst,
+            total_igst=total_igst,
+            status='pending',
+            invoice_date=invoice_date,
+        )
+        order.invoice_number = f"INV-{order.order_number:02d}"
+        order.save(update_fields=['invoice_number'])
+
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=line['product'],
+                quantity=line['quantity'],
+                item_price=line['unit_price'],
+                total_price=line['total'],
+                subtotal=line['subtotal'],
+                cgst_amount=line['cgst_amount'],
+                sgst_amount=line['sgst_amount'],
+                gst_amount=line['gst_amount'],
+                igst_amount=line['igst_amount'],
+            )
+            for line in lines
+        ])
+
+        sales = []
+        for line in lines:
+            sale_day = line['cart_item'].transaction_date or invoice_date
+            sales.append(SalesReport(
+                store_owner=store_owner,
+                customer=customer,
+                product=line['product'],
+                order=order,
+                quantity=line['quantity'],
+                total_price=line['total'],
+                profit=Decimal('0.00'),
+                category=line['product'].category or 'Uncategorized',
+                sale_date=timezone.make_aware(datetime.combine(sale_day, time(12, 0, 0))),
+            ))
+        SalesReport.objects.bulk_create(sales)
+
+        Product.objects.filter(pk__in=products).update(
+            quantity=Case(
+                *[When(pk=line['product'].pk, then=F('quantity') - line['quantity']) for line in lines],
+                default=F('quantity'),
+                output_field=PositiveIntegerField(),
+            )
+        )
+        # The UPDATE bypasses post_save, so drop the cached storefront stock badges here
+        bump_catalog_version(store_owner.pk)
+
+        record_order_sales(order)
+        record_order_stock(order, StockMovement.SALE)
+        Cart.objects.filter(pk__in=[item.pk for item in cart_items]).delete()
+
+    return order
+
+
+def move_order_stock(order, sign):
+    """
+    Put an order's units back in stock (sign=1, invoice delete) or take them out
+    again (sign=-1, invoice restore). Products are locked in primary-key order as
+    at checkout and updated in a single UPDATE; raises InsufficientStock (and
+    writes nothing) if a line exceeds the locked stock. Call inside the caller's
+    transaction.
+    """
+    quantities = defaultdict(int)
+    for product_id, quantity in order.items.values_list('product_id', 'quantity').order_by('pk'):
+        quantities[product_id] += quantity
+    products = list(Product.objects.select_for_update().filter(pk__in=quantities).order_by('pk'))
+    if sign < 0:
+        for product in products:
+            if quantities[product.pk] > product.quantity:
+                raise InsufficientStock(product, quantities[product.pk])
+
+    Product.objects.filter(pk__in=quantities).update(
+        quantity=Case(
+            *[When(pk=product_id, then=F('quantity') + sign * quantity) for product_id, quantity in quantities.items()],
+            default=F('quantity'),
+            output_field=PositiveIntegerField(),
+        )
+    )
+    # The UPDATE bypasses post_save, so drop the cached catalogue and product records here
+    store_owner_pk = order.store_owner_id
+    bump_catalog_version(store_owner_pk)
+    transaction.on_commit(lambda: storefront_cache.invalidate_products(store_owner_pk))
@@ -0,0 +1,102 @@
+"""Streaming CSV export (StreamingHttpResponse) with GST / IGST rate-table sections."""
+import csv
+
+from django.db.models import Case, F, IntegerField, Value, When
+from django.http import StreamingHttpResponse
+
+from .money import MoneyTotals
+
+TAX_TABLE_RATES = (5, 12, 18)
+TAX_TABLE_SECTIONS = (
+    ('GST', '--- SECTION 1: GST TABLE (CGST + SGST) ---'),
+    ('IGST', '--- SECTION 2: IGST TABLE ---'),
+)
+
+
+class _Echo:
+    """Pseudo-buffer: csv.writer hands each formatted line straight back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv_response(filename, rows, content_type='text/csv; charset=utf-8'):
+    """
+    filename: download name
+    rows: iterable of row lists; consumed lazily while the response is sent
+    """
+    writer = csv.writer(_Echo())
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in rows),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def tax_table_key(gst, igst):
+    """The rate table a product belongs to: ('IGST', igst) when IGST applies, else ('GST', gst)."""
+    if igst:
+        return ('IGST', igst)
+    return ('GST', gst)
+
+
+def order_by_tax_table(queryset, *ordering, gst_field='gst', igst_field='igst'):
+    """
+    Order products so GST tables (5/12/18) come first, then IGST tables, keeping
+    `ordering` inside each table. Lets iter_tax_table_rows() stream in one pass.
+    """
+    return queryset.annotate(
+        tax_table_kind=Case(
+            When(**{igst_field: 0}, then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField(),
+        ),
+        tax_table_rate=Case(
+            When(**{igst_field: 0}, then=F(gst_field)),
+            default=F(igst_field),
+        ),
+    ).order_by('tax_table_kind', 'tax_table_rate', *ordering)
+
+
+def iter_tax_table_rows(records, *, headers, rates_of, row_cells, total_fields, total_row):
+    """
+    Yield CSV rows for the six rate tables (GST 5/12/18, then IGST 5/12/18):
+    table title, header row, one row per record, TOTAL row, blank line.
+
+    records: iterable already ordered with order_by_tax_table(); records outside
+        the six tables are skipped. Nothing is buffered, so memory stays flat.
+    rates_of: record -> (gst, igst)
+    row_cells: record -> list of cells
+    total_fields: keys of the record summed for the TOTAL row (Money or Decimal)
+    total_row: (kind, sums) -> list of cells; sums[field] is Money
+    """
+    table_order = [(kind, rate) for kind, _ in TAX_TABLE_SECTIONS for rate in TAX_TABLE_RATES]
+    position = {key: index for index, key in enumerate(table_order)}
+    records = iter(records)
+    pending = None
+
+    for kind, banner in TAX_TABLE_SECTIONS:
+        yield [banner]
+        yield []
+        for rate in TAX_TABLE_RATES:
+            yield [f"Table: {rate}% {kind}"]
+            yield headers
+            current = position[(kind, rate)]
+            sums = MoneyTotals(total_fields)
+            while True:
+                if pending is None:
+                    pending = next(records, None)
+                    if pending is None:
+                        break
+                index = position.get(tax_table_key(*rates_of(pending)))
+                if index is None or index < current:
+                    pending = None
+                    continue
+                if index > current:
+                    break
+                yield row_cells(pending)
+                sums.add(pending)
+                pending = None
+            yield total_row(kind, sums)
+            yield []
@@ -1,30 +1,84 @@
-"""Excel export with bold header row (openpyxl)."""
-from io import BytesIO
+"""Excel export with bold header row (openpyxl, write-only / streaming mode)."""
+import tempfile
+
+from django.http import FileResponse
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font
 
+from .csv_export import TAX_TABLE_RATES, TAX_TABLE_SECTIONS, tax_table_key
+from .money import MoneyTotals
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+_BOLD = Font(bold=True)
+
+
+def _sheet_title(title):
+    return (title or "Report")[:31]
 
-def build_workbook_response(filename, sheet_title, headers, rows):
+
+def _append_bold_row(ws, values):
+    cells = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = _BOLD
+        cells.append(cell)
+    ws.append(cells)
+
+
+def workbook_file_response(filename, fill):
     """
-    filename: e.g. 'report.xlsx'
-    sheet_title: max 31 chars for Excel sheet name
-    headers: list of str
-    rows: list of list of cell values
+    FileResponse for a workbook written by fill(fileobj) into a temporary file;
+    the file is streamed in chunks and removed once the response is closed.
     """
-    wb = Workbook()
-    ws = wb.active
-    ws.title = (sheet_title or "Report")[:31]
-
-    bold = Font(bold=True)
-    for col, h in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=h)
-        cell.font = bold
-
-    for r_idx, row in enumerate(rows, start=2):
-        for c_idx, val in enumerate(row, start=1):
-            ws.cell(row=r_idx, column=c_idx, value=val)
-
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return buf, filename
+    tmp = tempfile.TemporaryFile()
+    try:
+        fill(tmp)
+        tmp.seek(0)
+    except Exception:
+        tmp.close()
+        raise
+    return FileResponse(tmp, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+def write_tax_table_workbook(fileobj, records, *, sheet_title, headers, rates_of, row_cells,
+                             total_fields, total_row):
+    """
+    One pass over records: every row goes to the overview sheet and to the sheet
+    of its rate table (GST 5/12/18, IGST 5/12/18), matching the CSV sections.
+    Each rate sheet ends with the same TOTAL row as the CSV table.
+    Arguments mirror csv_export.iter_tax_table_rows().
+    """
+    wb = Workbook(write_only=True)
+    overview = wb.create_sheet(_sheet_title(sheet_title))
+    _append_bold_row(overview, headers)
+
+    tables = {}
+    for kind, _ in TAX_TABLE_SECTIONS:
+        for rate in TAX_TABLE_RATES:
+            ws = wb.create_sheet(f"{rate}% {kind}")
+            _append_bold_row(ws, headers)
+            tables[(kind, rate)] = (ws, MoneyTotals(total_fields))
+
+    for record in records:
+        cells = row_cells(record)
+        overview.append(cells)
+        table = tables.get(tax_table_key(*rates_of(record)))
+        if table is None:
+            continue
+        ws, sums = table
+        ws.append(cells)
+        sums.add(record)
+
+    for (kind, _), (ws, sums) in tables.items():
+        _append_bold_row(ws, total_row(kind, sums))
+    wb.save(fileobj)
+
+
+def tax_table_workbook_response(filename, records, **table_options):
+    """Streamed .xlsx download built with write_tax_table_workbook()."""
+    return workbook_file_response(
+        filename,
+        lambda fileobj: write_tax_table_workbook(fileobj, records, **table_options),
+    )
@@ -0,0 +1,290 @@
+"""
+A small in-memory server speaking the Redis protocol (RESP2), for local runs and
+CI where no Redis is installed. It implements the commands Django's RedisCache
+and `cache_stats` use: strings with expiry, counters, MULTI/EXEC pipelines, DEL,
+EXISTS, FLUSHDB, DBSIZE, INFO and the connection handshake. It has no
+persistence or eviction and is not meant for production.
+
+    python manage.py fake_redis_server --bind 127.0.0.1:6390
+    CACHE_URL=redis://127.0.0.1:6390/0
+"""
+import fnmatch
+import socketserver
+import threading
+import time
+
+
+class _Error(Exception):
+    pass
+
+
+class FakeRedisStore:
+    """Databases of key -> (bytes value, expiry monotonic time or None)."""
+
+    def __init__(self):
+        self.lock = threading.RLock()  # EXEC runs the queued commands under the same lock
+        self.dbs = {}
+        self.keyspace_hits = 0
+        self.keyspace_misses = 0
+
+    def db(self, index):
+        return self.dbs.setdefault(index, {})
+
+    @staticmethod
+    def live(db, key):
+        entry = db.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del db[key]
+            return None
+        return entry
+
+
+def _expiry(seconds):
+    return time.monotonic() + seconds
+
+
+class _Session:
+    def __init__(self, store):
+        self.store = store
+        self.db_index = 0
+        self.queued = None  # list of commands inside MULTI
+
+    @property
+    def db(self):
+        return self.store.db(self.db_index)
+
+    def execute(self, args):
+        name = args[0].decode().upper()
+        if self.queued is not None and name not in ('EXEC', 'DISCARD', 'MULTI'):
+            self.queued.append(args)
+            return 'QUEUED'
+        handler = getattr(self, f'cmd_{name.lower()}', None)
+        if handler is None:
+            raise _Error(f"ERR unknown command '{name}'")
+        with self.store.lock:
+            return handler(*args[1:])
+
+    # -- connection --
+
+    def cmd_ping(self, message=None):
+        return message if message is not None else 'PONG'
+
+    def cmd_echo(self, message):
+        return message
+
+    def cmd_select(self, index):
+        self.db_index = int(index)
+        return 'OK'
+
+    def cmd_auth(self, *args):
+        return 'OK'
+
+    def cmd_client(self, *args):
+        return 'OK'
+
+    def cmd_command(self, *args):
+        return []
+
+    def cmd_info(self, *sections):
+        keys = sum(1 for db in self.store.dbs.values() for key in list(db) if self.store.live(db, key))
+        lines = [
+            '# Server', 'redis_version:7.0.0-fake',
+            '# Stats', f'keyspace_hits:{self.store.keyspace_hits}', f'keyspace_misses:{self.store.keyspace_misses}',
+            '# Keyspace', f'db{self.db_index}:keys={keys},expires=0',
+        ]
+        return ('\r\n'.join(lines) + '\r\n').encode()
+
+    # -- transactions --
+
+    def cmd_multi(self):
+        if self.queued is not None:
+            raise _Error('ERR MULTI calls can not be nested')
+        self.queued = []
+        return 'OK'
+
+    def cmd_discard(self):
+        self.queued = None
+        return 'OK'
+
+    def cmd_exec(self):
+        if self.queued is None:
+            raise _Error('ERR EXEC without MULTI')
+        queued, self.queued = self.queued, None
+        results = []
+        for args in queued:
+            try:
+                results.append(self.execute(args))
+            except _Error as exc:
+                results.append(exc)
+        return results
+
+    # -- keys --
+
+    def cmd_get(self, key):
+        entry = self.store.live(self.db, key)
+        if entry is None:
+            self.store.keyspace_misses += 1
+            return None
+        self.store.keyspace_hits += 1
+        return entry[0]
+
+    def cmd_mget(self, *keys):
+        return [self.cmd_get(key) for key in keys]
+
+    def cmd_set(self, key, value, *options):
+        options = [option.decode().upper() if isinstance(option, bytes) else option for option in options]
+        expires = None
+        nx = 'NX' in options
+        xx = 'XX' in options
+        for unit, scale in (('EX', 1), ('PX', 0.001)):
+            if unit in options:
+                expires = _expiry(int(options[options.index(unit) + 1]) * scale)
+        exists = self.store.live(self.db, key) is not None
+        if (nx and exists) or (xx and not exists):
+            return None
+        self.db[key] = (value, expires)
+        return 'OK'
+
+    def cmd_mset(self, *pairs):
+        for key, value in zip(pairs[::2], pairs[1::2]):
+            self.db[key] = (value, None)
+        return 'OK'
+
+    def cmd_del(self, *keys):
+        return sum(1 for key in keys if self.store.live(self.db, key) is not None and self.db.pop(key))
+
+    cmd_unlink = cmd_del
+
+    def cmd_exists(self, *keys):
+        return sum(1 for key in keys if self.store.live(self.db, key) is not None)
+
+    def cmd_incrby(self, key, delta):
+        entry = self.store.live(self.db, key)
+        try:
+            value = int(entry[0]) + int(delta) if entry else int(delta)
+        except ValueError:
+            raise _Error('ERR value is not an integer or out of range')
+        self.db[key] = (str(value).encode(), entry[1] if entry else None)
+        return value
+
+    def cmd_incr(self, key):
+        return self.cmd_incrby(key, b'1')
+
+    def cmd_decrby(self, key, delta):
+        return self.cmd_incrby(key, str(-int(delta)).encode())
+
+    def cmd_expire(self, key, seconds):
+        entry = self.store.live(self.db, key)
+        if entry is None:
+            return 0
+        if int(seconds) <= 0:
+            del self.db[key]
+        else:
+            self.db[key] = (entry[0], _expiry(int(seconds)))
+        return 1
+
+    def cmd_pexpire(self, key, milliseconds):
+        entry = self.store.live(self.db, key)
+        if entry is None:
+            return 0
+        self.db[key] = (entry[0], _expiry(int(milliseconds) / 1000))
+        return 1
+
+    def cmd_persist(self, key):
+        entry = self.store.live(self.db, key)
+        if entry is None or entry[1] is None:
+            return 0
+        self.db[key] = (entry[0], None)
+        return 1
+
+    def cmd_ttl(self, key):
+        entry = self.store.live(self.db, key)
+        if entry is None:
+            return -2
+        return -1 if entry[1] is None else max(0, round(entry[1] - time.monotonic()))
+
+    def cmd_keys(self, pattern):
+        pattern = pattern.decode()
+        return [key for key in list(self.db) if self.store.live(self.db, key) and fnmatch.fnmatchcase(key.decode(), pattern)]
+
+    def cmd_dbsize(self):
+        return sum(1 for key in list(self.db) if self.store.live(self.db, key))
+
+    def cmd_flushdb(self, *args):
+        self.db.clear()
+        return 'OK'
+
+    def cmd_flushall(self, *args):
+        self.store.dbs.clear()
+        return 'OK'
+
+
+def _encode(value):
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, _Error):
+        return f'-{value}\r\n'.encode()
+    if isinstance(value, str):
+        return f'+{value}\r\n'.encode()
+    if isinstance(value, bool) or isinstance(value, int):
+        return f':{int(value)}\r\n'.encode()
+    if isinstance(value, bytes):
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+    return b'*%d\r\n' % len(value) + b''.join(_encode(item) for item in value)
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            # Inline command (e.g. typed into telnet)
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def handle(self):
+        session = _Session(self.server.store)
+        while True:
+            try:
+                args = self.read_command()
+            except (ConnectionError, ValueError):
+                return
+            if args is None:
+                return
+            if not args:
+                continue
+            try:
+                reply = session.execute(args)
+            except _Error as exc:
+                reply = exc
+            except (TypeError, ValueError, IndexError):
+                reply = _Error(f"ERR wrong arguments for '{args[0].decode()}' command")
+            self.wfile.write(_encode(reply))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, store=None):
+        self.store = store or FakeRedisStore()
+        super().__init__(address, _RespHandler)
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def serve(address):
+    """Serve on host:port until interrupted (used by the fake_redis_server command)."""
+    server = FakeRedisServer(parse_address(address))
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -0,0 +1,155 @@
+"""
+Batch invoice export: every live invoice of a store owner in a date range, as one ZIP.
+
+Invoice HTML is built here (it needs the database), the HTML -> PDF step runs on a
+process pool, and finished PDFs are written into a ZIP that is streamed out entry by
+entry, so at most a small window of PDFs is ever held in memory. PDFs already in
+the on-disk cache (invoice_pdf.py) are reused and new ones are added to it.
+"""
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from django.db.models import Prefetch, Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .invoice_pdf import cached_invoice_pdf, invoice_content_hash, store_invoice_pdf
+from .invoices import init_pdf_process, invoice_pdf_filename, render_invoice_html, render_pdf_job
+from .models import Order, OrderItem
+
+ERRORS_FILENAME = 'ERRORS.txt'
+
+
+def invoice_orders(store_owner, start, end):
+    """Live orders whose invoice date (order date if unset) falls in [start, end], in invoice order."""
+    in_range = Q(invoice_date__range=(start, end)) | Q(
+        invoice_date__isnull=True,
+        order_date__date__range=(start, end),
+    )
+    return Order.objects.filter(in_range, store_owner=store_owner, is_deleted=False).select_related(
+        'customer',
+    ).prefetch_related(
+        Prefetch('items', queryset=OrderItem.objects.select_related('product').order_by('pk')),
+    ).order_by('order_number', 'pk')
+
+
+def default_workers():
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def iter_invoice_pdfs(store_owner, orders, *, base_url='', workers=None, request=None):
+    """
+    Yield (order, filename, pdf_bytes or None, error or None) in order. Up to
+    2 x workers renders are in flight at once.
+    """
+    workers = workers or default_workers()
+    window = []
+
+    def finish(entry):
+        order, filename, digest, pdf_bytes, future = entry
+        error = None
+        if future is not None:
+            pdf_bytes, error = future.result()
+            if pdf_bytes is not None:
+                store_invoice_pdf(store_owner, order, digest, pdf_bytes)
+        return order, filename, pdf_bytes, error
+
+    # spawn, not fork: children must not share this process's DB connection or browser threads
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_pdf_process,
+    )
+    with pool:
+        try:
+            for order in orders:
+                items = list(order.items.all())
+                filename = invoice_pdf_filename(order)
+                digest = invoice_content_hash(store_owner, order, items, base_url)
+                cached = cached_invoice_pdf(store_owner, order, digest)
+                if cached is not None:
+                    window.append((order, filename, digest, cached.read_bytes(), None))
+                else:
+                    html_string = render_invoice_html(store_owner, order, as_pdf=True, request=request, items=items)
+                    window.append((order, filename, digest, None, pool.submit(render_pdf_job, html_string, base_url)))
+                while len(window) >= workers * 2 or (window and window[0][4] is None):
+                    yield finish(window.pop(0))
+            while window:
+                yield finish(window.pop(0))
+        finally:
+            # Client went away mid-download: do not render the rest
+            for entry in window:
+                if entry[4] is not None:
+                    entry[4].cancel()
+
+
+class _ChunkSink:
+    """Write-only file object for ZipFile; the ZIP bytes are collected and handed out per entry."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _zip_timestamp(order):
+    stamp = order.order_date
+    if timezone.is_aware(stamp):
+        stamp = timezone.make_naive(stamp)
+    return max(stamp, datetime(1980, 1, 1)).timetuple()[:6]
+
+
+def iter_invoice_zip(invoices):
+    """Stream a ZIP of (order, filename, pdf_bytes, error) entries; failures go to ERRORS.txt."""
+    sink = _ChunkSink()
+    errors = []
+    # PDFs are already compressed, so store them as-is
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for order, filename, pdf_bytes, error in invoices:
+            if pdf_bytes is None:
+                errors.append(f'{filename}: {error}')
+                continue
+            archive.writestr(zipfile.ZipInfo(filename, _zip_timestamp(order)), pdf_bytes)
+            yield sink.drain()
+        if errors:
+            archive.writestr(ERRORS_FILENAME, '\n'.join(errors) + '\n')
+    yield sink.drain()
+
+
+def parse_export_range(start, end):
+    """(start_date, end_date) from YYYY-MM-DD strings; raises ValueError on bad input."""
+    start_date = datetime.strptime(start, '%Y-%m-%d').date()
+    end_date = datetime.strptime(end, '%Y-%m-%d').date()
+    if end_date < start_date:
+        raise ValueError('End date is before start date.')
+    return start_date, end_date
+
+
+def invoice_zip_filename(store_owner, start, end):
+    return f'invoices_{store_owner.username}_{start:%Y%m%d}_{end:%Y%m%d}.zip'
+
+
+def invoice_zip_response(store_owner, start, end, *, base_url='', workers=None, request=None):
+    invoices = iter_invoice_pdfs(
+        store_owner,
+        invoice_orders(store_owner, start, end).iterator(chunk_size=100),
+        base_url=base_url,
+        workers=workers,
+        request=request,
+    )
+    response = StreamingHttpResponse(iter_invoice_zip(invoices), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{invoice_zip_filename(store_owner, start, end)}"'
+    return response
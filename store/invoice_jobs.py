@@ -0,0 +1,137 @@
+"""
+Database-backed queue for invoice PDF renders (no external broker).
+
+A request calls enqueue_invoice_pdf() and gets an InvoicePdfJob back immediately;
+`python manage.py run_invoice_jobs` claims jobs with a conditional UPDATE (only one
+worker can move a row from pending to running), renders the PDF into the on-disk
+invoice cache and marks the job done. A job left running by a killed worker is
+re-queued once it is older than INVOICE_PDF_JOB_STALE_SECONDS.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .invoice_pdf import cached_invoice_pdf, invoice_content_hash, store_invoice_pdf
+from .invoices import invoice_html_to_pdf, order_lines, render_invoice_html
+from .models import InvoicePdfJob
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_invoice_pdf(store_owner, order, base_url=''):
+    """
+    Job for this order's current invoice content. Reuses a pending/running job or a
+    finished one whose file is still cached; a cache hit is recorded as done at once.
+    """
+    digest = invoice_content_hash(store_owner, order, order_lines(order), base_url)
+    existing = InvoicePdfJob.objects.filter(
+        order=order,
+        content_hash=digest,
+        status__in=[InvoicePdfJob.STATUS_PENDING, InvoicePdfJob.STATUS_RUNNING, InvoicePdfJob.STATUS_DONE],
+    ).order_by('-pk').first()
+    if existing is not None and (
+        existing.status != InvoicePdfJob.STATUS_DONE or cached_invoice_pdf(store_owner, order, digest)
+    ):
+        return existing
+
+    job = InvoicePdfJob(store_owner=store_owner, order=order, content_hash=digest, base_url=base_url)
+    if cached_invoice_pdf(store_owner, order, digest):
+        job.status = InvoicePdfJob.STATUS_DONE
+        job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def job_pdf_path(job):
+    """Path of the finished PDF, or None if the job is not done or the file was cleaned up."""
+    if job.status != InvoicePdfJob.STATUS_DONE:
+        return None
+    return cached_invoice_pdf(job.store_owner, job.order, job.content_hash)
+
+
+def claim_next_job(worker_name):
+    """Atomically take the oldest claimable job for this worker; None if the queue is empty."""
+    stale_before = timezone.now() - timedelta(seconds=settings.INVOICE_PDF_JOB_STALE_SECONDS)
+    claimable = Q(status=InvoicePdfJob.STATUS_PENDING) | Q(
+        status=InvoicePdfJob.STATUS_RUNNING,
+        started_at__lt=stale_before,
+    )
+    for _ in range(5):
+        candidate = InvoicePdfJob.objects.filter(claimable).order_by('created_at', 'pk').values_list(
+            'pk', 'status', 'started_at',
+        ).first()
+        if candidate is None:
+            return None
+        pk, status, started_at = candidate
+        # Only matches if nobody else claimed the row since we read it
+        claimed = InvoicePdfJob.objects.filter(pk=pk, status=status, started_at=started_at).update(
+            status=InvoicePdfJob.STATUS_RUNNING,
+            worker=worker_name,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return InvoicePdfJob.objects.select_related('store_owner', 'order', 'order__customer').get(pk=pk)
+    return None
+
+
+def run_job(job):
+    """Render the job's invoice into the cache and record the outcome."""
+    store_owner, order = job.store_owner, job.order
+    try:
+        items = order_lines(order)
+        # The invoice may have changed since it was queued; render what it is now
+        digest = invoice_content_hash(store_owner, order, items, job.base_url)
+        if cached_invoice_pdf(store_owner, order, digest) is None:
+            html_string = render_invoice_html(store_owner, order, as_pdf=True, items=items)
+            pdf_bytes = invoice_html_to_pdf(html_string, job.base_url)
+            store_invoice_pdf(store_owner, order, digest, pdf_bytes)
+    except Exception as exc:
+        # Anything from a template error to both renderers failing: retry, then give up
+        retry = job.attempts < settings.INVOICE_PDF_JOB_MAX_ATTEMPTS
+        InvoicePdfJob.objects.filter(pk=job.pk).update(
+            status=InvoicePdfJob.STATUS_PENDING if retry else InvoicePdfJob.STATUS_FAILED,
+            error=str(exc),
+            finished_at=None if retry else timezone.now(),
+        )
+        logger.warning('Invoice PDF job %s failed (attempt %s): %s', job.pk, job.attempts, exc)
+        return False
+
+    InvoicePdfJob.objects.filter(pk=job.pk).update(
+        status=InvoicePdfJob.STATUS_DONE,
+        content_hash=digest,
+        error='',
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def work(worker_name, *, poll_interval=1.0, stop=None, drain=False):
+    """
+    Claim and run jobs until `stop` is set (or, with drain=True, until the queue is
+    empty). Returns (done, failed) counts.
+    """
+    stop = stop or threading.Event()
+    done = failed = 0
+    while not stop.is_set():
+        close_old_connections()
+        job = claim_next_job(worker_name)
+        if job is None:
+            if drain:
+                break
+            stop.wait(poll_interval)
+            continue
+        started = time.monotonic()
+        if run_job(job):
+            done += 1
+            logger.info('Invoice PDF job %s done in %.2fs', job.pk, time.monotonic() - started)
+        else:
+            failed += 1
+    close_old_connections()
+    return done, failed
@@ -0,0 +1,107 @@
+"""
+On-disk cache of rendered invoice PDFs.
+
+Files live under MEDIA_ROOT/invoices/<owner>/<order id>/<hash>.pdf, where the hash
+covers everything build_invoice_context() and the invoice template read: the order,
+its customer, the lines and the product fields printed on them, the company details
+and the template source. Editing any of those changes the hash, so a stale PDF is
+never served; the superseded file is removed when the new one is written.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import get_template
+
+INVOICE_TEMPLATE = 'invoice_template.html'
+INVOICE_PDF_DIR = 'invoices'
+# Bump when the PDF rendering itself changes (renderer, page size, margins) to drop every cached file
+INVOICE_PDF_CACHE_VERSION = 1
+# Product fields printed on (or used to price) an invoice line; stock counts are left out on purpose
+INVOICE_PRODUCT_FIELDS = ('name', 'hsn_code', 'gst', 'igst', 'measurement_type', 'unit_value', 'unit_capacity')
+
+
+def _field_values(obj, fields=None):
+    if fields is None:
+        fields = [f.attname for f in obj._meta.concrete_fields]
+    return [(name, getattr(obj, name)) for name in fields]
+
+
+@lru_cache(maxsize=8)
+def _file_digest(path, mtime_ns):
+    with open(path, 'rb') as fh:
+        return hashlib.sha256(fh.read()).hexdigest()
+
+
+def invoice_template_version():
+    """Digest of the invoice template source (re-read only when the file changes)."""
+    path = get_template(INVOICE_TEMPLATE).origin.name
+    return _file_digest(path, os.stat(path).st_mtime_ns)
+
+
+def invoice_content_hash(store_owner, order, items, base_url=''):
+    """Hash of the invoice inputs; `items` are the order's lines with their products loaded."""
+    payload = {
+        'version': INVOICE_PDF_CACHE_VERSION,
+        'template': invoice_template_version(),
+        'base_url': base_url,
+        'store_owner': store_owner.username,
+        'company': store_owner.get_company_details(),
+        'order': _field_values(order),
+        'customer': _field_values(order.customer),
+        'items': [
+            (_field_values(item), _field_values(item.product, INVOICE_PRODUCT_FIELDS))
+            for item in items
+        ],
+    }
+    encoded = json.dumps(payload, default=str, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _safe_part(value):
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(value))
+
+
+def invoice_pdf_dir(store_owner, order):
+    return Path(settings.MEDIA_ROOT) / INVOICE_PDF_DIR / _safe_part(store_owner.pk) / str(order.pk)
+
+
+def cached_invoice_pdf(store_owner, order, digest):
+    """Path of the cached PDF for this content hash, or None if it has not been rendered yet."""
+    path = invoice_pdf_dir(store_owner, order) / f'{digest}.pdf'
+    return path if path.is_file() else None
+
+
+def store_invoice_pdf(store_owner, order, digest, pdf_bytes):
+    """
+    Write the PDF atomically (temp file + os.replace, so readers never see a partial
+    file) and remove older renderings of the same order. Returns the path.
+    """
+    directory = invoice_pdf_dir(store_owner, order)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{digest}.pdf'
+
+    fd, tmp_name = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(pdf_bytes)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    for stale in directory.glob('*.pdf'):
+        if stale != path:
+            try:
+                stale.unlink()
+            except OSError:
+                # Already removed by a concurrent writer
+                pass
+    return path
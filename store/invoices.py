@@ -0,0 +1,225 @@
+"""
+Invoice rendering shared by the invoice views, the batch ZIP export and commands:
+the template context, invoice HTML, and HTML -> PDF with the xhtml2pdf fallback.
+"""
+import hashlib
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.template.loader import render_to_string
+
+from .invoice_pdf import INVOICE_TEMPLATE
+from .pdf_renderer import render_invoice_pdf, reset_browser_pool
+from .tax import add_tax, uses_igst
+
+
+INVOICE_HEADER_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+class PdfUnavailable(Exception):
+    """Neither Chromium nor xhtml2pdf could render the invoice."""
+
+    def __init__(self, playwright_error, xhtml2pdf_error):
+        self.playwright_error = playwright_error
+        self.xhtml2pdf_error = xhtml2pdf_error
+        super().__init__(f'Playwright error: {playwright_error}; xhtml2pdf error: {xhtml2pdf_error}')
+
+
+def order_lines(order):
+    """The order's lines with their products in one query, in checkout order."""
+    return list(order.items.select_related('product').order_by('pk'))
+
+
+def invoice_line_amounts(items):
+    """
+    Tax breakdown of order lines, one dict per item. Uses the amounts stored on the
+    OrderItem at checkout; lines saved before those fields existed are recomputed
+    together from the product's rates with store.tax. IGST takes priority over
+    CGST + SGST, as at checkout.
+    """
+    amounts = []
+    legacy = []
+    for item in items:
+        product = item.product
+        line_uses_igst = uses_igst(product.igst)
+        line = {
+            'uses_igst': line_uses_igst,
+            'rate': Decimal(str(product.igst if line_uses_igst else product.gst)),
+            'subtotal': item.subtotal,
+            'cgst_amount': item.cgst_amount,
+            'sgst_amount': item.sgst_amount,
+            'gst_amount': item.gst_amount,
+            'igst_amount': item.igst_amount,
+        }
+        if None in (item.subtotal, item.cgst_amount, item.sgst_amount, item.gst_amount, item.igst_amount):
+            legacy.append((item, line))
+        amounts.append(line)
+    if legacy:
+        taxes = add_tax(
+            [item.item_price * item.quantity for item, _ in legacy],
+            [item.product.gst for item, _ in legacy],
+            [item.product.igst for item, _ in legacy],
+        )
+        for index, (_, line) in enumerate(legacy):
+            line['subtotal'] = taxes.taxable[index]
+            line['cgst_amount'] = taxes.cgst[index]
+            line['sgst_amount'] = taxes.sgst[index]
+            line['gst_amount'] = taxes.gst[index]
+            line['igst_amount'] = taxes.igst[index]
+    return amounts
+
+
+def _compute_invoice_line_items(order, items=None):
+    """
+    Attach per-line subtotals/GST/IGST to items and build the per-rate summary in one
+    pass; set order subtotal/total_* fields. `items` are the lines with products
+    loaded (order_lines() if not given), so the query count does not depend on the
+    number of lines.
+    """
+    invoice_items = order_lines(order) if items is None else items
+    gst_summary = {}
+    order_subtotal = Decimal('0.00')
+    order_total_cgst = Decimal('0.00')
+    order_total_sgst = Decimal('0.00')
+    order_total_igst = Decimal('0.00')
+    invoice_items = list(invoice_items)
+    for item, amounts in zip(invoice_items, invoice_line_amounts(invoice_items)):
+        item.subtotal = amounts['subtotal']
+        item.cgst_amount = amounts['cgst_amount']
+        item.sgst_amount = amounts['sgst_amount']
+        item.gst_amount = amounts['gst_amount']
+        item.igst_amount = amounts['igst_amount']
+
+        rate = float(amounts['rate'])
+        tax_type = 'IGST' if amounts['uses_igst'] else 'GST'
+        key = f'{tax_type}_{rate}'
+        if key not in gst_summary:
+            gst_summary[key] = {
+                'rate': rate,
+                'tax_type': tax_type,
+                'taxable_amount': Decimal('0.00'),
+                'cgst': Decimal('0.00'),
+                'sgst': Decimal('0.00'),
+                'igst': Decimal('0.00'),
+                'total_gst': Decimal('0.00'),
+            }
+        summary = gst_summary[key]
+        summary['taxable_amount'] += item.subtotal
+        summary['cgst'] += item.cgst_amount
+        summary['sgst'] += item.sgst_amount
+        summary['igst'] += item.igst_amount
+        # CGST + SGST rather than the stored GST so the summary row adds up across
+        summary['total_gst'] += item.igst_amount if amounts['uses_igst'] else item.cgst_amount + item.sgst_amount
+
+        order_subtotal += item.subtotal
+        order_total_cgst += item.cgst_amount
+        order_total_sgst += item.sgst_amount
+        order_total_igst += item.igst_amount
+    order.subtotal = order_subtotal
+    order.total_cgst = order_total_cgst
+    order.total_sgst = order_total_sgst
+    order.total_gst = order_total_cgst + order_total_sgst
+    order.total_igst = order_total_igst
+    return invoice_items, gst_summary
+
+
+# Optional fields the invoice template tests for that the models do not (yet) have.
+# Setting them up front avoids a failed lookup per reference, which Django's template
+# engine follows with a costly dir() on the model instance.
+_OPTIONAL_CUSTOMER_FIELDS = ('address', 'address2', 'city', 'state', 'pincode', 'gstin')
+_OPTIONAL_ORDER_FIELDS = ('discount', 'shipping_charges')
+_OPTIONAL_PRODUCT_FIELDS = ('description',)
+
+
+def _fill_optional(obj, names):
+    for name in names:
+        if not hasattr(obj, name):
+            setattr(obj, name, None)
+
+
+def company_version(company_details):
+    """Short digest of the company details; keys the cached invoice header fragment."""
+    encoded = repr(sorted(company_details.items())).encode('utf-8')
+    return hashlib.md5(encoded, usedforsecurity=False).hexdigest()[:16]
+
+
+def build_invoice_context(store_owner, order, *, as_pdf=False, items=None):
+    company_details = store_owner.get_company_details()
+    company = SimpleNamespace(**company_details)
+    updated_items, gst_summary = _compute_invoice_line_items(order, items)
+    order.get_amount_in_words = lambda: f"Rupees {int(order.total_price)} Only"
+    if not getattr(order, 'invoice_number', None):
+        order.invoice_number = f"INV-{order.id}-{order.order_date.strftime('%Y%m')}"
+    _fill_optional(order, _OPTIONAL_ORDER_FIELDS)
+    _fill_optional(order.customer, _OPTIONAL_CUSTOMER_FIELDS)
+    for item in updated_items:
+        _fill_optional(item.product, _OPTIONAL_PRODUCT_FIELDS)
+    total_gst = order.total_gst if order.total_gst is not None else Decimal('0')
+    return {
+        'order': order,
+        'invoice': order,
+        'company': company,
+        # Header fragment cache key: changes whenever the owner edits company details
+        'company_version': company_version(company_details),
+        'company_cache_timeout': INVOICE_HEADER_CACHE_TIMEOUT,
+        'customer': order.customer,
+        'store_owner': store_owner,
+        'invoice_items': updated_items,
+        'gst_summary': list(gst_summary.values()),
+        'gst_total': total_gst,
+        'show_gst_summary': total_gst > 0,
+        'as_pdf': as_pdf,
+    }
+
+
+def render_invoice_html(store_owner, order, *, as_pdf=True, request=None, items=None):
+    context = build_invoice_context(store_owner, order, as_pdf=as_pdf, items=items)
+    return render_to_string(INVOICE_TEMPLATE, context, request=request)
+
+
+def invoice_pdf_filename(order):
+    inv = getattr(order, 'invoice_number', None) or f"INV-{order.id}-{order.order_date.strftime('%Y%m')}"
+    safe_inv = ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(inv))
+    return f'invoice_{safe_inv}.pdf'
+
+
+def _invoice_html_to_pdf_xhtml2pdf(html_string: str) -> bytes:
+    """Render invoice HTML to PDF using xhtml2pdf (pure Python, no browser needed)."""
+    from io import BytesIO
+    from xhtml2pdf import pisa
+
+    result_buffer = BytesIO()
+    pisa_status = pisa.CreatePDF(html_string, dest=result_buffer)
+    if pisa_status.err:
+        raise RuntimeError(f'xhtml2pdf conversion error (code {pisa_status.err})')
+    return result_buffer.getvalue()
+
+
+def invoice_html_to_pdf(html_string: str, base_url: str = '') -> bytes:
+    """PDF bytes via the warm Chromium pool, falling back to xhtml2pdf; raises PdfUnavailable."""
+    try:
+        return render_invoice_pdf(html_string, base_url)
+    except Exception as playwright_err:
+        try:
+            return _invoice_html_to_pdf_xhtml2pdf(html_string)
+        except Exception as xhtml_err:
+            raise PdfUnavailable(playwright_err, xhtml_err)
+
+
+# Process-pool entry points for batch rendering. This module must stay importable
+# before django.setup() (no model imports at module level) so spawned children can load them.
+
+def init_pdf_process():
+    import django
+
+    django.setup()
+    # One browser per process; the number of processes gives the parallelism
+    reset_browser_pool(size=1)
+
+
+def render_pdf_job(html_string, base_url=''):
+    """Returns (pdf_bytes, None) or (None, error message) so one bad invoice does not abort a batch."""
+    try:
+        return invoice_html_to_pdf(html_string, base_url), None
+    except PdfUnavailable as exc:
+        return None, str(exc)
@@ -3,8 +3,13 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from .models import Product
 from .forms import AddProductForm, UpdateProductForm
+from .product_import import ProductImportError, import_products, read_rows
+from .stock_ledger import record_adjustment, record_purchase_edit, record_return
+
+IMPORT_FAILURES_SHOWN = 100
 
 
 @login_required
@@ -39,6 +44,40 @@ def add_new_product(request):
     return render(request, 'add_product.html', {'form': form, 'ad_section': ad_section})
 
 
+@login_required
+def import_products_view(request):
+    """Bulk-add products from an uploaded supplier sheet (.csv / .xlsx)."""
+    result = None
+    if request.method == 'POST':
+        upload = request.FILES.get('sheet')
+        dry_run = request.POST.get('dry_run') == '1'
+        if upload is None:
+            messages.error(request, 'Choose a .csv or .xlsx file to import.')
+        else:
+            try:
+                result = import_products(
+                    request.user,
+                    read_rows(upload.file, upload.name),
+                    strict=request.POST.get('strict') == '1',
+                    dry_run=dry_run,
+                )
+            except ProductImportError as exc:
+                messages.error(request, f'{upload.name}: {exc}')
+            else:
+                if dry_run:
+                    messages.info(request, f'{result.valid} of {result.rows} rows are valid; nothing was saved.')
+                elif result.saved:
+                    messages.success(request, f'Imported {result.created} of {result.rows} products.')
+                else:
+                    messages.error(request, f'{result.failed} rows were rejected; nothing was saved.')
+
+    return render(request, 'import_products.html', {
+        'result': result,
+        'failures': result.failures[:IMPORT_FAILURES_SHOWN] if result else [],
+        'columns': [AddProductForm._meta.labels[name] for name in AddProductForm._meta.fields if name != 'image'],
+    })
+
+
 @login_required
 def update_existing_product(request, product_id=None):
     """Update an existing product in the logged-in user's store."""
@@ -58,6 +97,7 @@ def update_existing_product(request, product_id=None):
             messages.error(request, 'No product selected.')
             return redirect('update_product')
         product = get_object_or_404(Product, id=pid, store_owner=request.user)
+        quantity_before = product.quantity
         form = UpdateProductForm(
             request.POST,
             request.FILES,
@@ -66,7 +106,10 @@ def update_existing_product(request, product_id=None):
             ad_section=ad_section,
         )
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                form.save()
+                record_purchase_edit(product)
+                record_adjustment(product, quantity_before)
             messages.success(request, f'Product "{product.name}" updated successfully!')
             return redirect('product_list')
     elif product:
@@ -193,24 +236,28 @@ def return_product_view(request, product_id):
             messages.error(request, 'Entered returned_stock is more than the current_stock !!')
             return redirect('return_product', product_id=product.id)
 
-        # 1. Reduce stock
-        product.quantity -= stock_returned
-        product.save()
-
-        # 2. Save return record
-        ProductReturn.objects.create(
-            purchase_invoice_number=product.purchase_invoice_number,
-            product=product,
-            returned_invoice_number=returned_invoice_number,
-            stock_returned=stock_returned,
-            current_stock=product.quantity,
-            return_date=return_date,
-            taxable_unit_amount=taxable_unit_amount,
-            gst=gst,
-            taxable_total_amount=taxable_total_amount,
-            total_amount=total_amount,
-            notes=notes
-        )
+        with transaction.atomic():
+            # 1. Reduce stock
+            product.quantity -= stock_returned
+            product.save()
+
+            # 2. Save return record
+            product_return = ProductReturn.objects.create(
+                purchase_invoice_number=product.purchase_invoice_number,
+                product=product,
+                returned_invoice_number=returned_invoice_number,
+                stock_returned=stock_returned,
+                current_stock=product.quantity,
+                return_date=return_date,
+                taxable_unit_amount=taxable_unit_amount,
+                gst=gst,
+                taxable_total_amount=taxable_total_amount,
+                total_amount=total_amount,
+                notes=notes
+            )
+
+            # 3. Record it in the stock ledger
+            record_return(product_return)
         messages.success(request, f'Return for "{product.name}" processed successfully!')
         return redirect('product_list')
 
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from store.models import Order, SalesReport
+
+
+class Command(BaseCommand):
+    help = 'Copy Order.is_deleted onto SalesReport.is_deleted (run once after adding the field).'
+
+    def handle(self, *args, **options):
+        order_deleted = Order.objects.filter(pk=OuterRef('order_id')).values('is_deleted')[:1]
+        with transaction.atomic():
+            updated = SalesReport.objects.update(is_deleted=Subquery(order_deleted))
+        deleted = SalesReport.objects.filter(is_deleted=True).count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Synced is_deleted on {updated} sales rows ({deleted} belong to deleted invoices).'
+        ))
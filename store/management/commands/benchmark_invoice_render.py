@@ -0,0 +1,86 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.template import Context, engines
+from django.template.engine import Engine
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import CustomUser
+from store.invoice_pdf import INVOICE_TEMPLATE
+from store.invoices import build_invoice_context, order_lines
+from store.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        'Time invoice HTML rendering for one order: template parsed on every call vs the '
+        'cached loader, with the company header fragment cache cold and warm.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Username of the store owner')
+        parser.add_argument('--order', type=int, help='Order id (default: the owner\'s latest live order)')
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def timed(self, label, iterations, func):
+        func()  # warm-up
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        per_call = (time.perf_counter() - started) / iterations * 1000
+        self.stdout.write(f'  {label:<44} {per_call:8.3f} ms')
+        return per_call
+
+    def handle(self, *args, **options):
+        try:
+            store_owner = CustomUser.objects.get(username=options['user'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"Store owner '{options['user']}' does not exist.")
+        orders = Order.objects.filter(store_owner=store_owner, is_deleted=False)
+        order = orders.filter(pk=options['order']).first() if options['order'] else orders.order_by('-pk').first()
+        if order is None:
+            raise CommandError('No matching order.')
+
+        iterations = options['iterations']
+        with CaptureQueriesContext(connection) as queries:
+            items = order_lines(order)
+            context = build_invoice_context(store_owner, order, as_pdf=True, items=items)
+        self.stdout.write(
+            f'Order {order.pk} ({len(items)} lines), {iterations} iterations; '
+            f'context built with {len(queries.captured_queries)} queries'
+        )
+
+        django_engine = engines['django'].engine
+        uncached_engine = Engine(
+            dirs=django_engine.dirs,
+            libraries=django_engine.libraries,
+            loaders=['django.template.loaders.filesystem.Loader', 'django.template.loaders.app_directories.Loader'],
+        )
+        cached_template = django_engine.get_template(INVOICE_TEMPLATE)
+        header_key_parts = ('invoice_company_header', store_owner.pk, context['company_version'])
+
+        def parse_and_render():
+            cache.clear()
+            uncached_engine.get_template(INVOICE_TEMPLATE).render(Context(context))
+
+        def render_cold_header():
+            cache.clear()
+            cached_template.render(Context(context))
+
+        def render_warm_header():
+            cached_template.render(Context(context))
+
+        def build_context():
+            build_invoice_context(store_owner, order, as_pdf=True, items=items)
+
+        self.stdout.write('Per call:')
+        self.timed('build_invoice_context', iterations, build_context)
+        baseline = self.timed('parse + render (no template caching)', iterations, parse_and_render)
+        self.timed('cached template, header fragment cold', iterations, render_cold_header)
+        warm = self.timed('cached template, header fragment warm', iterations, render_warm_header)
+        self.stdout.write(self.style.SUCCESS(
+            f'Repeat render is {baseline / warm:.1f}x faster than parsing each time '
+            f'(header cached under {":".join(str(part) for part in header_key_parts)}).'
+        ))
@@ -0,0 +1,134 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.money import Money
+from store.tax import add_tax, extract_tax
+from store.views import STOCK_REPORT_SUMMARY_FIELDS, _stock_report_category_summary, _stock_report_totals
+
+
+def _decimal_totals(stock_details):
+    """The stock report totals as they were summed before store.money."""
+    totals = dict.fromkeys(STOCK_REPORT_SUMMARY_FIELDS, Decimal('0.00'))
+    for d in stock_details:
+        totals['total_taxable_stock_value'] += d['taxable_stock_value']
+        totals['total_stock_value'] += d['total_stock_value']
+        totals['total_taxable_sales_value'] += d['taxable_sales_amount']
+        totals['total_sales_value'] += d['total_sales_amount']
+        totals['total_gst_collected'] += (d['cgst_amount'] + d['sgst_amount'])
+        totals['total_igst_collected'] += d['igst_amount']
+    return totals
+
+
+def _decimal_category_summary(stock_details):
+    summary = {}
+    for d in stock_details:
+        totals = summary.setdefault(d['category'], dict.fromkeys(STOCK_REPORT_SUMMARY_FIELDS, Decimal('0.00')))
+        totals['total_taxable_stock_value'] += d['taxable_stock_value']
+        totals['total_stock_value'] += d['total_stock_value']
+        totals['total_taxable_sales_value'] += d['taxable_sales_amount']
+        totals['total_sales_value'] += d['total_sales_amount']
+        totals['total_gst_collected'] += (d['cgst_amount'] + d['sgst_amount'])
+        totals['total_igst_collected'] += d['igst_amount']
+    return summary
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the stock report totals, category summary and analytics JSON sums with '
+        'Decimal rupees vs integer paise (store.money) on synthetic rows, and check both '
+        'give the same two-place figures. Needs no database rows.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000)
+        parser.add_argument('--iterations', type=int, default=5)
+
+    def timed(self, iterations, func):
+        result = func()
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - started) / iterations * 1000, result
+
+    def synthetic_details(self, count):
+        """Stock report detail rows twice over: Decimal columns and Money columns."""
+        rng = random.Random(7)
+        categories = ['Grains', 'Spices', 'Dairy', 'Pulses', 'Oils', 'General']
+        rates = [Decimal('0'), Decimal('5'), Decimal('12'), Decimal('18'), Decimal('28')]
+        stock = [Decimal(rng.randint(0, 500000)) / 100 for _ in range(count)]
+        sales = [Decimal(rng.randint(0, 900000)) / 100 for _ in range(count)]
+        gst = [rng.choice(rates) for _ in range(count)]
+        igst = [rng.choice(rates) if rng.random() < 0.2 else Decimal('0') for _ in range(count)]
+        stock_taxes = add_tax(stock, gst, igst)
+        sales_taxes = extract_tax(sales, gst, igst)
+
+        columns = {
+            'taxable_stock_value': (stock_taxes, 'taxable'),
+            'total_stock_value': (stock_taxes, 'total'),
+            'taxable_sales_amount': (sales_taxes, 'taxable'),
+            'total_sales_amount': (sales_taxes, 'total'),
+            'cgst_amount': (sales_taxes, 'cgst'),
+            'sgst_amount': (sales_taxes, 'sgst'),
+            'igst_amount': (sales_taxes, 'igst'),
+        }
+        decimal_columns = {key: getattr(taxes, name) for key, (taxes, name) in columns.items()}
+        money_columns = {key: taxes.money(name) for key, (taxes, name) in columns.items()}
+        common = [
+            {'category': rng.choice(categories), 'current_stock': rng.randint(0, 50), 'sold_quantity': rng.randint(0, 20)}
+            for _ in range(count)
+        ]
+        decimal_rows = [dict(row, **{key: column[i] for key, column in decimal_columns.items()}) for i, row in enumerate(common)]
+        money_rows = [dict(row, **{key: column[i] for key, column in money_columns.items()}) for i, row in enumerate(common)]
+        return decimal_rows, money_rows
+
+    def compare(self, label, iterations, decimal_func, money_func):
+        decimal_ms, expected = self.timed(iterations, decimal_func)
+        money_ms, actual = self.timed(iterations, money_func)
+        self.stdout.write(f'  {label:<24} {decimal_ms:9.2f}ms {money_ms:9.2f}ms {decimal_ms / money_ms:7.2f}x')
+        return expected, actual
+
+    def assert_same(self, label, expected, actual):
+        mismatched = [key for key in expected if f'{expected[key]:.2f}' != f'{actual[key]:.2f}']
+        if mismatched:
+            raise CommandError(f'{label}: paise totals differ from Decimal for {", ".join(mismatched)}.')
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1:
+            raise CommandError('--rows must be at least 1.')
+        decimal_rows, money_rows = self.synthetic_details(options['rows'])
+        iterations = options['iterations']
+        self.stdout.write(f'{options["rows"]} rows, {iterations} iterations')
+        self.stdout.write(f'  {"":<24} {"Decimal":>11} {"paise":>11} {"speedup":>8}')
+
+        expected, actual = self.compare(
+            'report totals', iterations,
+            lambda: _decimal_totals(decimal_rows), lambda: _stock_report_totals(money_rows),
+        )
+        self.assert_same('report totals', expected, actual)
+
+        expected, actual = self.compare(
+            'category summary', iterations,
+            lambda: _decimal_category_summary(decimal_rows), lambda: _stock_report_category_summary(money_rows),
+        )
+        for category, totals in expected.items():
+            self.assert_same(f'category {category}', totals, actual[category])
+
+        expected, actual = self.compare(
+            'JSON float sums', iterations,
+            lambda: {'sales': sum(float(d['total_sales_amount']) for d in decimal_rows)},
+            lambda: {'sales': float(Money.sum(d['total_sales_amount'] for d in money_rows))},
+        )
+        self.assert_same('JSON float sums', expected, actual)
+
+        expected, actual = self.compare(
+            'JSON float columns', iterations,
+            lambda: [float(d['cgst_amount']) for d in decimal_rows],
+            lambda: [float(d['cgst_amount']) for d in money_rows],
+        )
+        if expected != actual:
+            raise CommandError('JSON float columns: paise floats differ from Decimal.')
+
+        self.stdout.write(self.style.SUCCESS('Decimal and paise figures match.'))
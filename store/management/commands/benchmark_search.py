@@ -0,0 +1,106 @@
+import random
+import string
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.models import CustomUser
+from store.models import Product, ShopCustomer
+from store.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the indexed search backend with the old icontains filter on a store\'s '
+        'products and customers: time per query and overlap of the results.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Username of the store owner')
+        parser.add_argument('--query', action='append', dest='queries', help='Search text (repeatable)')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument(
+            '--synthetic', type=int, default=0,
+            help='Add this many throw-away products and customers first (rolled back afterwards)',
+        )
+
+    def timed(self, iterations, func):
+        result = func()
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - started) / iterations * 1000, result
+
+    def add_synthetic_rows(self, store_owner, count):
+        rng = random.Random(7)
+        words = ['rice', 'basmati', 'sugar', 'turmeric', 'masala', 'ghee', 'atta', 'dal', 'jaggery', 'oil']
+        categories = ['Grains', 'Spices', 'Dairy', 'Pulses', 'Oils', None]
+        today = date.today()
+        Product.objects.bulk_create([
+            Product(
+                store_owner=store_owner,
+                purchased_from='Bench Supplier',
+                purchase_date=today,
+                purchase_invoice_number=f'BENCH-{i}',
+                name=f'{rng.choice(words).title()} {rng.choice(words)} {i}',
+                category=rng.choice(categories),
+                hsn_code=str(rng.randint(1000, 9999)),
+                batch_number=''.join(rng.choices(string.ascii_uppercase + string.digits, k=8)),
+                price=Decimal('0'),
+            )
+            for i in range(count)
+        ], batch_size=1000)
+        ShopCustomer.objects.bulk_create([
+            ShopCustomer(
+                store_owner=store_owner,
+                phone=f'8{i:09d}',
+                name=f'{rng.choice(["Asha", "Ravi", "Meena", "Arjun", "Kiran"])} {rng.choice(["Rao", "Patel", "Iyer"])} {i}',
+                email=f'bench{i}@example.com',
+                place=rng.choice(['Mysuru', 'Pune', 'Chennai', 'Hubli']),
+            )
+            for i in range(count)
+        ], batch_size=1000)
+
+    def handle(self, *args, **options):
+        try:
+            store_owner = CustomUser.objects.get(username=options['user'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"Store owner '{options['user']}' does not exist.")
+
+        indexed = get_search_backend('auto')
+        plain = get_search_backend('icontains')
+        queries = options['queries'] or ['rice', 'masala 12', 'Patel', '98765', 'Mysuru']
+
+        with transaction.atomic():
+            if options['synthetic']:
+                self.add_synthetic_rows(store_owner, options['synthetic'])
+            if not indexed.is_installed():
+                self.stdout.write(self.style.WARNING(
+                    f'{indexed.name} index is not installed (run build_search_index); timing the fallback.'
+                ))
+            products = Product.objects.filter(store_owner=store_owner, is_archived=False)
+            customers = ShopCustomer.objects.filter(store_owner=store_owner)
+            self.stdout.write(
+                f'{products.count()} products, {customers.count()} customers; '
+                f'{indexed.name} vs icontains, {options["iterations"]} iterations'
+            )
+            self.stdout.write(f'  {"query":<16} {"table":<9} {"icontains":>10} {indexed.name:>12} {"hits":>11}')
+            for query in queries:
+                for label, queryset, method in (
+                    ('products', products, 'products'),
+                    ('customers', customers, 'customers'),
+                ):
+                    plain_ms, plain_hits = self.timed(
+                        options['iterations'], lambda: list(getattr(plain, method)(queryset, query)[:50]),
+                    )
+                    indexed_ms, indexed_hits = self.timed(
+                        options['iterations'], lambda: list(getattr(indexed, method)(queryset, query)[:50]),
+                    )
+                    self.stdout.write(
+                        f'  {query:<16} {label:<9} {plain_ms:8.2f}ms {indexed_ms:10.2f}ms '
+                        f'{len(plain_hits):>5}/{len(indexed_hits):<5}'
+                    )
+            transaction.set_rollback(True)
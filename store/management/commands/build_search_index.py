@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from store.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the product / customer search index for this database (PostgreSQL pg_trgm + '
+        'tsvector, SQLite FTS5) and refill it from the existing rows. Safe to run again.'
+    )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend('auto')
+        if backend.name == 'icontains':
+            raise CommandError('This database has no search index backend; search uses icontains.')
+        try:
+            backend.install()
+            backend.rebuild()
+        except DatabaseError as exc:
+            raise CommandError(f'Could not build the {backend.name} search index: {exc}')
+        self.stdout.write(self.style.SUCCESS(f'Search index ready ({backend.name}).'))
@@ -0,0 +1,77 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+
+from store.caching import StatsMixin, tenant_key
+
+
+class Command(BaseCommand):
+    help = (
+        'Report cache hit ratios per key family (catalog, template fragments, ...) '
+        'collected by the store cache backends, plus the server\'s own counters for Redis.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after printing them')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Round-trip set/get/incr/delete through the configured cache and check tenant isolation',
+        )
+
+    def round_trip(self, cache):
+        marker = uuid.uuid4().hex
+        first, second = tenant_key(1, 'cache-check', marker), tenant_key(2, 'cache-check', marker)
+        cache.set(first, 'store 1', 30)
+        cache.set(second, 'store 2', 30)
+        counter = tenant_key(1, 'cache-check', marker, 'n')
+        cache.add(counter, 1, 30)
+        ok = (
+            cache.get(first) == 'store 1'
+            and cache.get(second) == 'store 2'
+            and cache.incr(counter, 2) == 3
+            and cache.get_many([first, second]) == {first: 'store 1', second: 'store 2'}
+        )
+        cache.delete_many([first, second, counter])
+        if not ok or cache.get(first) is not None:
+            raise CommandError('Cache round trip failed.')
+        self.stdout.write(self.style.SUCCESS('Round trip and tenant isolation OK.'))
+
+    def handle(self, *args, **options):
+        cache = caches['default']
+        config = settings.CACHES['default']
+        self.stdout.write(f"Backend: {config['BACKEND']} ({config.get('LOCATION', '')})")
+        if not isinstance(cache, StatsMixin):
+            raise CommandError('The default cache is not a store.caching backend; no statistics are collected.')
+        if 'LocMemCache' in config['BACKEND']:
+            self.stdout.write(self.style.WARNING(
+                'locmem is per process: the counters below only cover this command. Set CACHE_URL '
+                'to a file:// or redis:// cache to see what the web workers do.'
+            ))
+        if options['check']:
+            self.round_trip(cache)
+
+        cache.flush_stats()
+        stats = cache.read_stats()
+        total_hits = total_misses = 0
+        self.stdout.write(f'  {"family":<20} {"hits":>10} {"misses":>10} {"hit ratio":>10}')
+        for family, (hits, misses) in sorted(stats.items()):
+            total_hits += hits
+            total_misses += misses
+            self.stdout.write(f'  {family:<20} {hits:>10} {misses:>10} {_ratio(hits, misses):>10}')
+        self.stdout.write(f'  {"all":<20} {total_hits:>10} {total_misses:>10} {_ratio(total_hits, total_misses):>10}')
+
+        if hasattr(cache, 'server_info'):
+            info = cache.server_info()
+            self.stdout.write(
+                f"Server: {info['keys']} keys, {info['keyspace_hits']} hits / {info['keyspace_misses']} misses "
+                f"({_ratio(info['keyspace_hits'], info['keyspace_misses'])})"
+            )
+        if options['reset']:
+            cache.reset_stats()
+            self.stdout.write('Counters reset.')
+
+
+def _ratio(hits, misses):
+    return f'{hits / (hits + misses):.1%}' if hits + misses else '-'
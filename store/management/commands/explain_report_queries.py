@@ -0,0 +1,116 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from store.catalog import catalog_products
+from store.models import Order, Product, SalesReport
+from store.rollups import financial_year_sales_groups, monthly_report_products, yearly_report_products
+from store.stock_ledger import stock_on
+
+
+class Command(BaseCommand):
+    help = (
+        'Show the query plans of the report queries and check that they use the '
+        'composite / partial indexes declared on the store models (SQLite and PostgreSQL).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Username of the store owner to plan the queries for')
+        parser.add_argument('--year', type=int, default=None)
+        parser.add_argument('--month', type=int, default=None)
+        parser.add_argument('--show-plans', action='store_true', help='Print the full plan of every query')
+        parser.add_argument('--strict', action='store_true', help='Fail if a query does not use an expected index')
+
+    def report_queries(self, store_owner, year, month):
+        """(label, queryset, expected index names); any one of the names satisfies the check."""
+        fy_year = year if month >= 4 else year - 1
+        month_start = timezone.make_aware(datetime(year, month, 1))
+        return [
+            (
+                'monthly stock report',
+                monthly_report_products(store_owner, year, month),
+                ['product_owner_purchase_idx', 'rollup_product_period_idx'],
+            ),
+            (
+                'yearly stock summary',
+                yearly_report_products(store_owner, fy_year),
+                ['product_owner_purchase_idx', 'rollup_product_period_idx'],
+            ),
+            (
+                'yearly monthly overview',
+                financial_year_sales_groups(store_owner, fy_year),
+                ['sales_live_owner_date_idx', 'sales_owner_date_idx', 'sales_owner_product_date_idx'],
+            ),
+            (
+                'stock at date',
+                Product.objects.filter(
+                    store_owner=store_owner,
+                    purchase_date__lte=month_start.date(),
+                ).annotate(stock=stock_on(month_start.date())).filter(stock__gt=0),
+                ['stock_move_product_date_idx'],
+            ),
+            (
+                'sales in month',
+                SalesReport.objects.filter(store_owner=store_owner, is_deleted=False, sale_date__gte=month_start),
+                ['sales_live_owner_date_idx', 'sales_owner_date_idx', 'sales_owner_product_date_idx'],
+            ),
+            (
+                'live orders by date',
+                Order.objects.filter(store_owner=store_owner, is_deleted=False).order_by('-order_date'),
+                ['order_live_owner_date_idx', 'order_owner_deleted_date_idx'],
+            ),
+            (
+                'product catalogue',
+                Product.objects.filter(store_owner=store_owner, is_archived=False).order_by('category', 'name'),
+                ['product_active_catalog_idx', 'product_owner_catalog_idx'],
+            ),
+            (
+                'storefront catalogue page',
+                catalog_products(store_owner)[:50],
+                ['product_active_catalog_idx'],
+            ),
+            (
+                'purchases in period',
+                Product.objects.filter(
+                    store_owner=store_owner,
+                    purchase_date__year=year,
+                    purchase_date__month=month,
+                ).order_by('category', 'name'),
+                ['product_owner_purchase_idx'],
+            ),
+        ]
+
+    def handle(self, *args, **options):
+        try:
+            store_owner = CustomUser.objects.get(username=options['user'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"Store owner '{options['user']}' does not exist.")
+
+        now = timezone.now()
+        year = options['year'] or now.year
+        month = options['month'] or now.month
+
+        self.stdout.write(f'Database backend: {connection.vendor}')
+        missing = []
+        for label, queryset, expected in self.report_queries(store_owner, year, month):
+            plan = queryset.explain()
+            used = [name for name in expected if name in plan]
+            if used:
+                self.stdout.write(self.style.SUCCESS(f'[ok]   {label}: {", ".join(used)}'))
+            else:
+                missing.append(label)
+                self.stdout.write(self.style.WARNING(f'[miss] {label}: expected one of {", ".join(expected)}'))
+            if options['show_plans'] or not used:
+                self.stdout.write(plan)
+                self.stdout.write('')
+
+        if missing and options['strict']:
+            raise CommandError(f'No expected index in the plan for: {", ".join(missing)}')
+        if missing:
+            self.stdout.write(self.style.WARNING(
+                'Some plans skip the indexes; on small tables PostgreSQL may prefer a sequential '
+                'scan. Run ANALYZE after loading data and check again.'
+            ))
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import CustomUser
+from store.invoice_export import (
+    default_workers, invoice_orders, invoice_zip_filename, iter_invoice_pdfs, iter_invoice_zip, parse_export_range,
+)
+
+
+class Command(BaseCommand):
+    help = 'Write every live invoice of a store owner in a date range to one ZIP of PDFs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Username of the store owner')
+        parser.add_argument('--start', required=True, help='First invoice date (YYYY-MM-DD)')
+        parser.add_argument('--end', required=True, help='Last invoice date (YYYY-MM-DD)')
+        parser.add_argument('--output', help='ZIP path (default: invoices_<user>_<start>_<end>.zip)')
+        parser.add_argument('--workers', type=int, default=default_workers(), help='Rendering processes')
+        parser.add_argument(
+            '--base-url', default='http://127.0.0.1:8000/',
+            help='Site root used to resolve static/media URLs in the invoice HTML',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            store_owner = CustomUser.objects.get(username=options['user'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"Store owner '{options['user']}' does not exist.")
+        try:
+            start, end = parse_export_range(options['start'], options['end'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        output = options['output'] or invoice_zip_filename(store_owner, start, end)
+        orders = invoice_orders(store_owner, start, end)
+        total = orders.count()
+        counts = {'done': 0, 'failed': 0}
+
+        def progress(invoices):
+            for entry in invoices:
+                counts['failed' if entry[2] is None else 'done'] += 1
+                if (counts['done'] + counts['failed']) % 50 == 0:
+                    self.stdout.write(f"  {counts['done'] + counts['failed']}/{total} invoices")
+                yield entry
+
+        started = time.monotonic()
+        invoices = iter_invoice_pdfs(
+            store_owner,
+            orders.iterator(chunk_size=100),
+            base_url=options['base_url'],
+            workers=options['workers'],
+        )
+        with open(output, 'wb') as fh:
+            for chunk in iter_invoice_zip(progress(invoices)):
+                fh.write(chunk)
+
+        elapsed = time.monotonic() - started
+        message = f"Wrote {counts['done']} invoices to {output} in {elapsed:.1f}s."
+        if counts['failed']:
+            self.stdout.write(self.style.WARNING(f"{message} {counts['failed']} failed; see ERRORS.txt in the ZIP."))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
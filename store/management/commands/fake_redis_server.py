@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from store.fake_redis import serve
+
+
+class Command(BaseCommand):
+    help = (
+        'Run an in-memory Redis-protocol server for local development and CI '
+        '(no persistence). Point CACHE_URL at it, e.g. redis://127.0.0.1:6390/0.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bind', default='127.0.0.1:6390', help='host:port to listen on')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Fake Redis on {options['bind']}. Ctrl+C to stop.")
+        try:
+            serve(options['bind'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped.')
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import CustomUser
+from store.product_import import BATCH_SIZE, ProductImportError, import_products, read_rows, write_failure_report
+
+
+class Command(BaseCommand):
+    help = 'Import products from a supplier purchase sheet (.csv or .xlsx) into one store.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file; headers as on the Add Product form')
+        parser.add_argument('--user', required=True, help='Username of the store owner')
+        parser.add_argument('--report', help='Write rejected rows and their errors to this CSV')
+        parser.add_argument('--strict', action='store_true', help='Save nothing if any row is rejected')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows per INSERT batch')
+
+    def handle(self, *args, **options):
+        try:
+            store_owner = CustomUser.objects.get(username=options['user'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"Store owner '{options['user']}' does not exist.")
+
+        started = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                result = import_products(
+                    store_owner,
+                    read_rows(fileobj, options['path']),
+                    strict=options['strict'],
+                    dry_run=options['dry_run'],
+                    batch_size=options['batch_size'],
+                )
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except ProductImportError as exc:
+            raise CommandError(f"{options['path']}: {exc}")
+        elapsed = time.perf_counter() - started
+
+        if options['report'] and result.failures:
+            with open(options['report'], 'w', newline='', encoding='utf-8') as report:
+                write_failure_report(report, result.failures)
+
+        for failure in result.failures[:20]:
+            self.stderr.write(f'Row {failure.row} ({failure.name or "?"}): {"; ".join(failure.messages())}')
+        if result.failed > 20:
+            self.stderr.write(f'... and {result.failed - 20} more rejected rows')
+
+        if options['dry_run']:
+            summary = f'Dry run: {result.valid} of {result.rows} rows valid, {result.failed} rejected'
+        elif not result.saved:
+            summary = f'Nothing saved: {result.failed} of {result.rows} rows rejected (--strict)'
+        else:
+            summary = f'Imported {result.created} of {result.rows} rows, {result.failed} rejected'
+        summary += f' in {elapsed:.1f}s.'
+        if options['report'] and result.failures:
+            summary += f" Report: {options['report']}"
+        self.stdout.write(self.style.SUCCESS(summary) if result.saved and not result.failed else summary)
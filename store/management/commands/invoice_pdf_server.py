@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from store.pdf_renderer import BrowserPool, serve
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a local invoice PDF worker: warm Chromium browsers that render HTML sent '
+        'over a socket. Point INVOICE_PDF_SERVER at the same host:port to use it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bind', default=settings.INVOICE_PDF_SERVER or '127.0.0.1:8765',
+            help='host:port to listen on (default: INVOICE_PDF_SERVER or 127.0.0.1:8765)',
+        )
+        parser.add_argument(
+            '--browsers', type=int, default=settings.INVOICE_PDF_BROWSERS,
+            help='Browsers kept warm; also the number of renders in flight',
+        )
+
+    def handle(self, *args, **options):
+        pool = BrowserPool(size=options['browsers'])
+        self.stdout.write(
+            f"Invoice PDF worker on {options['bind']} with {pool.size} browser(s). Ctrl+C to stop."
+        )
+        try:
+            serve(options['bind'], pool)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped.')
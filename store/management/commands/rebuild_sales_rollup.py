@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.models import CustomUser
+from store.rollups import rebuild_sales_rollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-product monthly sales rollup from SalesReport / OrderItem.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username of a single store owner (default: all store owners)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        store_owner = None
+        if options['user']:
+            try:
+                store_owner = CustomUser.objects.get(username=options['user'])
+            except CustomUser.DoesNotExist:
+                raise CommandError(f"Store owner '{options['user']}' does not exist.")
+
+        with transaction.atomic():
+            count = rebuild_sales_rollup(store_owner, batch_size=options['batch_size'])
+
+        scope = store_owner.username if store_owner else 'all store owners'
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} monthly rollup rows for {scope}.'))
@@ -0,0 +1,90 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from accounts.models import CustomUser
+from store.models import Order
+from store.order_numbers import plan_resequence, resequence_orders
+
+
+class Command(BaseCommand):
+    help = (
+        'Renumber orders gap-free (active orders 1..N by order date, deleted orders parked '
+        'out of range) for one or all store owners, using bulk updates.'
+    )
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument('--user', action='append', help='Username of a store owner (repeatable)')
+        scope.add_argument('--all', action='store_true', help='Every store owner with orders')
+        parser.add_argument('--dry-run', action='store_true', help='Show the changes without writing them')
+        parser.add_argument('--diff-limit', type=int, default=20, help='Changes to print per owner in --dry-run')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Owners processed in parallel (each owner is one transaction; keep 1 on SQLite)',
+        )
+
+    def get_store_owners(self, options):
+        if options['all']:
+            return list(CustomUser.objects.filter(
+                pk__in=Order.objects.values('store_owner')
+            ).order_by('username'))
+        owners = []
+        for username in options['user']:
+            try:
+                owners.append(CustomUser.objects.get(username=username))
+            except CustomUser.DoesNotExist:
+                raise CommandError(f"Store owner '{username}' does not exist.")
+        return owners
+
+    def process(self, store_owner, options):
+        started = time.monotonic()
+        try:
+            if options['dry_run']:
+                changes = plan_resequence(store_owner)
+            else:
+                changes = resequence_orders(store_owner, batch_size=options['batch_size'])
+        finally:
+            if options['workers'] > 1:
+                # Each worker thread opened its own connection; do not leave it behind
+                connections.close_all()
+        return store_owner, changes, time.monotonic() - started
+
+    def report(self, index, total, store_owner, changes, elapsed, options):
+        verb = 'would change' if options['dry_run'] else 'renumbered'
+        self.stdout.write(f'[{index}/{total}] {store_owner.username}: {verb} {len(changes)} orders ({elapsed:.2f}s)')
+        if not options['dry_run']:
+            return
+        limit = options['diff_limit']
+        for order_id, old_number, old_invoice, new_number, new_invoice in changes[:limit]:
+            self.stdout.write(
+                f'    order {order_id}: #{old_number} {old_invoice or "-"} -> #{new_number} {new_invoice or "-"}'
+            )
+        if len(changes) > limit:
+            self.stdout.write(f'    ... and {len(changes) - limit} more')
+
+    def handle(self, *args, **options):
+        owners = self.get_store_owners(options)
+        total = len(owners)
+        changed = 0
+
+        if options['workers'] > 1:
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                futures = [pool.submit(self.process, owner, options) for owner in owners]
+                for index, future in enumerate(as_completed(futures), start=1):
+                    store_owner, changes, elapsed = future.result()
+                    changed += len(changes)
+                    self.report(index, total, store_owner, changes, elapsed, options)
+        else:
+            for index, owner in enumerate(owners, start=1):
+                store_owner, changes, elapsed = self.process(owner, options)
+                changed += len(changes)
+                self.report(index, total, store_owner, changes, elapsed, options)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Dry run: {changed} orders would change across {total} store owners.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Renumbered {changed} orders across {total} store owners.'))
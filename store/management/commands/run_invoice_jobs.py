@@ -0,0 +1,49 @@
+import os
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from store.invoice_jobs import work
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the invoice PDF job worker: claims queued InvoicePdfJob rows from the database '
+        'and renders them on the warm browser pool.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.INVOICE_PDF_BROWSERS,
+            help='Jobs rendered concurrently (default: INVOICE_PDF_BROWSERS)',
+        )
+        parser.add_argument('--poll', type=float, default=1.0, help='Seconds between polls of an empty queue')
+        parser.add_argument('--drain', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        stop = threading.Event()
+        totals = []
+
+        def run(index):
+            totals.append(work(f'{prefix}:{index}', poll_interval=options['poll'], stop=stop, drain=options['drain']))
+
+        threads = [threading.Thread(target=run, args=(i,), daemon=True) for i in range(max(1, options['workers']))]
+        self.stdout.write(f"Invoice PDF job worker {prefix} with {len(threads)} thread(s). Ctrl+C to stop.")
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            # Let jobs in progress finish; unclaimed ones stay queued
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        done = sum(d for d, _ in totals)
+        failed = sum(f for _, f in totals)
+        self.stdout.write(self.style.SUCCESS(f'Finished {done} PDF jobs ({failed} failed attempts).'))
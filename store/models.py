@@ -2,7 +2,8 @@
 
 from decimal import Decimal, InvalidOperation
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
 from accounts.models import CustomUser
 from django.utils import timezone
 
@@ -72,7 +73,18 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        pass
+        indexes = [
+            # Product list / catalogue: owner's products by category and name
+            models.Index(fields=['store_owner', 'is_archived', 'category', 'name'], name='product_owner_catalog_idx'),
+            # Storefront keyset pages seek on (category, name, id)
+            models.Index(
+                fields=['store_owner', 'category', 'name', 'id'],
+                condition=Q(is_archived=False),
+                name='product_active_catalog_idx',
+            ),
+            # Stock / purchase reports: purchase_date__lte / __range per owner
+            models.Index(fields=['store_owner', 'purchase_date'], name='product_owner_purchase_idx'),
+        ]
 
     UNIT_LABEL_SUFFIX = {
         'kg': 'kg',
@@ -117,6 +129,13 @@ class Product(models.Model):
         # Set initial_stock on first creation
         if not self.pk:
             self.initial_stock = self.quantity
+            from .stock_ledger import record_purchases
+
+            # The opening stock goes into the stock ledger with the product
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                record_purchases([self])
+            return
         super().save(*args, **kwargs)
 
 class ShopCustomer(models.Model):
@@ -184,18 +203,25 @@ class Order(models.Model):
     class Meta:
         unique_together = ('store_owner', 'order_number')
         ordering = ['-order_date']
+        indexes = [
+            models.Index(fields=['store_owner', 'is_deleted', 'order_date'], name='order_owner_deleted_date_idx'),
+            # Live (non-deleted) orders by date: sales report, dashboard, invoices
+            models.Index(
+                fields=['store_owner', '-order_date'],
+                condition=Q(is_deleted=False),
+                name='order_live_owner_date_idx',
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.order_number:
-            # Only consider non-deleted orders for the sequence
-            last_order = Order.objects.filter(
-                store_owner=self.store_owner,
-                is_deleted=False
-            ).order_by('-order_number').first()
-            if last_order:
-                self.order_number = last_order.order_number + 1
-            else:
-                self.order_number = 1
+            from .order_numbers import allocate_order_number
+
+            # The per-owner sequence row stays locked until the caller's transaction ends
+            with transaction.atomic():
+                self.order_number = allocate_order_number(self.store_owner)
+                super().save(*args, **kwargs)
+            return
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -205,6 +231,18 @@ class Order(models.Model):
     def display_order_id(self):
         return self.order_number
 
+class OrderSequence(models.Model):
+    """Per-owner invoice counter: last_number is the highest active order_number.
+
+    Locked with select_for_update when allocating or releasing a number
+    (see store.order_numbers).
+    """
+    store_owner = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='order_sequence')
+    last_number = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.store_owner.username}: {self.last_number}"
+
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -232,6 +270,20 @@ class SalesReport(models.Model):
     profit = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     category = models.CharField(max_length=100, blank=True, null=True)
     sale_date = models.DateTimeField(default=timezone.now)
+    # Mirrors order.is_deleted (kept in sync by delete_invoice / restore_invoice)
+    # so sales reports can filter without joining Order.
+    is_deleted = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['store_owner', 'product', 'sale_date'], name='sales_owner_product_date_idx'),
+            models.Index(fields=['store_owner', 'sale_date'], name='sales_owner_date_idx'),
+            models.Index(
+                fields=['store_owner', 'sale_date'],
+                condition=Q(is_deleted=False),
+                name='sales_live_owner_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Sale: {self.product.name} - {self.store_owner.username}"
@@ -254,4 +306,117 @@ class ProductReturn(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Return {self.returned_invoice_number} - {self.product.name}"
\ No newline at end of file
+        return f"Return {self.returned_invoice_number} - {self.product.name}"
+
+
+class MonthlySalesRollup(models.Model):
+    """Per-product sales totals for one calendar month (by sale date).
+
+    Maintained by store.rollups at checkout / invoice delete / restore; rebuild
+    with `python manage.py rebuild_sales_rollup`.
+    """
+    store_owner = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='sales_rollups')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='sales_rollups')
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    quantity_sold = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'), help_text="GST-inclusive sales total")
+    taxable_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'), help_text="Sales total excl. GST")
+    cgst_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    sgst_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    igst_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        unique_together = ('store_owner', 'product', 'year', 'month')
+        indexes = [
+            # Report subqueries correlate on product, then filter by period
+            models.Index(fields=['product', 'year', 'month'], name='rollup_product_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name} {self.year}-{self.month:02d}: {self.quantity_sold}"
+
+
+class StockMovement(models.Model):
+    """One change to a product's stock, with the product's balance after it.
+
+    Appended by store.stock_ledger at product creation / import, checkout,
+    invoice delete / restore, purchase returns and stock edits; rebuild with
+    `python manage.py rebuild_stock_ledger`. Movements count from moved_on and
+    are ordered by (moved_on, id), so stock on a date is the balance of the
+    product's last movement on or before it.
+    """
+    PURCHASE = 'purchase'
+    SALE = 'sale'
+    RETURN = 'return'
+    INVOICE_DELETE = 'invoice_delete'
+    INVOICE_RESTORE = 'invoice_restore'
+    ADJUSTMENT = 'adjustment'
+    KIND_CHOICES = [
+        (PURCHASE, 'Purchase'),
+        (SALE, 'Sale'),
+        (RETURN, 'Purchase return'),
+        (INVOICE_DELETE, 'Invoice deleted'),
+        (INVOICE_RESTORE, 'Invoice restored'),
+        (ADJUSTMENT, 'Stock adjustment'),
+    ]
+
+    store_owner = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='stock_movements')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_movements')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    moved_on = models.DateField(help_text="Date the movement counts from")
+    quantity = models.IntegerField(help_text="Units in (+) or out (-)")
+    balance = models.IntegerField(help_text="Product stock after this movement")
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements')
+    product_return = models.ForeignKey(
+        ProductReturn, on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Stock on a date: a product's last movement on or before it
+            models.Index(fields=['product', 'moved_on', 'id'], name='stock_move_product_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name} {self.moved_on}: {self.quantity:+d} -> {self.balance}"
+
+
+class InvoicePdfJob(models.Model):
+    """Queued invoice PDF render, claimed by `python manage.py run_invoice_jobs`.
+
+    The finished file lives in the invoice PDF cache (store.invoice_pdf) under
+    content_hash; see store.invoice_jobs.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    store_owner = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='invoice_pdf_jobs')
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='pdf_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    content_hash = models.CharField(max_length=64, blank=True)
+    base_url = models.CharField(max_length=255, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Workers claim the oldest pending (or stale running) job
+            models.Index(fields=['status', 'created_at'], name='pdfjob_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"PDF job {self.pk} for order {self.order_id}: {self.status}"
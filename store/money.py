@@ -0,0 +1,143 @@
+"""
+Rupee amounts held as integer paise for report rows and their totals.
+
+Report rows are built from store.tax's paise columns as Money, summed as ints
+(MoneyTotals) and only turned back into text, Decimal or float for output, so
+totals are exact and JSON floats come from one division instead of a Decimal
+conversion. Money formats and compares like the two-place Decimal it stands
+for ({{ value|floatformat:2 }}, f"{value:.2f}", value > 0), but does not mix
+with Decimal or float arithmetic: convert with Money.from_decimal() first.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+_HUNDRED = Decimal(100)
+_CENT = Decimal('0.01')
+
+
+def to_paise(amount):
+    """Decimal / int / str rupees -> int paise, half up; None counts as zero."""
+    if not amount:
+        return 0
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    return int((amount * _HUNDRED).to_integral_value(ROUND_HALF_UP))
+
+
+class Money:
+    __slots__ = ('paise',)
+
+    def __init__(self, paise=0):
+        self.paise = paise
+
+    @classmethod
+    def from_decimal(cls, amount):
+        """DecimalField value (or None) -> Money, half up to the paisa."""
+        return cls(to_paise(amount))
+
+    @classmethod
+    def sum(cls, amounts):
+        return cls(sum(amount.paise for amount in amounts))
+
+    @property
+    def decimal(self):
+        """Two-place Decimal, as stored in the DecimalField columns."""
+        return _CENT * self.paise
+
+    def __float__(self):
+        # int / int is correctly rounded, so this equals float(self.decimal)
+        return self.paise / 100
+
+    def __str__(self):
+        return str(self.decimal)
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+    def __format__(self, spec):
+        return format(self.decimal, spec)
+
+    def __bool__(self):
+        return self.paise != 0
+
+    def __add__(self, other):
+        if other.__class__ is Money:
+            return Money(self.paise + other.paise)
+        if other.__class__ is int and other == 0:  # sum() start value
+            return self
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if other.__class__ is Money:
+            return Money(self.paise - other.paise)
+        return NotImplemented
+
+    def __neg__(self):
+        return Money(-self.paise)
+
+    def __mul__(self, quantity):
+        """Money x whole number of units."""
+        if isinstance(quantity, int) and not isinstance(quantity, bool):
+            return Money(self.paise * quantity)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def _operands(self, other):
+        if other.__class__ is Money:
+            return self.paise, other.paise
+        if isinstance(other, (int, Decimal, float)):
+            return self.decimal, other  # both in rupees
+        return None
+
+    def __eq__(self, other):
+        operands = self._operands(other)
+        return NotImplemented if operands is None else operands[0] == operands[1]
+
+    def __lt__(self, other):
+        operands = self._operands(other)
+        return NotImplemented if operands is None else operands[0] < operands[1]
+
+    def __le__(self, other):
+        operands = self._operands(other)
+        return NotImplemented if operands is None else operands[0] <= operands[1]
+
+    def __gt__(self, other):
+        operands = self._operands(other)
+        return NotImplemented if operands is None else operands[0] > operands[1]
+
+    def __ge__(self, other):
+        operands = self._operands(other)
+        return NotImplemented if operands is None else operands[0] >= operands[1]
+
+    def __hash__(self):
+        return hash(self.decimal)
+
+
+ZERO = Money(0)
+
+
+class MoneyTotals:
+    """
+    Running totals of a fixed set of amount fields of report rows, kept as int
+    paise. Values may be Money or Decimal; totals[field] is Money.
+    """
+
+    __slots__ = ('fields', 'paise')
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.paise = dict.fromkeys(self.fields, 0)
+
+    def add(self, record):
+        paise = self.paise
+        for field in self.fields:
+            value = record[field]
+            paise[field] += value.paise if value.__class__ is Money else to_paise(value)
+
+    def __getitem__(self, field):
+        return Money(self.paise[field])
+
+    def as_dict(self):
+        return {field: Money(paise) for field, paise in self.paise.items()}
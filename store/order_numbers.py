@@ -0,0 +1,148 @@
+"""Gap-free per-owner order numbering backed by the OrderSequence counter row."""
+from django.db import connection, transaction
+from django.db.models import Case, CharField, F, Max, Value, When, Window
+from django.db.models.functions import Cast, Concat, RowNumber
+from django.db.models.lookups import LessThan
+
+from .models import Order, OrderSequence
+
+# Deleted orders are parked at DELETED_NUMBER_BASE + id, outside the live range
+DELETED_NUMBER_BASE = 1000000
+# Temporary offset while shifting numbers, so unique (store_owner, order_number) holds row by row
+SHIFT_OFFSET = 1000000000
+
+
+def invoice_number_expression(number):
+    """SQL equivalent of f"INV-{number:02d}" for a numeric expression."""
+    text = Cast(number, output_field=CharField())
+    return Case(
+        When(LessThan(number, 10), then=Concat(Value('INV-0'), text)),
+        default=Concat(Value('INV-'), text),
+        output_field=CharField(),
+    )
+
+
+def _locked_sequence(store_owner):
+    """The owner's OrderSequence row, locked; created from the current highest active number if missing."""
+    sequence = OrderSequence.objects.select_for_update().filter(store_owner=store_owner).first()
+    if sequence is None:
+        current = Order.objects.filter(
+            store_owner=store_owner,
+            is_deleted=False,
+        ).aggregate(last=Max('order_number'))['last'] or 0
+        OrderSequence.objects.bulk_create(
+            [OrderSequence(store_owner=store_owner, last_number=current)],
+            ignore_conflicts=True,
+        )
+        sequence = OrderSequence.objects.select_for_update().get(store_owner=store_owner)
+    return sequence
+
+
+def allocate_order_number(store_owner):
+    """Next order number for the owner. Call inside a transaction; the counter stays locked until it ends."""
+    sequence = _locked_sequence(store_owner)
+    sequence.last_number += 1
+    sequence.save(update_fields=['last_number'])
+    return sequence.last_number
+
+
+def release_order_number(order):
+    """
+    Take a soft-deleted order (is_deleted already set) out of the numbering: park it
+    at DELETED_NUMBER_BASE + id and move every later active order down by one,
+    renaming its invoice number to match. Two bulk UPDATEs whatever the order count;
+    call inside a transaction.
+    """
+    sequence = _locked_sequence(order.store_owner)
+    number = order.order_number
+    order.order_number = DELETED_NUMBER_BASE + order.pk
+    order.save(update_fields=['order_number', 'is_deleted'])
+
+    later = Order.objects.filter(
+        store_owner=order.store_owner,
+        is_deleted=False,
+        order_number__gt=number,
+        order_number__lt=DELETED_NUMBER_BASE,
+    )
+    if later.update(order_number=F('order_number') + SHIFT_OFFSET):
+        shifted = F('order_number') - (SHIFT_OFFSET + 1)
+        Order.objects.filter(
+            store_owner=order.store_owner,
+            order_number__gt=SHIFT_OFFSET,
+        ).update(
+            order_number=shifted,
+            invoice_number=invoice_number_expression(shifted),
+        )
+
+    sequence.last_number = max(sequence.last_number - 1, 0)
+    sequence.save(update_fields=['last_number'])
+
+
+def sync_order_sequence(store_owner):
+    """Reset the counter to the highest active order number (after a full resequence)."""
+    current = Order.objects.filter(
+        store_owner=store_owner,
+        is_deleted=False,
+    ).aggregate(last=Max('order_number'))['last'] or 0
+    OrderSequence.objects.update_or_create(store_owner=store_owner, defaults={'last_number': current})
+    return current
+
+
+def format_invoice_number(number):
+    return f"INV-{number:02d}"
+
+
+def plan_resequence(store_owner):
+    """
+    Renumbering needed for one owner: active orders become 1..N by (order_date, id)
+    and deleted orders are parked at DELETED_NUMBER_BASE + id.
+    Returns [(order_id, old_number, old_invoice, new_number, new_invoice)] for rows that change.
+    """
+    rows = Order.objects.filter(store_owner=store_owner).annotate(
+        position=Window(RowNumber(), partition_by=[F('is_deleted')], order_by=[F('order_date').asc(), F('id').asc()]),
+    ).values_list('id', 'is_deleted', 'order_number', 'invoice_number', 'position').order_by()
+
+    changes = []
+    for order_id, is_deleted, number, invoice, position in rows.iterator(chunk_size=5000):
+        if is_deleted:
+            new_number, new_invoice = DELETED_NUMBER_BASE + order_id, invoice
+        else:
+            new_number, new_invoice = position, format_invoice_number(position)
+        if number != new_number or invoice != new_invoice:
+            changes.append((order_id, number, invoice, new_number, new_invoice))
+    changes.sort()
+    return changes
+
+
+def resequence_orders(store_owner, batch_size=1000):
+    """
+    Renumber one owner's orders gap-free and return the applied plan_resequence() changes.
+    The counter row is locked first so no order is numbered meanwhile. Changed rows
+    move to SHIFT_OFFSET + id (so no target number is still taken), then get their
+    final numbers from one parameterised executemany() per batch; the counter is
+    resynced at the end.
+
+    bulk_update() is avoided on purpose: it compiles a CASE WHEN per row and was
+    ~20x slower than the database work itself for 100k orders.
+    """
+    table = connection.ops.quote_name(Order._meta.db_table)
+    sql = (
+        f'UPDATE {table} SET {connection.ops.quote_name("order_number")} = %s, '
+        f'{connection.ops.quote_name("invoice_number")} = %s WHERE {connection.ops.quote_name("id")} = %s'
+    )
+    with transaction.atomic():
+        _locked_sequence(store_owner)
+        changes = plan_resequence(store_owner)
+        ids = [change[0] for change in changes]
+        for start in range(0, len(ids), batch_size):
+            Order.objects.filter(pk__in=ids[start:start + batch_size]).update(
+                order_number=F('id') + SHIFT_OFFSET,
+            )
+        with connection.cursor() as cursor:
+            for start in range(0, len(changes), batch_size):
+                cursor.executemany(sql, [
+                    (new_number, new_invoice, order_id)
+                    for order_id, _, _, new_number, new_invoice in changes[start:start + batch_size]
+                ])
+        sync_order_sequence(store_owner)
+    return changes
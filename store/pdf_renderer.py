@@ -0,0 +1,315 @@
+"""
+Invoice HTML -> PDF with long-lived headless Chromium browsers.
+
+BrowserPool keeps INVOICE_PDF_BROWSERS browsers warm, each owned by its own worker
+thread (Playwright's sync API must stay on the thread that started it). Renders are
+queued and picked up by the first free worker, so the pool size is also the
+concurrency limit. Before every job the worker checks that its browser is still
+connected and relaunches it if Chromium died; a failed render drops the browser so
+the next job starts a fresh one.
+
+The pool runs inside the Django process by default. With INVOICE_PDF_SERVER set to
+host:port, render_invoice_pdf() sends the HTML to a `manage.py invoice_pdf_server`
+worker instead (see serve()), so web processes do not each hold their own browsers.
+"""
+import atexit
+import html as html_stdlib
+import json
+import logging
+import queue
+import re
+import socket
+import socketserver
+import struct
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PDF_OPTIONS = {
+    'format': 'A4',
+    'print_background': True,
+    'margin': {'top': '7mm', 'right': '9mm', 'bottom': '7mm', 'left': '9mm'},
+}
+
+_FRAME_HEADER = struct.Struct('!I')
+_STATUS_OK = b'0'
+_STATUS_ERROR = b'1'
+
+
+class RenderError(Exception):
+    """The browser (local or remote) could not produce a PDF."""
+
+
+def with_base_href(html_string, base_url):
+    """Add <base href> so relative static/media URLs resolve when the HTML is loaded from a string."""
+    if not base_url or re.search(r'<base\s', html_string, re.IGNORECASE) is not None:
+        return html_string
+    safe_href = html_stdlib.escape(base_url, quote=True)
+    return re.sub(
+        r'(<head[^>]*>)',
+        rf'\1<base href="{safe_href}">',
+        html_string,
+        count=1,
+        flags=re.IGNORECASE,
+    )
+
+
+class _RenderJob:
+    def __init__(self, html_string, base_url, timeout):
+        self.html = with_base_href(html_string, base_url)
+        self.timeout = timeout
+        self.future = Future()
+
+
+class _BrowserWorker(threading.Thread):
+    """One Chromium browser with a reused context; serves jobs from the pool queue."""
+
+    def __init__(self, pool, index):
+        super().__init__(name=f'invoice-pdf-browser-{index}', daemon=True)
+        self.pool = pool
+        self.browser = None
+        self.context = None
+        self.pages_on_context = 0
+
+    def run(self):
+        while not self.pool.closed:
+            try:
+                from playwright.sync_api import sync_playwright
+
+                with sync_playwright() as playwright:
+                    self._serve(playwright)
+                return
+            except Exception as exc:
+                # Playwright missing or its driver died: fail one job so callers can fall back, then retry
+                logger.warning('Invoice PDF browser worker %s restarting: %s', self.name, exc)
+                self._close_browser()
+                job = self.pool._next_job()
+                if job is None:
+                    return
+                if job.future.set_running_or_notify_cancel():
+                    job.future.set_exception(RenderError(str(exc)))
+
+    def _serve(self, playwright):
+        try:
+            # Warm up before the first job arrives
+            self._ensure_context(playwright)
+        except Exception as exc:
+            logger.warning('Invoice PDF browser %s failed to launch: %s', self.name, exc)
+            self._close_browser()
+        while True:
+            job = self.pool._next_job()
+            if job is None:
+                self._close_browser()
+                return
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                pdf_bytes = self._render(playwright, job)
+            except Exception as exc:
+                # Chromium may have crashed mid-render; start clean on the next job
+                self._close_browser()
+                job.future.set_exception(RenderError(str(exc)))
+            else:
+                job.future.set_result(pdf_bytes)
+
+    def _ensure_context(self, playwright):
+        if self.browser is not None and not self.browser.is_connected():
+            logger.warning('Invoice PDF browser %s disconnected; relaunching', self.name)
+            self._close_browser()
+        if self.browser is None:
+            self.browser = playwright.chromium.launch(headless=True)
+        if self.context is None or self.pages_on_context >= self.pool.context_max_pages:
+            if self.context is not None:
+                self.context.close()
+            self.context = self.browser.new_context()
+            self.pages_on_context = 0
+        return self.context
+
+    def _render(self, playwright, job):
+        context = self._ensure_context(playwright)
+        page = context.new_page()
+        self.pages_on_context += 1
+        try:
+            page.set_content(job.html, wait_until='load', timeout=job.timeout * 1000)
+            return page.pdf(**PDF_OPTIONS)
+        finally:
+            page.close()
+
+    def _close_browser(self):
+        browser, self.browser, self.context = self.browser, None, None
+        if browser is not None:
+            try:
+                browser.close()
+            except Exception:
+                pass
+
+    def healthy(self):
+        return self.is_alive() and (self.browser is None or self.browser.is_connected())
+
+
+class BrowserPool:
+    """Fixed set of warm Chromium workers behind a job queue."""
+
+    def __init__(self, size=None, context_max_pages=None, timeout=None):
+        self.size = max(1, size or settings.INVOICE_PDF_BROWSERS)
+        self.context_max_pages = context_max_pages or settings.INVOICE_PDF_CONTEXT_MAX_PAGES
+        self.timeout = timeout or settings.INVOICE_PDF_TIMEOUT
+        self.closed = False
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._start_workers()
+
+    def _start_workers(self):
+        with self._lock:
+            self._workers = [w for w in self._workers if w.is_alive()]
+            while len(self._workers) < self.size:
+                worker = _BrowserWorker(self, len(self._workers))
+                worker.start()
+                self._workers.append(worker)
+
+    def _next_job(self):
+        job = self._jobs.get()
+        return None if job is None or self.closed else job
+
+    def health(self):
+        """Per-worker status; dead worker threads are replaced."""
+        status = [(w.name, w.healthy()) for w in self._workers]
+        if not all(w.is_alive() for w in self._workers):
+            self._start_workers()
+        return status
+
+    def render(self, html_string, base_url='', timeout=None):
+        if self.closed:
+            raise RenderError('Browser pool is closed')
+        timeout = timeout or self.timeout
+        if not all(w.is_alive() for w in self._workers):
+            self._start_workers()
+        job = _RenderJob(html_string, base_url, timeout)
+        self._jobs.put(job)
+        try:
+            # Queue wait + render; a stuck browser must not hang the request forever
+            return job.future.result(timeout=timeout * 2)
+        except FutureTimeout:
+            job.future.cancel()
+            raise RenderError(f'Timed out after {timeout * 2}s waiting for a browser')
+
+    def close(self):
+        self.closed = True
+        for _ in self._workers:
+            self._jobs.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5)
+
+
+_pool = None
+_pool_size = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Process-wide pool, started on first use (after any fork by the app server)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.closed:
+            _pool = BrowserPool(size=_pool_size)
+            atexit.register(_pool.close)
+        return _pool
+
+
+def reset_browser_pool(size=None):
+    """Forget a pool inherited through fork (its threads did not survive) and size the next one."""
+    global _pool, _pool_size, _pool_lock
+    _pool, _pool_size, _pool_lock = None, size, threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# Socket protocol for the out-of-process worker: length-prefixed frames.
+# Request: JSON header ({"base_url": ...}) then the HTML. Reply: a status byte then
+# the PDF (status 0) or a UTF-8 error message (status 1).
+
+def _send_frame(sock, payload):
+    sock.sendall(_FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError('Connection closed mid-frame')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _recv_frame(sock):
+    (size,) = _FRAME_HEADER.unpack(_recv_exact(sock, _FRAME_HEADER.size))
+    return _recv_exact(sock, size)
+
+
+def _parse_address(address):
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def render_remote(address, html_string, base_url='', timeout=None):
+    timeout = timeout or settings.INVOICE_PDF_TIMEOUT
+    try:
+        with socket.create_connection(_parse_address(address), timeout=timeout * 2) as sock:
+            _send_frame(sock, json.dumps({'base_url': base_url}).encode('utf-8'))
+            _send_frame(sock, html_string.encode('utf-8'))
+            status = _recv_exact(sock, 1)
+            payload = _recv_frame(sock)
+    except OSError as exc:
+        raise RenderError(f'PDF worker {address} unavailable: {exc}') from exc
+    if status != _STATUS_OK:
+        raise RenderError(payload.decode('utf-8', 'replace'))
+    return payload
+
+
+def render_invoice_pdf(html_string, base_url=''):
+    """PDF bytes for the invoice HTML, from the worker process if configured, else the local pool."""
+    if settings.INVOICE_PDF_SERVER:
+        return render_remote(settings.INVOICE_PDF_SERVER, html_string, base_url)
+    return get_browser_pool().render(html_string, base_url)
+
+
+class _RenderRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            header = json.loads(_recv_frame(self.request))
+            html_string = _recv_frame(self.request).decode('utf-8')
+        except (ConnectionError, ValueError):
+            return
+        try:
+            pdf_bytes = self.server.pool.render(html_string, header.get('base_url', ''))
+        except RenderError as exc:
+            self.request.sendall(_STATUS_ERROR)
+            _send_frame(self.request, str(exc).encode('utf-8'))
+        else:
+            self.request.sendall(_STATUS_OK)
+            _send_frame(self.request, pdf_bytes)
+
+
+class PdfServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, pool):
+        self.pool = pool
+        super().__init__(address, _RenderRequestHandler)
+
+
+def serve(address, pool=None):
+    """Serve renders on host:port until interrupted (used by the invoice_pdf_server command)."""
+    pool = pool or BrowserPool()
+    server = PdfServer(_parse_address(address), pool)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        pool.close()
@@ -0,0 +1,369 @@
+"""
+Bulk product import from supplier purchase sheets (CSV or XLSX).
+
+Rows are read lazily, validated with AddProductForm's own fields and clean
+methods (GSTIN format, required HSN / batch, GST and IGST ranges, at least one
+of GST or IGST), and inserted with bulk_create in batches inside one
+transaction. Invalid rows are skipped and returned as failures, unless the
+import is strict, in which case nothing is saved.
+
+Column headers are the Add Product form labels ("Company name (purchased
+from)", "GST (%)", "HSN", ...) or the field names; unknown columns are ignored.
+Blank "Taxable Total Amount" / "Total Amount" cells are filled the way the Add
+Product page fills them (quantity x unit amount, plus GST or IGST).
+"""
+import csv
+import io
+import re
+from functools import lru_cache
+from datetime import date, datetime
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.forms.utils import ErrorDict
+
+from .catalog import bump_catalog_version
+from .forms import AddProductForm
+from .models import Product
+from .stock_ledger import record_purchases
+
+BATCH_SIZE = 1000
+
+# Sheet columns repeat heavily (one supplier, a few categories, rates and pack
+# prices), so each distinct cell value is normalised and validated once per
+# import; only these columns are distinct on nearly every row
+UNMEMOIZED_FIELDS = ('name', 'purchase_invoice_number')
+MEMO_LIMIT = 10000
+
+DATE_FORMATS = ('%d.%m.%Y', '%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d', '%d.%m.%y', '%d-%m-%y')
+
+MEASUREMENT_ALIASES = {
+    'kg': 'kg', 'kgs': 'kg', 'kilogram': 'kg', 'kilograms': 'kg',
+    'g': 'grams', 'gm': 'grams', 'gms': 'grams', 'gram': 'grams', 'grams': 'grams',
+    'l': 'liter', 'ltr': 'liter', 'litre': 'liter', 'liter': 'liter', 'liters': 'liter', 'litres': 'liter',
+    'ml': 'ml', 'milliliter': 'ml', 'milliliters': 'ml', 'millilitre': 'ml',
+}
+
+# Headers used by existing supplier sheets besides the form labels
+HEADER_ALIASES = {
+    'total amount (incl. gst)': 'total_amount',
+    'gstin': 'company_gstin',
+    'hsn code': 'hsn_code',
+    'batch': 'batch_number',
+}
+
+_DECIMAL_FIELDS = ('gst', 'igst', 'unit_capacity', 'taxable_unit_amount', 'taxable_total_amount', 'total_amount')
+_SPACES_RE = re.compile(r'\s+')
+
+
+class ProductImportError(ValueError):
+    """The file as a whole cannot be imported (format, missing columns)."""
+
+
+class ImportFailure:
+    __slots__ = ('row', 'name', 'invoice', 'errors')
+
+    def __init__(self, row, name, invoice, errors):
+        self.row = row
+        self.name = name
+        self.invoice = invoice
+        self.errors = errors  # {field: [messages]}
+
+    def messages(self):
+        return [
+            f'{message}' if field == '__all__' else f'{field}: {message}'
+            for field, messages in self.errors.items()
+            for message in messages
+        ]
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.valid = 0
+        self.saved = False
+        self.failures = []
+
+    @property
+    def created(self):
+        return self.valid if self.saved else 0
+
+    @property
+    def failed(self):
+        return len(self.failures)
+
+
+def _header_key(header):
+    return _SPACES_RE.sub(' ', str(header or '').strip().lower())
+
+
+def _column_map():
+    """Normalised header -> form field name."""
+    columns = {}
+    for name in AddProductForm._meta.fields:
+        if name == 'image':
+            continue
+        columns[_header_key(name)] = name
+        label = AddProductForm._meta.labels.get(name)
+        if label:
+            columns[_header_key(label)] = name
+    columns.update(HEADER_ALIASES)
+    return columns
+
+
+def _required_columns():
+    form = AddProductForm()
+    # The two totals are derived when blank, like the Add Product page does
+    return [
+        name for name, field in form.fields.items()
+        if field.required and name not in ('taxable_total_amount', 'total_amount')
+    ]
+
+
+def _map_headers(headers):
+    columns = _column_map()
+    mapping = [columns.get(_header_key(header)) for header in headers]
+    missing = [name for name in _required_columns() if name not in mapping]
+    if missing:
+        labels = [AddProductForm._meta.labels.get(name, name) for name in missing]
+        raise ProductImportError(f'Missing column(s): {", ".join(labels)}.')
+    return mapping
+
+
+def _rows_from_table(rows):
+    """(row number, {field: raw value}) for a header row followed by data rows."""
+    rows = iter(rows)
+    for number, headers in enumerate(rows, 1):
+        if any(cell not in (None, '') for cell in headers):
+            break
+    else:
+        raise ProductImportError('The file has no header row.')
+    mapping = _map_headers(headers)
+    for number, cells in enumerate(rows, number + 1):
+        values = {
+            field: cell for field, cell in zip(mapping, cells)
+            if field is not None and cell is not None and str(cell).strip() != ''
+        }
+        if values:
+            yield number, values
+
+
+def read_csv(fileobj):
+    """Binary file object -> rows. UTF-8 with or without BOM (Excel's CSV export)."""
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        yield from _rows_from_table(csv.reader(text))
+    except UnicodeDecodeError:
+        raise ProductImportError('CSV files must be UTF-8 encoded.')
+    finally:
+        text.detach()
+
+
+def read_xlsx(fileobj):
+    """Binary file object -> rows from the first worksheet, read in streaming mode."""
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+    from zipfile import BadZipFile
+
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except (BadZipFile, InvalidFileException, KeyError, OSError):
+        raise ProductImportError('Not a readable .xlsx workbook.')
+    try:
+        yield from _rows_from_table(workbook.worksheets[0].iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+def read_rows(fileobj, filename):
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return read_csv(fileobj)
+    if name.endswith(('.xlsx', '.xlsm')):
+        return read_xlsx(fileobj)
+    raise ProductImportError('Upload a .csv or .xlsx file.')
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return text  # left for the form to reject
+
+
+def _decimal(value):
+    try:
+        return Decimal(str(value).strip().replace(',', ''))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _round(value, field):
+    """
+    Spreadsheet amounts (float noise, 3-decimal rates) rounded half up to the
+    model field's places, as the Add Product page rounds its totals.
+    """
+    number = _decimal(value)
+    if number is None or not number.is_finite():
+        return value  # left for the form to reject
+    places = Product._meta.get_field(field).decimal_places
+    return number.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+
+
+def _integer(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return str(value).strip().replace(',', '')
+
+
+@lru_cache(maxsize=MEMO_LIMIT, typed=True)
+def _normalize_cell(field, value):
+    if field == 'purchase_date':
+        return _parse_date(value)
+    if field == 'measurement_type':
+        return MEASUREMENT_ALIASES.get(str(value).strip().lower(), str(value).strip())
+    if field in _DECIMAL_FIELDS:
+        return _round(value, field)
+    if field == 'quantity':
+        return _integer(value)
+    return value.strip() if isinstance(value, str) else str(value)
+
+
+def normalize_row(values):
+    """Sheet cell values -> form data: dates parsed, units mapped, totals derived."""
+    data = {field: _normalize_cell(field, value) for field, value in values.items()}
+
+    quantity = _decimal(data.get('quantity'))
+    unit_amount = _decimal(data.get('taxable_unit_amount'))
+    if 'taxable_total_amount' not in data and quantity is not None and unit_amount is not None:
+        data['taxable_total_amount'] = _round(quantity * unit_amount, 'taxable_total_amount')
+    taxable_total = _decimal(data.get('taxable_total_amount'))
+    if 'total_amount' not in data and taxable_total is not None:
+        # IGST takes priority when both are filled
+        rate = _decimal(data.get('igst')) or _decimal(data.get('gst')) or Decimal('0')
+        data['total_amount'] = _round(taxable_total * (1 + rate / 100), 'total_amount')
+    return data
+
+
+class RowValidator:
+    """
+    AddProductForm's rules applied to row dicts. A bound form per row spends most
+    of its time deep-copying fields and widgets, so one form is reused: every field
+    goes through the form field's clean() and the form's clean_<name>(), then the
+    form's clean() checks the cross-field rules. The model's own full_clean() is
+    not repeated; the form fields already carry its max_length / max_digits
+    validators.
+    """
+
+    def __init__(self, store_owner):
+        self.form = AddProductForm(store_owner=store_owner)
+        self.fields = [(name, field) for name, field in self.form.fields.items() if name != 'image']
+        self._memo = {name: {} for name, _ in self.fields if name not in UNMEMOIZED_FIELDS}
+
+    def _clean_field(self, name, field, value):
+        form = self.form
+        value = field.clean(value)
+        form.cleaned_data[name] = value
+        clean_method = getattr(form, f'clean_{name}', None)
+        return clean_method() if clean_method else value
+
+    def _clean_memoized(self, name, field, value):
+        memo = self._memo.get(name)
+        if memo is None:
+            return self._clean_field(name, field, value)
+        try:
+            outcome = memo[value]
+        except KeyError:
+            try:
+                outcome = self._clean_field(name, field, value)
+            except ValidationError as exc:
+                outcome = exc
+            if len(memo) >= MEMO_LIMIT:
+                memo.clear()
+            memo[value] = outcome
+        if isinstance(outcome, ValidationError):
+            raise outcome
+        return outcome
+
+    def validate(self, data):
+        """(cleaned_data, None) for a valid row, else (None, {field: [messages]})."""
+        form = self.form
+        form.data = data  # clean() reads it for the AD-section override flag
+        form.cleaned_data = {}
+        form._errors = ErrorDict()
+        for name, field in self.fields:
+            try:
+                form.cleaned_data[name] = self._clean_memoized(name, field, data.get(name))
+            except ValidationError as exc:
+                form.add_error(name, exc)
+        try:
+            form.clean()
+        except ValidationError as exc:
+            form.add_error(None, exc)
+        if form._errors:
+            return None, {field: list(messages) for field, messages in form._errors.items()}
+        return dict(form.cleaned_data), None
+
+
+def build_product(store_owner, cleaned):
+    """Unsaved Product for a validated row, set up as add_new_product saves it."""
+    product = Product(store_owner=store_owner, price=0, **cleaned)
+    # bulk_create skips Product.save(), which records the opening stock
+    product.initial_stock = product.quantity
+    return product
+
+
+def import_products(store_owner, rows, *, strict=False, dry_run=False, batch_size=BATCH_SIZE):
+    """
+    Validate and insert rows from read_rows() for one store owner.
+    strict: save nothing if any row fails. dry_run: validate only.
+    """
+    result = ImportResult()
+    validator = RowValidator(store_owner)
+    batch = []
+
+    def flush():
+        if not dry_run:
+            # Product.save() is skipped, so the purchases go into the stock ledger here
+            record_purchases(Product.objects.bulk_create(batch, batch_size=batch_size))
+        result.valid += len(batch)
+        batch.clear()
+
+    with transaction.atomic():
+        for number, values in rows:
+            result.rows += 1
+            cleaned, errors = validator.validate(normalize_row(values))
+            if errors:
+                result.failures.append(ImportFailure(
+                    number, str(values.get('name', '')), str(values.get('purchase_invoice_number', '')), errors,
+                ))
+                continue
+            batch.append(build_product(store_owner, cleaned))
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+
+        if dry_run or (strict and result.failures):
+            transaction.set_rollback(True)
+        else:
+            result.saved = True
+            if result.valid:
+                # bulk_create sends no post_save, so the catalogue version is bumped here
+                bump_catalog_version(store_owner.pk)
+    return result
+
+
+def write_failure_report(fileobj, failures):
+    """CSV of the rejected rows: sheet row number, product, invoice, errors."""
+    writer = csv.writer(fileobj)
+    writer.writerow(['Row', 'Product name', 'Purchase invoice number', 'Errors'])
+    for failure in failures:
+        writer.writerow([failure.row, failure.name, failure.invoice, '; '.join(failure.messages())])
@@ -0,0 +1,219 @@
+"""Incremental maintenance of the per-product monthly sales rollup (MonthlySalesRollup)."""
+from collections import defaultdict
+from decimal import Decimal
+
+import calendar
+from datetime import date, datetime
+
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models import DecimalField, IntegerField
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from .models import MonthlySalesRollup, OrderItem, Product, SalesReport
+from .stock_ledger import annotate_period_stock
+
+ROLLUP_AMOUNT_FIELDS = ('total_amount', 'taxable_amount', 'cgst_amount', 'sgst_amount', 'igst_amount')
+
+
+def _sale_period(sale_date):
+    """(year, month) of a sale in the active timezone, matching sale_date__year/__month lookups."""
+    local = timezone.localtime(sale_date) if timezone.is_aware(sale_date) else sale_date
+    return local.year, local.month
+
+
+def _empty_totals():
+    totals = {'quantity_sold': 0}
+    for field in ROLLUP_AMOUNT_FIELDS:
+        totals[field] = Decimal('0.00')
+    return totals
+
+
+def _add_line(totals, sale, item):
+    """Accumulate one SalesReport row (+ its OrderItem tax split) into totals."""
+    totals['quantity_sold'] += sale.quantity
+    totals['total_amount'] += sale.total_price or Decimal('0.00')
+    if item is None:
+        return
+    subtotal = item.subtotal
+    if subtotal is None:
+        subtotal = item.item_price * item.quantity
+    totals['taxable_amount'] += subtotal
+    totals['cgst_amount'] += item.cgst_amount or Decimal('0.00')
+    totals['sgst_amount'] += item.sgst_amount or Decimal('0.00')
+    totals['igst_amount'] += item.igst_amount or Decimal('0.00')
+
+
+def order_rollup_deltas(order):
+    """Group an order's sales lines by (product_id, year, month)."""
+    items = {item.product_id: item for item in OrderItem.objects.filter(order=order)}
+    deltas = defaultdict(_empty_totals)
+    for sale in SalesReport.objects.filter(order=order):
+        year, month = _sale_period(sale.sale_date)
+        _add_line(deltas[(sale.product_id, year, month)], sale, items.get(sale.product_id))
+    return deltas
+
+
+def apply_rollup_deltas(store_owner, deltas, sign=1):
+    """
+    Add (sign=1) or subtract (sign=-1) grouped totals from the rollup rows.
+    Runs a fixed number of queries however many lines the order has; call inside
+    the caller's transaction so the rollup commits or rolls back with the order.
+    """
+    if not deltas:
+        return
+    owner_id = store_owner.pk
+    key_filter = Q()
+    for product_id, year, month in deltas:
+        key_filter |= Q(product_id=product_id, year=year, month=month)
+
+    # Make sure every (product, year, month) row exists before incrementing it.
+    MonthlySalesRollup.objects.bulk_create(
+        [
+            MonthlySalesRollup(store_owner_id=owner_id, product_id=product_id, year=year, month=month)
+            for product_id, year, month in deltas
+        ],
+        ignore_conflicts=True,
+    )
+    rows = MonthlySalesRollup.objects.select_for_update().filter(key_filter, store_owner_id=owner_id)
+    pk_by_key = {(r.product_id, r.year, r.month): r.pk for r in rows}
+
+    updates = {}
+    quantity_whens = [
+        When(pk=pk_by_key[key], then=F('quantity_sold') + Value(sign * totals['quantity_sold']))
+        for key, totals in deltas.items()
+    ]
+    updates['quantity_sold'] = Case(*quantity_whens, default=F('quantity_sold'), output_field=IntegerField())
+    for field in ROLLUP_AMOUNT_FIELDS:
+        whens = [
+            When(pk=pk_by_key[key], then=F(field) + Value(totals[field] * sign))
+            for key, totals in deltas.items()
+        ]
+        updates[field] = Case(
+            *whens,
+            default=F(field),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        )
+    MonthlySalesRollup.objects.filter(pk__in=pk_by_key.values()).update(**updates)
+
+
+def record_order_sales(order, sign=1):
+    """Apply every sales line of an order to the monthly rollup."""
+    apply_rollup_deltas(order.store_owner, order_rollup_deltas(order), sign=sign)
+
+
+def rebuild_sales_rollup(store_owner=None, batch_size=1000):
+    """
+    Recompute the rollup from SalesReport/OrderItem for one store owner (or all).
+    Returns the number of rollup rows written.
+    """
+    rollups = MonthlySalesRollup.objects.all()
+    sales = SalesReport.objects.filter(is_deleted=False)
+    items = OrderItem.objects.filter(order__is_deleted=False)
+    if store_owner is not None:
+        rollups = rollups.filter(store_owner=store_owner)
+        sales = sales.filter(store_owner=store_owner)
+        items = items.filter(order__store_owner=store_owner)
+
+    items_by_line = {
+        (item.order_id, item.product_id): item
+        for item in items.only(
+            'order_id', 'product_id', 'quantity', 'item_price',
+            'subtotal', 'cgst_amount', 'sgst_amount', 'igst_amount',
+        ).iterator(chunk_size=2000)
+    }
+    totals = defaultdict(_empty_totals)
+    for sale in sales.only(
+        'store_owner_id', 'product_id', 'order_id', 'quantity', 'total_price', 'sale_date',
+    ).iterator(chunk_size=2000):
+        year, month = _sale_period(sale.sale_date)
+        key = (sale.store_owner_id, sale.product_id, year, month)
+        _add_line(totals[key], sale, items_by_line.get((sale.order_id, sale.product_id)))
+
+    rollups.delete()
+    MonthlySalesRollup.objects.bulk_create(
+        [
+            MonthlySalesRollup(
+                store_owner_id=owner_id, product_id=product_id, year=year, month=month, **values
+            )
+            for (owner_id, product_id, year, month), values in totals.items()
+        ],
+        batch_size=batch_size,
+    )
+    return len(totals)
+
+
+def period_range_q(start_year, start_month, end_year, end_month):
+    """Rollup rows whose (year, month) falls in the inclusive range."""
+    after_start = Q(year__gt=start_year) | Q(year=start_year, month__gte=start_month)
+    before_end = Q(year__lt=end_year) | Q(year=end_year, month__lte=end_month)
+    return after_start & before_end
+
+
+def _rollup_sum(period_q, field):
+    return MonthlySalesRollup.objects.filter(
+        period_q,
+        product=OuterRef('pk'),
+    ).values('product').annotate(total=Sum(field)).values('total')
+
+
+def annotate_period_sales(products, during_q):
+    """
+    Annotate products with rollup totals: qty_sold_in / amnt_sold_in /
+    taxable_amnt_sold_in (rows matching during_q).
+    """
+    return products.annotate(
+        qty_sold_in=Coalesce(Subquery(_rollup_sum(during_q, 'quantity_sold')), 0),
+        amnt_sold_in=Coalesce(Subquery(_rollup_sum(during_q, 'total_amount')), Decimal('0.00')),
+        taxable_amnt_sold_in=Coalesce(Subquery(_rollup_sum(during_q, 'taxable_amount')), Decimal('0.00')),
+    )
+
+
+def monthly_report_products(store_owner, year, month):
+    """
+    Products purchased by the end of the month, with that month's sales and
+    opening / closing stock from the stock ledger (monthly stock report).
+    """
+    month_start = date(year, month, 1)
+    month_end = date(year, month, calendar.monthrange(year, month)[1])
+    products = Product.objects.filter(store_owner=store_owner, purchase_date__lte=month_end)
+    products = annotate_period_stock(products, month_start, month_end)
+    return annotate_period_sales(
+        products,
+        period_range_q(year, month, year, month),
+    ).order_by('category', 'name')
+
+
+def yearly_report_products(store_owner, year):
+    """
+    Products purchased by 31 March of year + 1, with April-March sales and
+    opening / closing stock from the stock ledger (yearly stock summary).
+    """
+    products = Product.objects.filter(store_owner=store_owner, purchase_date__lte=date(year + 1, 3, 31))
+    products = annotate_period_stock(products, date(year, 4, 1), date(year + 1, 3, 31))
+    return annotate_period_sales(
+        products,
+        period_range_q(year, 4, year + 1, 3),
+    ).order_by('category', 'name')
+
+
+def financial_year_sales_groups(store_owner, year):
+    """
+    Live sales of April `year` to March `year + 1` grouped by month (in the
+    active timezone), product GST / IGST rate and line total, with the number
+    of lines and units in each group. Read straight from SalesReport so it does
+    not depend on the rollup being backfilled.
+    """
+    tz = timezone.get_current_timezone()
+    return (
+        SalesReport.objects.filter(
+            store_owner=store_owner,
+            is_deleted=False,
+            sale_date__gte=datetime(year, 4, 1, tzinfo=tz),
+            sale_date__lt=datetime(year + 1, 4, 1, tzinfo=tz),
+        )
+        .annotate(month=TruncMonth('sale_date', tzinfo=tz))
+        .values('month', 'product__gst', 'product__igst', 'total_price')
+        .annotate(lines=Count('id'), quantity=Sum('quantity'))
+        .order_by()
+    )
@@ -0,0 +1,278 @@
+"""
+Indexed, ranked search over products and shop customers.
+
+Backends share one interface: products(queryset, query) / customers(queryset,
+query) narrow an already tenant-filtered queryset to the matches and order it
+best match first.
+
+- PostgreSQL: pg_trgm GIN index (substring ILIKE, similarity) plus a tsvector
+  GIN index (whole words), over one expression per table.
+- SQLite: FTS5 tables with the trigram tokenizer (substring match, like
+  icontains, ranked by bm25) kept in sync by triggers, so bulk inserts and
+  queryset updates are indexed too.
+- icontains: the original unindexed filter; used when the index is missing or
+  the query is shorter than a trigram.
+
+Indexes are created after `migrate` (post_migrate) or with
+`python manage.py build_search_index`.
+"""
+import logging
+import re
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import BooleanField, F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Product, ShopCustomer
+
+# Searched columns, in weight order
+PRODUCT_SEARCH_FIELDS = ('name', 'category', 'hsn_code', 'batch_number')
+CUSTOMER_SEARCH_FIELDS = ('name', 'phone', 'email', 'place')
+
+# Trigram indexes cannot match anything shorter
+MIN_TERM_LENGTH = 3
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _search_tables():
+    return [
+        (Product._meta.db_table, PRODUCT_SEARCH_FIELDS),
+        (ShopCustomer._meta.db_table, CUSTOMER_SEARCH_FIELDS),
+    ]
+
+
+def search_terms(query):
+    """
+    (indexed, short) words of the query. The index matches the first list; words
+    shorter than a trigram are checked with icontains on the narrowed rows. No
+    indexed words means the whole query falls back to icontains.
+    """
+    words = _WORD_RE.findall(query)
+    return [w for w in words if len(w) >= MIN_TERM_LENGTH], [w for w in words if len(w) < MIN_TERM_LENGTH]
+
+
+def _any_field_contains(fields, word):
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f'{field}__icontains': word})
+    return condition
+
+
+class IContainsSearch:
+    """Unindexed substring filter (leading-wildcard LIKE on every field)."""
+
+    name = 'icontains'
+
+    def is_installed(self):
+        return True
+
+    def install(self):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def _filter(self, queryset, query, fields):
+        return queryset.filter(_any_field_contains(fields, query))
+
+    def products(self, queryset, query):
+        return self._filter(queryset, query, PRODUCT_SEARCH_FIELDS).order_by('category', 'name', 'pk')
+
+    def customers(self, queryset, query):
+        return self._filter(queryset, query, CUSTOMER_SEARCH_FIELDS).order_by('name', 'phone')
+
+
+class SqliteFtsSearch(IContainsSearch):
+    """FTS5 trigram tables mirroring store_product / store_shopcustomer through triggers."""
+
+    name = 'sqlite-fts5'
+
+    def __init__(self):
+        self._installed = None
+
+    def is_installed(self):
+        if self._installed is None:
+            names = [f'{table}_search' for table, _ in _search_tables()]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name IN (%s, %s)", names,
+                )
+                self._installed = cursor.fetchone()[0] == len(names)
+        return self._installed
+
+    def install(self):
+        self._installed = None
+        created = not self.is_installed()
+        with connection.cursor() as cursor:
+            for table, fields in _search_tables():
+                fts = f'{table}_search'
+                columns = ', '.join(fields)
+                new_values = ', '.join(f'new.{field}' for field in fields)
+                old_values = ', '.join(f'old.{field}' for field in fields)
+                delete_old = (
+                    f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+                )
+                insert_new = f'INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});'
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                    f"{columns}, content='{table}', content_rowid='id', tokenize='trigram')"
+                )
+                cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END')
+                cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END')
+                cursor.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} '
+                    f'BEGIN {delete_old} {insert_new} END'
+                )
+        self._installed = None
+        # Triggers keep an existing index current; only a new one needs filling
+        if created:
+            self.rebuild()
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            for table, _ in _search_tables():
+                fts = f'{table}_search'
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def _search(self, queryset, query, table, fields, tie_break):
+        terms, short = search_terms(query)
+        if not terms or not self.is_installed():
+            return None
+        for word in short:
+            queryset = queryset.filter(_any_field_contains(fields, word))
+        fts = f'{table}_search'
+        # Every word must occur somewhere (AND); quoted so punctuation is literal
+        match = ' '.join('"%s"' % term.replace('"', '""') for term in terms)
+        return queryset.extra(
+            tables=[fts],
+            where=[f'{fts}.rowid = {table}.id', f'{fts} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'{fts}.rank'},
+        ).order_by('search_rank', *tie_break)
+
+    def products(self, queryset, query):
+        ranked = self._search(queryset, query, Product._meta.db_table, PRODUCT_SEARCH_FIELDS, ('name', 'pk'))
+        return super().products(queryset, query) if ranked is None else ranked
+
+    def customers(self, queryset, query):
+        ranked = self._search(queryset, query, ShopCustomer._meta.db_table, CUSTOMER_SEARCH_FIELDS, ('name', 'phone'))
+        return super().customers(queryset, query) if ranked is None else ranked
+
+
+class PostgresSearch(IContainsSearch):
+    """pg_trgm and tsvector expression indexes; ranked by word similarity plus ts_rank."""
+
+    name = 'postgresql'
+
+    def __init__(self):
+        self._installed = None
+
+    @staticmethod
+    def document(fields):
+        """The indexed expression; queries must repeat it verbatim to use the index."""
+        return " || ' ' || ".join(f"coalesce({field}, '')" for field in fields)
+
+    def is_installed(self):
+        if self._installed is None:
+            names = [f'{table}_search_trgm' for table, _ in _search_tables()]
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT count(*) FROM pg_indexes WHERE indexname = ANY(%s)', [names])
+                self._installed = cursor.fetchone()[0] == len(names)
+        return self._installed
+
+    def install(self):
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            for table, fields in _search_tables():
+                document = self.document(fields)
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {table}_search_trgm ON {table} '
+                    f'USING gin (({document}) gin_trgm_ops)'
+                )
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {table}_search_tsv ON {table} '
+                    f"USING gin (to_tsvector('simple', {document}))"
+                )
+        self._installed = None
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            for table, _ in _search_tables():
+                cursor.execute(f'REINDEX INDEX {table}_search_trgm')
+                cursor.execute(f'REINDEX INDEX {table}_search_tsv')
+
+    def _search(self, queryset, query, fields, tie_break):
+        terms, short = search_terms(query)
+        if not terms or not self.is_installed():
+            return None
+        for word in short:
+            queryset = queryset.filter(_any_field_contains(fields, word))
+        document = self.document(fields)
+        # All words as substrings (trigram index) or all as whole words (tsvector index)
+        like = ' AND '.join([f'({document}) ILIKE %s'] * len(terms))
+        like_params = ['%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%' for term in terms]
+        matches = RawSQL(
+            f"(({like}) OR to_tsvector('simple', {document}) @@ plainto_tsquery('simple', %s))",
+            [*like_params, query],
+            output_field=BooleanField(),
+        )
+        rank = RawSQL(
+            f"word_similarity(%s, {document}) + ts_rank(to_tsvector('simple', {document}), "
+            f"plainto_tsquery('simple', %s))",
+            [query, query],
+            output_field=FloatField(),
+        )
+        return queryset.filter(matches).annotate(search_rank=rank).order_by(F('search_rank').desc(), *tie_break)
+
+    def products(self, queryset, query):
+        ranked = self._search(queryset, query, PRODUCT_SEARCH_FIELDS, ('name', 'pk'))
+        return super().products(queryset, query) if ranked is None else ranked
+
+    def customers(self, queryset, query):
+        ranked = self._search(queryset, query, CUSTOMER_SEARCH_FIELDS, ('name', 'phone'))
+        return super().customers(queryset, query) if ranked is None else ranked
+
+
+BACKENDS = {
+    'icontains': IContainsSearch,
+    'sqlite': SqliteFtsSearch,
+    'postgresql': PostgresSearch,
+}
+
+_backends = {}
+
+
+def get_search_backend(name=None):
+    """
+    Backend for the default database. STORE_SEARCH_BACKEND='icontains' forces the
+    unindexed path; 'auto' picks the database's own index.
+    """
+    name = name or settings.STORE_SEARCH_BACKEND
+    if name == 'auto':
+        name = connection.vendor if connection.vendor in BACKENDS else 'icontains'
+    if name not in _backends:
+        _backends[name] = BACKENDS[name]()
+    return _backends[name]
+
+
+def install_search_index(**kwargs):
+    """post_migrate hook: create the database's search index if it has one."""
+    backend = get_search_backend('auto')
+    try:
+        backend.install()
+    except DatabaseError as exc:
+        # e.g. no permission to CREATE EXTENSION or an SQLite built without FTS5;
+        # search keeps working through icontains
+        logger.warning('Search index not installed (%s backend): %s', backend.name, exc)
+
+
+def search_products(queryset, query):
+    return get_search_backend().products(queryset, query)
+
+
+def search_customers(queryset, query):
+    return get_search_backend().customers(queryset, query)
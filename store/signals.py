@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import CustomUser
+
+from .catalog import bump_catalog_version
+from .models import Product, ShopCustomer
+from .storefront_cache import storefront_cache
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_catalog_cache(sender, instance, **kwargs):
+    """Any product change (stock, price, archive, image) drops the store's cached catalogue pages and records."""
+    bump_catalog_version(instance.store_owner_id)
+    transaction.on_commit(lambda: storefront_cache.invalidate_products(instance.store_owner_id))
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_store_owner(sender, instance, **kwargs):
+    transaction.on_commit(lambda: storefront_cache.invalidate_owner(instance.pk))
+
+
+@receiver(post_save, sender=ShopCustomer)
+@receiver(post_delete, sender=ShopCustomer)
+def invalidate_shop_customer(sender, instance, **kwargs):
+    transaction.on_commit(lambda: storefront_cache.invalidate_customer(instance.store_owner_id, instance.pk))
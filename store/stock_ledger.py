@@ -0,0 +1,270 @@
+"""
+Append-only stock ledger (StockMovement): every purchase, sale, purchase return,
+invoice delete / restore and stock edit, with the product's running balance.
+
+Movements are ordered by (moved_on, id). A movement dated before later ones
+(a back-dated sale, an old invoice deleted) shifts the balances of those later
+rows, so every row always holds the stock at that point and "stock on date X"
+is one indexed lookup per product (stock_on). Invoice delete / restore
+movements are dated on the sale date, so reports see a deleted invoice as if
+it had never been sold, as they always have.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Product, ProductReturn, SalesReport, StockMovement
+
+# Units in (+1) or out (-1) of stock for each order movement
+ORDER_MOVEMENT_SIGNS = {
+    StockMovement.SALE: -1,
+    StockMovement.INVOICE_DELETE: 1,
+    StockMovement.INVOICE_RESTORE: -1,
+}
+
+
+def _as_date(value):
+    """Date of a DateField value, DateTimeField value (active timezone) or 'YYYY-MM-DD' string."""
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    if hasattr(value, 'date'):
+        return (timezone.localtime(value) if timezone.is_aware(value) else value).date()
+    return value
+
+
+def _balance_on(product_ids, day):
+    """{product_id: stock on day} from the rows already in the ledger."""
+    balances = Product.objects.filter(pk__in=product_ids).annotate(stock=stock_on(day))
+    return dict(balances.values_list('pk', 'stock'))
+
+
+def append_movements(movements):
+    """
+    Give unsaved StockMovement rows their balances, shift the balances of any
+    later-dated rows of the same products, and insert them. Runs one query per
+    distinct date plus two, however many rows; call inside the caller's
+    transaction, with the products locked or saved in it.
+    """
+    movements = [m for m in movements if m.quantity]
+    if not movements:
+        return []
+
+    dates = defaultdict(set)
+    for m in movements:
+        dates[m.moved_on].add(m.product_id)
+    before = {}
+    for day, product_ids in dates.items():
+        for product_id, balance in _balance_on(product_ids, day).items():
+            before[(product_id, day)] = balance
+
+    batch = defaultdict(list)  # product_id -> movements already placed in this batch
+    for m in movements:
+        placed = batch[m.product_id]
+        m.balance = before[(m.product_id, m.moved_on)] + m.quantity + sum(
+            earlier.quantity for earlier in placed if earlier.moved_on <= m.moved_on
+        )
+        for earlier in placed:
+            if earlier.moved_on > m.moved_on:
+                earlier.balance += m.quantity
+        placed.append(m)
+
+    # Existing rows dated after a new movement move by its quantity: a row
+    # dated after d gets the sum of the new quantities dated before it
+    whens = []
+    later = Q()
+    for product_id, placed in batch.items():
+        totals = defaultdict(int)
+        for m in placed:
+            totals[m.moved_on] += m.quantity
+        running = 0
+        steps = []
+        for day in sorted(totals):
+            running += totals[day]
+            steps.append((day, running))
+        for day, shift in reversed(steps):
+            whens.append(When(product_id=product_id, moved_on__gt=day, then=F('balance') + Value(shift)))
+        later |= Q(product_id=product_id, moved_on__gt=steps[0][0])
+    StockMovement.objects.filter(later).update(
+        balance=Case(*whens, default=F('balance'), output_field=IntegerField()),
+    )
+    return StockMovement.objects.bulk_create(movements)
+
+
+def record_purchases(products):
+    """Opening stock of new products (saved, or bulk-created with their pks)."""
+    return append_movements([
+        StockMovement(
+            store_owner_id=product.store_owner_id,
+            product_id=product.pk,
+            kind=StockMovement.PURCHASE,
+            moved_on=_as_date(product.purchase_date),
+            quantity=product.initial_stock,
+        )
+        for product in products
+    ])
+
+
+def record_order_stock(order, kind):
+    """Sale, invoice delete or invoice restore of every line of an order, on the sale dates."""
+    sign = ORDER_MOVEMENT_SIGNS[kind]
+    quantities = defaultdict(int)
+    for product_id, quantity, sale_date in SalesReport.objects.filter(order=order).values_list(
+        'product_id', 'quantity', 'sale_date',
+    ).order_by('pk'):
+        quantities[(product_id, _as_date(sale_date))] += quantity
+    return append_movements([
+        StockMovement(
+            store_owner_id=order.store_owner_id,
+            product_id=product_id,
+            kind=kind,
+            moved_on=day,
+            quantity=sign * quantity,
+            order=order,
+        )
+        for (product_id, day), quantity in quantities.items()
+    ])
+
+
+def record_return(product_return):
+    """Stock sent back to the supplier, on the return date."""
+    product = product_return.product
+    return append_movements([StockMovement(
+        store_owner_id=product.store_owner_id,
+        product_id=product.pk,
+        kind=StockMovement.RETURN,
+        moved_on=_as_date(product_return.return_date),
+        quantity=-product_return.stock_returned,
+        product_return=product_return,
+    )])
+
+
+def record_adjustment(product, quantity_before):
+    """A stock figure edited by hand (Update Product), from today."""
+    return append_movements([StockMovement(
+        store_owner_id=product.store_owner_id,
+        product_id=product.pk,
+        kind=StockMovement.ADJUSTMENT,
+        moved_on=timezone.localdate(),
+        quantity=product.quantity - quantity_before,
+    )])
+
+
+def record_purchase_edit(product):
+    """
+    Move the product's purchase movement to its current purchase_date and
+    initial_stock (Update Product) and recompute the balances of every row
+    after it. Call inside the caller's transaction, after the product is saved.
+    """
+    movements = list(StockMovement.objects.filter(product_id=product.pk).order_by('moved_on', 'id'))
+    purchase = next((m for m in movements if m.kind == StockMovement.PURCHASE), None)
+    if purchase is None:
+        return record_purchases([product])
+    moved_on = _as_date(product.purchase_date)
+    if (purchase.moved_on, purchase.quantity) == (moved_on, product.initial_stock):
+        return []
+    purchase.moved_on = moved_on
+    purchase.quantity = product.initial_stock
+    purchase.save(update_fields=['moved_on', 'quantity'])
+
+    movements.sort(key=lambda m: (m.moved_on, m.id))
+    balance = 0
+    changed = []
+    for m in movements:
+        balance += m.quantity
+        if m.balance != balance:
+            m.balance = balance
+            changed.append(m)
+    StockMovement.objects.bulk_update(changed, ['balance'], batch_size=1000)
+    return changed
+
+
+def stock_on(day):
+    """Product annotation: units in stock at the end of day (0 before the first movement)."""
+    latest = StockMovement.objects.filter(
+        product=OuterRef('pk'),
+        moved_on__lte=day,
+    ).order_by('-moved_on', '-id').values('balance')[:1]
+    return Coalesce(Subquery(latest), 0)
+
+
+def annotate_period_stock(products, start, end):
+    """
+    Annotate products with opening_stock (stock the day before start, plus the
+    purchased quantity for products bought in the period) and closing_stock
+    (stock at the end of end).
+    """
+    return products.annotate(
+        opening_stock=stock_on(start - timedelta(days=1)) + Case(
+            When(purchase_date__gte=start, then=F('initial_stock')),
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        closing_stock=stock_on(end),
+    )
+
+
+def rebuild_stock_ledger(store_owner=None, batch_size=1000):
+    """
+    Recompute the ledger for one store owner (or all) from the products' opening
+    stock, live sales and purchase returns. Where that does not end at the
+    product's current quantity (stock edited by hand before the ledger existed),
+    an adjustment dated today makes up the difference. Returns the number of
+    movements written.
+    """
+    products = Product.objects.all()
+    sales = SalesReport.objects.filter(is_deleted=False)
+    returns = ProductReturn.objects.all()
+    if store_owner is not None:
+        products = products.filter(store_owner=store_owner)
+        sales = sales.filter(store_owner=store_owner)
+        returns = returns.filter(product__store_owner=store_owner)
+
+    # product_id -> [(moved_on, rank within the day, movement)]
+    moves = defaultdict(list)
+    for product_id, quantity, sale_date, order_id in sales.values_list(
+        'product_id', 'quantity', 'sale_date', 'order_id',
+    ).order_by('pk').iterator(chunk_size=2000):
+        moves[product_id].append((_as_date(sale_date), 1, StockMovement(
+            kind=StockMovement.SALE, quantity=-quantity, order_id=order_id,
+        )))
+    for product_return in returns.only('pk', 'product_id', 'stock_returned', 'return_date').order_by('pk'):
+        moves[product_return.product_id].append((product_return.return_date, 1, StockMovement(
+            kind=StockMovement.RETURN, quantity=-product_return.stock_returned, product_return_id=product_return.pk,
+        )))
+
+    today = timezone.localdate()
+    rows = []
+    for product in products.only(
+        'pk', 'store_owner_id', 'purchase_date', 'initial_stock', 'quantity',
+    ).order_by('pk').iterator(chunk_size=2000):
+        product_moves = moves.pop(product.pk, [])
+        product_moves.append((product.purchase_date, 0, StockMovement(
+            kind=StockMovement.PURCHASE, quantity=product.initial_stock,
+        )))
+        difference = product.quantity - sum(m.quantity for _, _, m in product_moves)
+        if difference:
+            product_moves.append((max(today, product.purchase_date), 2, StockMovement(
+                kind=StockMovement.ADJUSTMENT, quantity=difference,
+            )))
+        balance = 0
+        # Purchase first and adjustment last within a day; the sort is stable,
+        # so sales and returns of a day keep their recorded order
+        for moved_on, _, movement in sorted(product_moves, key=lambda m: m[:2]):
+            if not movement.quantity:
+                continue
+            balance += movement.quantity
+            movement.store_owner_id = product.store_owner_id
+            movement.product_id = product.pk
+            movement.moved_on = moved_on
+            movement.balance = balance
+            rows.append(movement)
+
+    ledger = StockMovement.objects.all()
+    if store_owner is not None:
+        ledger = ledger.filter(store_owner=store_owner)
+    ledger.delete()
+    StockMovement.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
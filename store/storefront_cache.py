@@ -0,0 +1,267 @@
+"""
+In-process, per-tenant cache for the storefront's hot lookups.
+
+For each store owner it keeps the CustomUser row, the logged-in shop customers
+and a compact record per product (price, tax rates, stock, archived flag, unit
+label and the few fields the storefront templates show). The records of a tenant
+are loaded in one query. Tenants are evicted least recently used once the
+estimated size passes STORE_TENANT_CACHE_MAX_BYTES.
+
+Invalidation:
+- Product / CustomUser / ShopCustomer post_save and post_delete (store.signals)
+  drop the affected entry in this process.
+- Every entry remembers the store's catalogue version (store.catalog). Other
+  processes bump it on product changes and checkout, so with a shared cache
+  backend their changes are seen on the next request. With the default
+  per-process cache, STORE_TENANT_CACHE_TTL bounds how stale another process
+  can be.
+
+Stock read here only gates the add-to-cart form. Checkout re-reads and locks the
+rows before it decrements stock.
+"""
+import copy
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from accounts.models import CustomUser
+
+from .catalog import catalog_version
+from .models import Product, ShopCustomer
+
+CACHED_PRODUCT_FIELDS = (
+    'id', 'store_owner_id', 'name', 'price', 'gst', 'igst', 'quantity', 'is_archived', 'category',
+    'hsn_code', 'batch_number', 'purchased_from', 'image', 'measurement_type', 'unit_value', 'unit_capacity',
+)
+
+# Rough per-object overheads for the size estimate
+_OWNER_BYTES = 4096
+_CUSTOMER_BYTES = 1024
+
+
+class CachedProduct:
+    """Read-only storefront view of a Product; template-compatible for the fields it carries."""
+
+    __slots__ = CACHED_PRODUCT_FIELDS + ('unit_label',)
+
+    def __init__(self, row):
+        for field in CACHED_PRODUCT_FIELDS:
+            setattr(self, field, row[field])
+        # FieldFile so templates keep using product.image / product.image.url
+        self.image = Product._meta.get_field('image').attr_class(None, Product._meta.get_field('image'), row['image'])
+        self.unit_label = Product(
+            measurement_type=self.measurement_type,
+            unit_value=self.unit_value,
+            unit_capacity=self.unit_capacity,
+        ).get_unit_label()
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def uses_igst(self):
+        return self.igst is not None and self.igst > 0
+
+    def get_unit_label(self):
+        return self.unit_label
+
+    def size(self):
+        return sys.getsizeof(self) + sum(
+            sys.getsizeof(getattr(self, field)) for field in self.__slots__ if field != 'image'
+        ) + sys.getsizeof(self.image.name or '')
+
+
+class _TenantEntry:
+    __slots__ = ('owner', 'products', 'products_size', 'customers', 'version', 'loaded_at', 'size')
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.products = None
+        self.products_size = 0
+        self.customers = {}
+        self.version = None
+        self.loaded_at = 0.0
+        self.size = _OWNER_BYTES
+
+
+class TenantCatalogCache:
+    def __init__(self, max_bytes=None, ttl=None):
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()  # owner pk -> _TenantEntry, least recently used first
+        self._usernames = {}  # username -> owner pk
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes if self._max_bytes is not None else settings.STORE_TENANT_CACHE_MAX_BYTES
+
+    @property
+    def ttl(self):
+        return self._ttl if self._ttl is not None else settings.STORE_TENANT_CACHE_TTL
+
+    # -- bookkeeping (callers hold the lock) --
+
+    def _touch(self, pk):
+        entry = self._entries.get(pk)
+        if entry is not None:
+            self._entries.move_to_end(pk)
+        return entry
+
+    def _resize(self, entry, size):
+        self._bytes += size - entry.size
+        entry.size = size
+
+    def _drop(self, pk):
+        entry = self._entries.pop(pk, None)
+        if entry is not None:
+            self._bytes -= entry.size
+            self._usernames.pop(entry.owner.username, None)
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+
+    def _entry_for(self, store_owner):
+        entry = self._touch(store_owner.pk)
+        if entry is None:
+            entry = _TenantEntry(copy.copy(store_owner))
+            self._entries[store_owner.pk] = entry
+            self._usernames[store_owner.username] = store_owner.pk
+            self._bytes += entry.size
+        return entry
+
+    # -- lookups --
+
+    def store_owner(self, username):
+        """CustomUser for a storefront username, or None. Returns a copy callers may modify."""
+        with self._lock:
+            pk = self._usernames.get(username)
+            entry = self._touch(pk) if pk is not None else None
+            if entry is not None:
+                self.hits += 1
+                return copy.copy(entry.owner)
+        self.misses += 1
+        owner = CustomUser.objects.filter(username=username).first()
+        if owner is not None:
+            with self._lock:
+                self._entry_for(owner)
+                self._evict()
+        return owner
+
+    def customer(self, store_owner, phone):
+        """The store's ShopCustomer with this phone, or None. Returns a copy callers may modify."""
+        with self._lock:
+            entry = self._entry_for(store_owner)
+            cached = entry.customers.get(phone)
+            if cached is not None:
+                self.hits += 1
+                return copy.copy(cached)
+        self.misses += 1
+        customer = ShopCustomer.objects.filter(phone=phone, store_owner=store_owner).first()
+        if customer is not None:
+            with self._lock:
+                entry = self._entry_for(store_owner)
+                if phone not in entry.customers:
+                    entry.customers[phone] = copy.copy(customer)
+                    self._resize(entry, entry.size + _CUSTOMER_BYTES)
+                self._evict()
+        return customer
+
+    def products(self, store_owner):
+        """{product id: CachedProduct} for every product of the store, archived included."""
+        version = catalog_version(store_owner.pk)
+        with self._lock:
+            entry = self._entry_for(store_owner)
+            if (
+                entry.products is not None
+                and entry.version == version
+                and time.monotonic() - entry.loaded_at < self.ttl
+            ):
+                self.hits += 1
+                return entry.products
+        self.misses += 1
+        products = {
+            row['id']: CachedProduct(row)
+            for row in Product.objects.filter(store_owner=store_owner).values(*CACHED_PRODUCT_FIELDS)
+        }
+        size = sum(product.size() for product in products.values())
+        with self._lock:
+            entry = self._entry_for(store_owner)
+            self._resize(entry, entry.size - entry.products_size + size)
+            entry.products = products
+            entry.products_size = size
+            entry.version = version
+            entry.loaded_at = time.monotonic()
+            self._evict()
+        return products
+
+    def product(self, store_owner, product_id):
+        """One CachedProduct of the store, or None (falls back to a single-row query on a miss)."""
+        product = self.products(store_owner).get(product_id)
+        if product is not None:
+            return product
+        # Created in another process since the load: fetch just this row
+        row = Product.objects.filter(store_owner=store_owner, pk=product_id).values(*CACHED_PRODUCT_FIELDS).first()
+        if row is None:
+            return None
+        product = CachedProduct(row)
+        with self._lock:
+            entry = self._entries.get(store_owner.pk)
+            if entry is not None and entry.products is not None:
+                entry.products[product.id] = product
+                entry.products_size += product.size()
+                self._resize(entry, entry.size + product.size())
+                self._evict()
+        return product
+
+    # -- invalidation --
+
+    def invalidate_products(self, store_owner_pk):
+        with self._lock:
+            entry = self._entries.get(store_owner_pk)
+            if entry is not None and entry.products is not None:
+                self._resize(entry, entry.size - entry.products_size)
+                entry.products = None
+                entry.products_size = 0
+
+    def invalidate_owner(self, store_owner_pk):
+        with self._lock:
+            self._drop(store_owner_pk)
+
+    def invalidate_customer(self, store_owner_pk, customer_pk):
+        with self._lock:
+            entry = self._entries.get(store_owner_pk)
+            if entry is None:
+                return
+            # By pk, not phone: an edit may have changed the phone the entry is keyed by
+            for phone in [phone for phone, cached in entry.customers.items() if cached.pk == customer_pk]:
+                del entry.customers[phone]
+                self._resize(entry, entry.size - _CUSTOMER_BYTES)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._usernames.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'tenants': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+storefront_cache = TenantCatalogCache()
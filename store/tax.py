@@ -0,0 +1,232 @@
+"""
+GST arithmetic shared by the cart, checkout, invoices and stock / sales reports.
+
+Amounts are worked in integer paise and rates in basis points (5% = 500), so
+every entry point rounds the same way:
+
+- tax on a taxable amount: taxable x rate, rounded half up to the paise;
+- the taxable part of a tax-inclusive total: total / (1 + rate), rounded half
+  up, and tax = total - taxable, so the two always add back to the total;
+- CGST = tax / 2 rounded half up and SGST = tax - CGST (an odd paisa goes to
+  CGST), so the halves always add back to the GST;
+- IGST replaces CGST + SGST when the product has an IGST rate above zero.
+
+add_tax() / extract_tax() take one entry per row and return TaxColumns of
+Decimals. With NumPy installed, batches of NUMPY_MIN_ROWS rows or more are
+computed as int64 arrays; smaller batches (and installs without NumPy) use
+Python integers. Both give the same figures.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import islice
+from operator import add
+
+from .money import ZERO as ZERO_MONEY, Money, to_paise
+
+try:
+    import numpy
+except ImportError:  # optional; the integer path below gives the same results
+    numpy = None
+
+# Below this many rows building the arrays costs more than it saves
+NUMPY_MIN_ROWS = 256
+
+# Report rows are taxed in chunks of this many (see in_batches)
+BATCH_SIZE = 2000
+
+_BASIS_POINTS = 10000
+_HUNDRED = Decimal(100)
+_CENT = Decimal('0.01')
+_ZERO = Decimal('0.00')
+
+# A store uses a handful of GST / IGST rates; their basis points are kept here
+_basis_points = {}
+
+
+def to_basis_points(rate):
+    """Percentage (18, '18.00', Decimal('2.5')) -> basis points (1800, 250); None counts as zero."""
+    try:
+        return _basis_points[rate]
+    except KeyError:
+        pass
+    except TypeError:  # unhashable
+        return to_paise(rate)
+    points = to_paise(rate)
+    if len(_basis_points) < 1000:
+        _basis_points[rate] = points
+    return points
+
+
+def from_paise(paise):
+    return _CENT * paise
+
+
+def uses_igst(igst_rate):
+    """IGST applies instead of CGST + SGST when the product has an IGST rate above zero."""
+    return igst_rate is not None and igst_rate > 0
+
+
+def _div_half_up(numerator, denominator):
+    """numerator / denominator rounded half up (away from zero); denominator > 0."""
+    quotient = (2 * abs(numerator) + denominator) // (2 * denominator)
+    return quotient if numerator >= 0 else -quotient
+
+
+def _split_ints(taxable, tax, igst_bp):
+    if igst_bp > 0:
+        return taxable, 0, 0, tax
+    cgst = _div_half_up(tax, 2)
+    return taxable, cgst, tax - cgst, 0
+
+
+def _add_tax_ints(taxable, gst_bp, igst_bp):
+    rate = igst_bp if igst_bp > 0 else gst_bp
+    return _split_ints(taxable, _div_half_up(taxable * rate, _BASIS_POINTS), igst_bp)
+
+
+def _extract_tax_ints(total, gst_bp, igst_bp):
+    rate = igst_bp if igst_bp > 0 else gst_bp
+    taxable = _div_half_up(total * _BASIS_POINTS, _BASIS_POINTS + rate) if rate > 0 else total
+    return _split_ints(taxable, total - taxable, igst_bp)
+
+
+def _np_div_half_up(numerator, denominator):
+    quotient = (2 * numpy.abs(numerator) + denominator) // (2 * denominator)
+    return numpy.where(numerator >= 0, quotient, -quotient)
+
+
+def _np_columns(amounts, gst_bp, igst_bp, inclusive):
+    amounts = numpy.asarray(amounts, dtype=numpy.int64)
+    igst_bp = numpy.asarray(igst_bp, dtype=numpy.int64)
+    is_igst = igst_bp > 0
+    rate = numpy.where(is_igst, igst_bp, numpy.asarray(gst_bp, dtype=numpy.int64))
+    if inclusive:
+        taxable = _np_div_half_up(amounts * _BASIS_POINTS, _BASIS_POINTS + rate)
+        tax = amounts - taxable
+    else:
+        taxable = amounts
+        tax = _np_div_half_up(amounts * rate, _BASIS_POINTS)
+    cgst = numpy.where(is_igst, 0, _np_div_half_up(tax, 2))
+    sgst = numpy.where(is_igst, 0, tax - cgst)
+    igst = numpy.where(is_igst, tax, 0)
+    return {
+        'taxable': taxable.tolist(), 'cgst': cgst.tolist(), 'sgst': sgst.tolist(), 'igst': igst.tolist(),
+        'gst': (cgst + sgst).tolist(), 'tax': tax.tolist(), 'total': (taxable + tax).tolist(),
+    }
+
+
+def _int_columns(amounts, gst_bp, igst_bp, inclusive):
+    kernel = _extract_tax_ints if inclusive else _add_tax_ints
+    rows = list(map(kernel, amounts, gst_bp, igst_bp))
+    if not rows:
+        return {name: [] for name in TaxColumns.COLUMNS}
+    taxable, cgst, sgst, igst = map(list, zip(*rows))
+    return {'taxable': taxable, 'cgst': cgst, 'sgst': sgst, 'igst': igst}
+
+
+class TaxColumns:
+    """
+    Per-row results of add_tax() / extract_tax(), as lists of Decimal rupees:
+    taxable, cgst, sgst, gst (= cgst + sgst), igst, tax, total; uses_igst is a
+    list of bools. `paise` holds the integer columns; each Decimal column is
+    built the first time it is read.
+    """
+
+    COLUMNS = ('taxable', 'cgst', 'sgst', 'gst', 'igst', 'tax', 'total')
+
+    def __init__(self, paise, uses_igst):
+        self.paise = paise
+        self.uses_igst = uses_igst
+
+    def _paise(self, name):
+        try:
+            return self.paise[name]
+        except KeyError:
+            pass
+        if name == 'gst':
+            column = list(map(add, self.paise['cgst'], self.paise['sgst']))
+        elif name == 'tax':
+            column = list(map(add, self._paise('gst'), self.paise['igst']))
+        else:  # total
+            column = list(map(add, self.paise['taxable'], self._paise('tax')))
+        self.paise[name] = column
+        return column
+
+    def __getattr__(self, name):
+        if name not in self.COLUMNS:
+            raise AttributeError(name)
+        # Most rows have a zero IGST or zero CGST / SGST; those share one Decimal
+        column = [_CENT * paise if paise else _ZERO for paise in self._paise(name)]
+        setattr(self, name, column)
+        return column
+
+    def money(self, name):
+        """A column as store.money.Money, for rows that are summed or sent as JSON."""
+        return [Money(paise) if paise else ZERO_MONEY for paise in self._paise(name)]
+
+    def __len__(self):
+        return len(self.uses_igst)
+
+    def row(self, index):
+        """One row as a dict with the column names (and uses_igst) as keys."""
+        values = {name: _CENT * self._paise(name)[index] for name in self.COLUMNS}
+        values['uses_igst'] = self.uses_igst[index]
+        return values
+
+    def rows(self):
+        return (self.row(index) for index in range(len(self)))
+
+
+def _to_paise_list(amounts):
+    try:
+        # Decimal amounts (model fields, sums of them) without a call per row
+        return [int((amount * _HUNDRED).to_integral_value(ROUND_HALF_UP)) if amount else 0 for amount in amounts]
+    except (AttributeError, TypeError):
+        return [to_paise(amount) for amount in amounts]
+
+
+def _columns(amounts, gst_rates, igst_rates, inclusive):
+    paise = _to_paise_list(amounts)
+    gst_bp = [to_basis_points(rate) for rate in gst_rates]
+    igst_bp = [to_basis_points(rate) for rate in igst_rates]
+    if numpy is not None and len(paise) >= NUMPY_MIN_ROWS:
+        columns = _np_columns(paise, gst_bp, igst_bp, inclusive)
+    else:
+        columns = _int_columns(paise, gst_bp, igst_bp, inclusive)
+    return TaxColumns(columns, [points > 0 for points in igst_bp])
+
+
+def add_tax(taxable_amounts, gst_rates, igst_rates):
+    """Tax on top of taxable amounts (cart lines, stock values, purchases)."""
+    return _columns(taxable_amounts, gst_rates, igst_rates, inclusive=False)
+
+
+def extract_tax(totals, gst_rates, igst_rates):
+    """Tax contained in tax-inclusive totals (sales revenue)."""
+    return _columns(totals, gst_rates, igst_rates, inclusive=True)
+
+
+def add_tax_one(taxable_amount, gst_rate, igst_rate):
+    """add_tax() for a single row, as a dict."""
+    return add_tax([taxable_amount], [gst_rate], [igst_rate]).row(0)
+
+
+def extract_tax_one(total, gst_rate, igst_rate):
+    """extract_tax() for a single row, as a dict."""
+    return extract_tax([total], [gst_rate], [igst_rate]).row(0)
+
+
+def split_gst(gst):
+    """GST amount -> (CGST, SGST), the odd paisa going to CGST."""
+    paise = to_paise(gst)
+    cgst = _div_half_up(paise, 2)
+    return from_paise(cgst), from_paise(paise - cgst)
+
+
+def in_batches(build_rows, items, size=BATCH_SIZE):
+    """
+    Yield the rows of build_rows(chunk) for `size` items at a time, so streamed
+    reports still tax many rows per add_tax() / extract_tax() call.
+    """
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield from build_rows(chunk)
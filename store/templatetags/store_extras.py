@@ -1,3 +1,5 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
 from django import template
 
 register = template.Library()
@@ -6,3 +8,22 @@ register = template.Library()
 def get_item(dictionary, key):
     """Get an item from a dictionary by key in templates"""
     return dictionary.get(key, [])
+
+
+TWO_PLACES = Decimal('0.01')
+
+
+@register.filter(is_safe=True)
+def money(value):
+    """Same output as floatformat:2 for amounts, without the l10n machinery (hot in invoice rendering)."""
+    if value is None or value == '':
+        return ''
+    try:
+        amount = value if isinstance(value, Decimal) else Decimal(repr(value) if isinstance(value, float) else str(value))
+        amount = amount.quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+    except (InvalidOperation, ValueError, TypeError):
+        return ''
+    if not amount:
+        # floatformat never prints "-0.00"
+        amount = abs(amount)
+    return f'{amount:f}'
@@ -0,0 +1,205 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.forms.models import model_to_dict
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from store.checkout import place_order
+from store.models import Cart, Order, Product, ProductReturn, SalesReport, ShopCustomer, StockMovement
+from store.rollups import financial_year_sales_groups, monthly_report_products, yearly_report_products
+from store.stock_ledger import append_movements, rebuild_stock_ledger, record_return, stock_on
+from store.storefront_cache import storefront_cache
+
+
+class StockLedgerTestCase(TestCase):
+    def setUp(self):
+        storefront_cache.clear()
+        self.owner = CustomUser.objects.create_user(
+            phone='9999999999', email='owner@example.com', username='owner', password='pw',
+            dob=date(1990, 1, 1), location='Pune', company_name='Acme Agro',
+        )
+        self.product = self.create_product('Urea', 100, date(2025, 5, 10))
+
+    def create_product(self, name, quantity, purchase_date):
+        return Product.objects.create(
+            store_owner=self.owner, purchased_from='Kisan Traders', purchase_date=purchase_date,
+            purchase_invoice_number='PI-1', name=name, price=Decimal('250.00'), quantity=quantity,
+            category='Fertiliser', gst=Decimal('5'), hsn_code='3102', batch_number='B1', unit_capacity=Decimal('50'),
+            taxable_unit_amount=Decimal('250.00'),
+        )
+
+    def stock_on(self, day, product=None):
+        product = product or self.product
+        return Product.objects.filter(pk=product.pk).annotate(stock=stock_on(day)).get().stock
+
+    def balances(self, product=None):
+        return list(StockMovement.objects.filter(product=product or self.product).order_by(
+            'moved_on', 'id',
+        ).values_list('kind', 'moved_on', 'quantity', 'balance'))
+
+
+class AppendMovementsTests(StockLedgerTestCase):
+    def movement(self, day, quantity):
+        return StockMovement(
+            store_owner=self.owner, product=self.product, kind=StockMovement.SALE, moved_on=day, quantity=quantity,
+        )
+
+    def test_back_dated_movement_shifts_later_balances(self):
+        append_movements([self.movement(date(2025, 7, 1), -10)])
+        append_movements([self.movement(date(2025, 6, 1), -5)])
+
+        self.assertEqual(self.balances(), [
+            (StockMovement.PURCHASE, date(2025, 5, 10), 100, 100),
+            (StockMovement.SALE, date(2025, 6, 1), -5, 95),
+            (StockMovement.SALE, date(2025, 7, 1), -10, 85),
+        ])
+        self.assertEqual(self.stock_on(date(2025, 6, 15)), 95)
+
+    def test_batch_out_of_date_order(self):
+        append_movements([self.movement(date(2025, 8, 1), -1)])
+        append_movements([
+            self.movement(date(2025, 7, 1), -20),
+            self.movement(date(2025, 6, 1), -3),
+            self.movement(date(2025, 7, 1), -4),
+        ])
+
+        self.assertEqual([row[3] for row in self.balances()], [100, 97, 77, 73, 72])
+
+
+class InvoiceStockTests(StockLedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.customer = ShopCustomer.objects.create(store_owner=self.owner, phone='9000000000', name='Ravi')
+        session = self.client.session
+        session[f'customer_id_{self.owner.username}'] = self.customer.phone
+        session.save()
+
+        Cart.objects.create(
+            store_owner=self.owner, customer=self.customer, product=self.product, quantity=30,
+            unit_price=Decimal('250.00'), total_price=Decimal('7500.00'), transaction_date=date(2025, 6, 2),
+        )
+        self.order = place_order(self.owner, self.customer)
+        self.product.refresh_from_db()
+
+    def post(self, name):
+        return self.client.post(reverse(name, args=[self.owner.username, self.order.pk]))
+
+    def test_checkout_records_sale_on_the_sale_date(self):
+        self.assertEqual(self.product.quantity, 70)
+        self.assertEqual(self.balances()[-1], (StockMovement.SALE, date(2025, 6, 2), -30, 70))
+
+    def test_delete_and_restore_invoice(self):
+        self.post('delete_invoice')
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 100)
+        self.assertEqual(self.balances()[-1], (StockMovement.INVOICE_DELETE, date(2025, 6, 2), 30, 100))
+        self.assertEqual(self.stock_on(date(2025, 6, 2)), 100)
+
+        self.post('restore_invoice')
+        self.product.refresh_from_db()
+        self.assertFalse(Order.objects.get(pk=self.order.pk).is_deleted)
+        self.assertEqual(self.product.quantity, 70)
+        self.assertEqual(self.balances()[-1], (StockMovement.INVOICE_RESTORE, date(2025, 6, 2), -30, 70))
+
+    def test_restore_without_stock_changes_nothing(self):
+        self.post('delete_invoice')
+        Product.objects.filter(pk=self.product.pk).update(quantity=10)
+        movements = StockMovement.objects.count()
+
+        self.post('restore_invoice')
+
+        self.assertTrue(Order.objects.get(pk=self.order.pk).is_deleted)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).quantity, 10)
+        self.assertEqual(StockMovement.objects.count(), movements)
+
+    def test_rebuild_gives_the_same_stock(self):
+        self.post('delete_invoice')
+        self.post('restore_invoice')
+        product_return = ProductReturn.objects.create(
+            product=self.product, purchase_invoice_number='PI-1', returned_invoice_number='R-1',
+            stock_returned=7, current_stock=63, return_date=date(2025, 5, 20),
+            taxable_unit_amount=Decimal('250.00'), gst=Decimal('5'),
+            taxable_total_amount=Decimal('1750.00'), total_amount=Decimal('1837.50'),
+        )
+        record_return(product_return)
+        Product.objects.filter(pk=self.product.pk).update(quantity=63)
+        other = self.create_product('DAP', 40, date(2025, 6, 1))
+        days = [date(2025, 5, 9), date(2025, 5, 10), date(2025, 5, 20), date(2025, 6, 1), date(2025, 6, 2)]
+        before = [(self.stock_on(day), self.stock_on(day, other)) for day in days]
+
+        rebuild_stock_ledger(self.owner)
+
+        self.assertEqual([(self.stock_on(day), self.stock_on(day, other)) for day in days], before)
+        self.assertEqual(self.balances()[-1][3], 63)
+        self.assertEqual(self.balances(other), [(StockMovement.PURCHASE, date(2025, 6, 1), 40, 40)])
+
+
+class PurchaseDateEditTests(StockLedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.owner)
+
+    def update_product(self, **changes):
+        data = {
+            key: value for key, value in model_to_dict(self.product).items()
+            if value is not None and key not in ('id', 'image', 'store_owner')
+        }
+        data.update(changes)
+        response = self.client.post(reverse('update_product_id', args=[self.product.pk]), data)
+        self.assertRedirects(response, reverse('product_list'), fetch_redirect_response=False)
+        self.product.refresh_from_db()
+
+    def test_moving_purchase_date_moves_the_purchase_movement(self):
+        self.update_product(purchase_date='2025-06-05')
+
+        purchase = StockMovement.objects.get(product=self.product, kind=StockMovement.PURCHASE)
+        self.assertEqual((purchase.moved_on, purchase.quantity, purchase.balance), (date(2025, 6, 5), 100, 100))
+        self.assertEqual(self.stock_on(date(2025, 5, 20)), 0)
+        self.assertEqual(self.stock_on(date(2025, 6, 5)), 100)
+
+        june = monthly_report_products(self.owner, 2025, 6).get(pk=self.product.pk)
+        self.assertEqual((june.opening_stock, june.closing_stock), (100, 100))
+        self.assertFalse(monthly_report_products(self.owner, 2025, 5).filter(pk=self.product.pk).exists())
+
+    def test_moving_purchase_date_earlier_keeps_later_balances(self):
+        self.update_product(quantity=90)
+        self.update_product(purchase_date='2025-04-01')
+
+        self.assertEqual(self.stock_on(date(2025, 4, 30)), 100)
+        self.assertEqual(self.stock_on(date.today()), 90)
+        may = monthly_report_products(self.owner, 2025, 5).get(pk=self.product.pk)
+        self.assertEqual(may.opening_stock, 100)
+
+
+class ReportQueryPlanTests(StockLedgerTestCase):
+    """The report lookups use the composite / partial indexes declared on the models."""
+
+    def assertPlanUses(self, queryset, *index_names):
+        plan = queryset.explain()
+        for name in index_names:
+            self.assertIn(name, plan)
+
+    def test_stock_reports(self):
+        self.assertPlanUses(
+            monthly_report_products(self.owner, 2025, 6),
+            'product_owner_purchase_idx', 'stock_move_product_date_idx',
+        )
+        self.assertPlanUses(
+            yearly_report_products(self.owner, 2025),
+            'product_owner_purchase_idx', 'stock_move_product_date_idx',
+        )
+
+    def test_sales_lookups(self):
+        month_start = timezone.make_aware(datetime(2025, 6, 1))
+        self.assertPlanUses(financial_year_sales_groups(self.owner, 2025), 'sales_live_owner_date_idx')
+        self.assertPlanUses(
+            SalesReport.objects.filter(store_owner=self.owner, is_deleted=False, sale_date__gte=month_start),
+            'sales_live_owner_date_idx',
+        )
+        self.assertPlanUses(
+            Order.objects.filter(store_owner=self.owner, is_deleted=False).order_by('-order_date'),
+            'order_live_owner_date_idx',
+        )
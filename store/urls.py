@@ -14,6 +14,7 @@ urlpatterns = [
     path('monthly-purchase-details/', views.monthly_purchase_details, name='monthly_purchase_details'),
     path('yearly-purchase-details/', views.yearly_purchase_details, name='yearly_purchase_details'),
     path('stock-at-date/', views.stock_at_date_view, name='stock_at_date'),
+    path('invoices/export/', views.export_invoices_zip, name='export_invoices_zip'),
          
     # Global Analytics (uses request.user)
     path('analytics-dashboard/', views.analytics_dashboard_view, name='analytics_dashboard'),
@@ -32,6 +33,7 @@ urlpatterns = [
 
     # Product management (for store owners)
     path('manage/add-product/', manage_products.add_new_product, name='add_product'),
+    path('manage/import-products/', manage_products.import_products_view, name='import_products'),
     path('manage/update-product/<int:product_id>/', manage_products.update_existing_product, name='update_product_id'),
     path('manage/update-product/', manage_products.update_existing_product, name='update_product'),
     path('manage/delete-product/<int:product_id>/', manage_products.delete_product, name='delete_product_id'),
@@ -63,6 +65,9 @@ urlpatterns = [
     path('<str:username>/invoice/<int:order_id>/', views.generate_invoice_view, name='generate_invoice_view'),
     path('<str:username>/invoice/<int:order_id>/pdf/', views.generate_invoice_pdf, name='generate_invoice_pdf'),
     path('<str:username>/invoice/<int:order_id>/download/', views.generate_invoice, name='generate_invoice'),
+    path('<str:username>/invoice/<int:order_id>/pdf/jobs/', views.enqueue_invoice_pdf_view, name='enqueue_invoice_pdf'),
+    path('<str:username>/invoice/pdf-jobs/<int:job_id>/', views.invoice_pdf_job_status, name='invoice_pdf_job_status'),
+    path('<str:username>/invoice/pdf-jobs/<int:job_id>/download/', views.invoice_pdf_job_download, name='invoice_pdf_job_download'),
     
     # Invoice deletion and restoration URLs
     path('<str:username>/invoice/delete/<int:order_id>/', views.delete_invoice, name='delete_invoice'),
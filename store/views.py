@@ -5,41 +5,50 @@ from django.utils import timezone
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views.decorators.http import require_POST
-from django.db.models import Sum, F, ExpressionWrapper, DecimalField
-from django.http import HttpResponse, Http404
-from django.template.loader import render_to_string
-from .models import Product, Cart, Order, OrderItem, SalesReport, ShopCustomer, ProductReturn
+from django.db import transaction
+from django.db.models import Sum, ExpressionWrapper, DecimalField
+from django.http import HttpResponse, Http404, FileResponse, JsonResponse
+from django.conf import settings
+from django.urls import reverse
+from .models import (
+    Product, Cart, Order, SalesReport, ShopCustomer, ProductReturn, InvoicePdfJob,
+    StockMovement,
+)
 from .forms import AddProductForm, UpdateProductForm, CustomerLoginForm, CustomerRegisterForm
 from accounts.models import CustomUser
 from collections import defaultdict
 from decimal import Decimal
-import html as html_stdlib
-import re
-import csv
+from urllib.parse import urlencode
 
-from django.db.models import Q, Case, When, IntegerField, Sum, F, OuterRef, Subquery
-from django.db.models.functions import Coalesce
-from datetime import datetime, timedelta, time, date
+from django.db.models import Case, When, IntegerField, Sum
+from datetime import datetime, date
 import calendar
-
-from .excel_export import build_workbook_response
+import itertools
+
+from .excel_export import tax_table_workbook_response
+from .csv_export import stream_csv_response, order_by_tax_table, iter_tax_table_rows
+from .catalog import rendered_catalog_page, InvalidCursor
+from .checkout import place_order, price_cart_lines, move_order_stock, InsufficientStock
+from .tax import add_tax, extract_tax, in_batches
+from .money import Money
+from .storefront_cache import storefront_cache
+from .search import search_customers
+from .stock_ledger import record_order_stock, stock_on
+from .order_numbers import release_order_number, resequence_orders
+from .rollups import (
+    record_order_sales, monthly_report_products, yearly_report_products, financial_year_sales_groups,
+)
+from .invoice_pdf import invoice_content_hash, cached_invoice_pdf, store_invoice_pdf
+from .invoice_export import invoice_zip_response, parse_export_range
+from .invoice_jobs import enqueue_invoice_pdf, job_pdf_path
+from .invoices import (
+    build_invoice_context, render_invoice_html, invoice_pdf_filename, invoice_html_to_pdf, PdfUnavailable,
+    order_lines, invoice_line_amounts,
+)
 
 # -------------------- HELPER FUNCTIONS --------------------
 
 
-def _stock_export_product_leading_cells(product):
-    """Leading CSV/XLSX columns: identity."""
-    return [
-        product.name,
-        product.category or '',
-        str(product.gst),
-        product.hsn_code or '',
-        product.batch_number or '',
-        product.quantity,
-        product.get_measurement_type_display(),
-    ]
-
-
 def _redirect_after_cart_error(request, username):
     next_path = (request.POST.get('next') or '').strip()
     if next_path.startswith('/') and not next_path.startswith('//'):
@@ -47,99 +56,26 @@ def _redirect_after_cart_error(request, username):
     return redirect('store_products', username=username)
 
 
-def _stock_detail_for_product(user, product, year, month):
-    """
-    Aggregate sold qty, sales amount, and tax breakdown for one product.
-    month=None means entire year.
-    Uses actual sales data from SalesReport (completed orders).
-    """
-    sold_quantity = 0
-    total_amount_with_tax = Decimal('0.00')
-
-    sales_qs = SalesReport.objects.filter(
-        store_owner=user,
-        product=product,
-        order__is_deleted=False,
-        sale_date__year=year,
-    )
-    if month is not None:
-        sales_qs = sales_qs.filter(sale_date__month=month)
-
-    sold_quantity = sales_qs.aggregate(total=Sum('quantity'))['total'] or 0
-    total_amount_with_tax = sales_qs.aggregate(total=Sum('total_price'))['total'] or Decimal('0.00')
-
-    # Determine tax type: IGST takes priority
-    uses_igst = product.igst is not None and product.igst > 0
-
-    igst_amount = Decimal('0.00')
-    cgst_amount = Decimal('0.00')
-    sgst_amount = Decimal('0.00')
-    gst_amount = Decimal('0.00')
-    sales_amount_ex_tax = Decimal('0.00')
-
-    if uses_igst:
-        igst_rate = Decimal(str(product.igst)) / Decimal('100')
-        divisor = Decimal('1') + igst_rate
-        if divisor > 0:
-            sales_amount_ex_tax = total_amount_with_tax / divisor
-            igst_amount = total_amount_with_tax - sales_amount_ex_tax
-        # CGST/SGST/GST all zero for IGST products
-    else:
-        gst_rate_decimal = Decimal(str(product.gst)) / Decimal('100')
-        divisor = Decimal('1') + gst_rate_decimal
-        if divisor > 0:
-            sales_amount_ex_tax = total_amount_with_tax / divisor
-            gst_amount = total_amount_with_tax - sales_amount_ex_tax
-            cgst_amount = gst_amount / Decimal('2')
-            sgst_amount = gst_amount / Decimal('2')
-
-    current_stock = product.quantity
-    initial_stock_for_period = int(current_stock) + int(sold_quantity)
-    units_sold_period = int(initial_stock_for_period) - int(current_stock)
-
-    # Stock values from Add Product data
-    taxable_stock_value = product.taxable_unit_amount * current_stock
-    total_stock_value = product.total_unit_amount * current_stock
-
-    if current_stock == 0:
-        stock_status = 'Out of Stock'
-        status_class = 'danger'
-    else:
-        stock_status = 'In Stock'
-        status_class = 'success'
-
-    return {
-        'product': product,
-        'current_stock': current_stock,
-        'initial_stock': initial_stock_for_period,
-        'sold_quantity': units_sold_period,
-        'total_amount_with_gst': total_amount_with_tax,
-        'sales_amount': sales_amount_ex_tax,
-        'gst_amount': gst_amount,
-        'igst_amount': igst_amount,
-        'cgst_amount': cgst_amount,
-        'sgst_amount': sgst_amount,
-        'taxable_stock_value': taxable_stock_value,
-        'total_stock_value': total_stock_value,
-        'stock_status': stock_status,
-        'status_class': status_class,
-        'category': product.category or 'Uncategorized',
-        'batch_number': product.batch_number or '-',
-    }
-
 def get_store_owner(username):
-    """Get store owner by username"""
-    return get_object_or_404(CustomUser, username=username)
+    """Get store owner by username (served from the in-process storefront cache)"""
+    store_owner = storefront_cache.store_owner(username)
+    if store_owner is None:
+        raise Http404('No store with this username.')
+    return store_owner
 
 def get_logged_in_customer(request, store_owner):
     """Get logged in customer for a specific store"""
     customer_phone = request.session.get(f'customer_id_{store_owner.username}')
     if not customer_phone:
         return None
-    try:
-        return ShopCustomer.objects.get(phone=customer_phone, store_owner=store_owner)
-    except ShopCustomer.DoesNotExist:
-        return None
+    return storefront_cache.customer(store_owner, customer_phone)
+
+def get_storefront_product(store_owner, product_id):
+    """Active product of the store from the storefront cache, or 404."""
+    product = storefront_cache.product(store_owner, product_id)
+    if product is None or product.is_archived:
+        raise Http404('No such product in this store.')
+    return product
 
 # -------------------- CUSTOMER AUTH --------------------
 
@@ -201,21 +137,35 @@ def store_products_view(request, username):
     if not customer:
         return redirect('customer_login', username=username)
 
-    # Get active (non-archived) products only
-    all_products = Product.objects.filter(
-        store_owner=store_owner, 
-        is_archived=False
-    ).order_by('category', 'name')
-
-    # Search functionality
-    query = request.GET.get('q')
-    if query:
-        all_products = all_products.filter(
-            Q(name__icontains=query) | Q(category__icontains=query)
-        )
+    query = (request.GET.get('q') or '').strip()
+    after = request.GET.get('after') or None
+    try:
+        page = rendered_catalog_page(store_owner, after=after, query=query)
+    except InvalidCursor:
+        if request.GET.get('format') == 'json':
+            return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+        return redirect('store_products', username=username)
+
+    next_url = None
+    if page['next_cursor']:
+        params = {'after': page['next_cursor']}
+        if query:
+            params['q'] = query
+        next_url = f"{request.path}?{urlencode(params)}"
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'html': page['html'],
+            'products': page['products'],
+            'next_cursor': page['next_cursor'],
+            'next_url': next_url,
+        })
 
     context = {
-        'all_products': all_products,
+        'catalog_html': page['html'],
+        'has_products': bool(page['products']),
+        'is_first_page': after is None,
+        'next_url': next_url,
         'store_owner': store_owner,
         'customer': customer,
     }
@@ -229,9 +179,7 @@ def product_detail_view(request, username, product_id):
     if not customer:
         return redirect('customer_login', username=username)
 
-    product = get_object_or_404(
-        Product, id=product_id, store_owner=store_owner, is_archived=False,
-    )
+    product = get_storefront_product(store_owner, product_id)
     return render(request, 'product_detail.html', {
         'product': product,
         'store_owner': store_owner,
@@ -248,12 +196,7 @@ def add_to_cart_view(request, username, product_id):
         return redirect('customer_login', username=username)
 
     if request.method == 'POST':
-        product = get_object_or_404(
-            Product,
-            id=product_id,
-            store_owner=store_owner,
-            is_archived=False,
-        )
+        product = get_storefront_product(store_owner, product_id)
         quantity = int(request.POST.get('quantity', 1))
         custom_amount = request.POST.get('amount', '').strip()
         date_raw = (request.POST.get('transaction_date') or request.POST.get('date', '')).strip()
@@ -297,7 +240,7 @@ def add_to_cart_view(request, username, product_id):
         cart_item, created = Cart.objects.get_or_create(
             store_owner=store_owner,
             customer=customer,
-            product=product,
+            product_id=product.id,
             defaults={
                 'quantity': quantity,
                 'unit_price': unit_price,
@@ -331,66 +274,27 @@ def cart_view(request, username):
     if not customer:
         return redirect('customer_login', username=username)
 
-    Cart.objects.filter(
-        store_owner=store_owner,
-        customer=customer,
-        product__is_archived=True,
-    ).delete()
-
-    cart_items = Cart.objects.filter(store_owner=store_owner, customer=customer)
-    
-    # Calculate totals with GST/IGST - FIXED: Proper Decimal handling
-    subtotal = Decimal('0.00')
-    total_gst = Decimal('0.00')
-    total_igst = Decimal('0.00')
-    
-    cart_items_with_gst = []
-    
-    for item in cart_items:
-        effective_price = item.unit_price if item.unit_price > 0 else item.product.price
-        item_subtotal = effective_price * item.quantity
-        
-        # Determine tax type: IGST takes priority
-        product = item.product
-        uses_igst = product.igst is not None and product.igst > 0
-        
-        if uses_igst:
-            igst_rate = Decimal(str(product.igst)) / Decimal('100')
-            item_igst = item_subtotal * igst_rate
-            item_cgst = Decimal('0.00')
-            item_sgst = Decimal('0.00')
-            item_gst_amount = Decimal('0.00')
-            item_total_with_tax = item_subtotal + item_igst
-            total_igst += item_igst
+    products = storefront_cache.products(store_owner)
+    cart_items = []
+    archived_lines = []
+    for item in Cart.objects.filter(store_owner=store_owner, customer=customer):
+        product = products.get(item.product_id) or storefront_cache.product(store_owner, item.product_id)
+        if product is None or product.is_archived:
+            archived_lines.append(item.pk)
         else:
-            gst_rate_decimal = Decimal(str(product.gst)) / Decimal('100')
-            item_gst_amount = item_subtotal * gst_rate_decimal
-            item_cgst = item_gst_amount / Decimal('2')
-            item_sgst = item_gst_amount / Decimal('2')
-            item_igst = Decimal('0.00')
-            item_total_with_tax = item_subtotal + item_gst_amount
-            total_gst += item_gst_amount
-        
-        subtotal += item_subtotal
-        
-        item_data = {
-            'cart_item': item,
-            'product': product,
-            'quantity': item.quantity,
-            'unit_price': effective_price,
-            'subtotal': item_subtotal,
-            'gst_rate': product.gst,
-            'igst_rate': product.igst,
-            'uses_igst': uses_igst,
-            'cgst_amount': item_cgst,
-            'sgst_amount': item_sgst,
-            'gst_amount': item_gst_amount,
-            'igst_amount': item_igst,
-            'total_with_gst': item_total_with_tax,
-            'transaction_date': item.transaction_date,
-        }
-        cart_items_with_gst.append(item_data)
+            cart_items.append((item, product))
+    if archived_lines:
+        Cart.objects.filter(pk__in=archived_lines).delete()
     
+    # Priced exactly as checkout will save the order
+    cart_items_with_gst = price_cart_lines(cart_items)
+    for line in cart_items_with_gst:
+        line['total_with_gst'] = line['total']
+        line['transaction_date'] = line['cart_item'].transaction_date
+
+    subtotal = sum((line['subtotal'] for line in cart_items_with_gst), Decimal('0.00'))
+    total_gst = sum((line['gst_amount'] for line in cart_items_with_gst), Decimal('0.00'))
+    total_igst = sum((line['igst_amount'] for line in cart_items_with_gst), Decimal('0.00'))
     total_amount = subtotal + total_gst + total_igst
 
     return render(request, 'cart.html', {
@@ -438,109 +342,18 @@ def checkout_view(request, username):
         product__is_archived=True,
     ).delete()
 
-    cart_items = Cart.objects.filter(store_owner=store_owner, customer=customer)
-    if not cart_items.exists():
-        return redirect('cart_view', username=username)
-
-    # Calculate totals with GST/IGST breakdown
-    subtotal = Decimal('0.00')
-    total_cgst = Decimal('0.00')
-    total_sgst = Decimal('0.00')
-    total_igst = Decimal('0.00')
-    
-    for item in cart_items:
-        effective_price = item.unit_price if item.unit_price > 0 else item.product.price
-        item_subtotal = effective_price * item.quantity
-        product = item.product
-        uses_igst = product.igst is not None and product.igst > 0
-        
-        if uses_igst:
-            igst_rate = Decimal(str(product.igst)) / Decimal('100')
-            item_igst = item_subtotal * igst_rate
-            total_igst += item_igst
-        else:
-            gst_rate_decimal = Decimal(str(product.gst)) / Decimal('100')
-            item_total_gst = item_subtotal * gst_rate_decimal
-            total_cgst += item_total_gst / Decimal('2')
-            total_sgst += item_total_gst / Decimal('2')
-        
-        subtotal += item_subtotal
-
-    total_gst = total_cgst + total_sgst
-    grand_total = subtotal + total_gst + total_igst
-
-    line_dates = [c.transaction_date for c in cart_items if getattr(c, 'transaction_date', None)]
-    invoice_date = max(line_dates) if line_dates else timezone.now().date()
-
-    order = Order.objects.create(
-        store_owner=store_owner,
-        customer=customer,
-        total_price=grand_total,
-        subtotal=subtotal,
-        total_cgst=total_cgst,
-        total_sgst=total_sgst,
-        total_gst=total_gst,
-        total_igst=total_igst,
-        status='pending',
-        invoice_date=invoice_date,
-    )
-
-    order.invoice_number = f"INV-{order.order_number:02d}"
-    order.save()
-
-    # Create order items with GST/IGST breakdown
-    for item in cart_items:
-        effective_price = item.unit_price if item.unit_price > 0 else item.product.price
-        item_subtotal = effective_price * item.quantity
-        product = item.product
-        uses_igst = product.igst is not None and product.igst > 0
-        
-        if uses_igst:
-            igst_rate = Decimal(str(product.igst)) / Decimal('100')
-            item_igst = item_subtotal * igst_rate
-            item_cgst = Decimal('0.00')
-            item_sgst = Decimal('0.00')
-            item_gst = Decimal('0.00')
-            item_total = item_subtotal + item_igst
-        else:
-            gst_rate_decimal = Decimal(str(product.gst)) / Decimal('100')
-            item_gst = item_subtotal * gst_rate_decimal
-            item_cgst = item_gst / Decimal('2')
-            item_sgst = item_gst / Decimal('2')
-            item_igst = Decimal('0.00')
-            item_total = item_subtotal + item_gst
-        
-        OrderItem.objects.create(
-            order=order,
-            product=product,
-            quantity=item.quantity,
-            item_price=effective_price,
-            total_price=item_total,
-            subtotal=item_subtotal,
-            cgst_amount=item_cgst,
-            sgst_amount=item_sgst,
-            gst_amount=item_gst,
-            igst_amount=item_igst,
+    try:
+        order = place_order(store_owner, customer)
+    except InsufficientStock as exc:
+        messages.error(
+            request,
+            f'Cannot checkout: only {exc.product.quantity} of "{exc.product.name}" left in stock.',
         )
+        return redirect('cart_view', username=username)
 
-        product.quantity -= item.quantity
-        product.save()
-
-        sale_day = item.transaction_date or invoice_date
-        sale_dt = timezone.make_aware(datetime.combine(sale_day, time(12, 0, 0)))
-        SalesReport.objects.create(
-            store_owner=store_owner,
-            customer=customer,
-            product=product,
-            order=order,
-            quantity=item.quantity,
-            total_price=item_total,
-            profit=Decimal('0.00'),
-            category=product.category or 'Uncategorized',
-            sale_date=sale_dt,
-        )
+    if order is None:
+        return redirect('cart_view', username=username)
 
-    cart_items.delete()
     return redirect('my_orders', username=username)
 
 
@@ -575,46 +388,25 @@ def order_detail_view(request, username, order_id):
     # Get the order - ensure it belongs to the customer and store owner
     order = get_object_or_404(Order, id=order_id, store_owner=store_owner, customer=customer)
     
-    # Get all order items
-    order_items = order.items.all()
-    
-    # Calculate GST/IGST breakdown for display
+    # Lines with products in one query; tax amounts as stored at checkout
     updated_items = []
-    for item in order_items:
-        item_subtotal = item.item_price * item.quantity
+    items = order_lines(order)
+    for item, amounts in zip(items, invoice_line_amounts(items)):
         product = item.product
-        uses_igst = product.igst is not None and product.igst > 0
-        
-        if uses_igst:
-            igst_rate = Decimal(str(product.igst)) / Decimal('100')
-            item_igst = item_subtotal * igst_rate
-            item_cgst = Decimal('0.00')
-            item_sgst = Decimal('0.00')
-            item_gst = Decimal('0.00')
-            item_total_with_tax = item_subtotal + item_igst
-        else:
-            gst_rate = Decimal(str(product.gst))
-            gst_decimal = gst_rate / Decimal('100')
-            item_gst = item_subtotal * gst_decimal
-            item_cgst = item_gst / Decimal('2')
-            item_sgst = item_gst / Decimal('2')
-            item_igst = Decimal('0.00')
-            item_total_with_tax = item_subtotal + item_gst
-        
         item_data = {
             'item': item,
             'product': product,
             'quantity': item.quantity,
             'unit_price': item.item_price,
-            'subtotal': item_subtotal,
+            'subtotal': amounts['subtotal'],
             'gst_rate': product.gst,
             'igst_rate': product.igst,
-            'uses_igst': uses_igst,
-            'cgst_amount': item_cgst,
-            'sgst_amount': item_sgst,
-            'gst_amount': item_gst,
-            'igst_amount': item_igst,
-            'total_with_gst': item_total_with_tax,
+            'uses_igst': amounts['uses_igst'],
+            'cgst_amount': amounts['cgst_amount'],
+            'sgst_amount': amounts['sgst_amount'],
+            'gst_amount': amounts['gst_amount'],
+            'igst_amount': amounts['igst_amount'],
+            'total_with_gst': amounts['subtotal'] + amounts['gst_amount'] + amounts['igst_amount'],
         }
         updated_items.append(item_data)
 
@@ -633,7 +425,7 @@ def order_detail_view(request, username, order_id):
 def sales_report_view(request):
     """Sales report for the logged-in store owner"""
     user = request.user
-    sales = SalesReport.objects.filter(store_owner=user, order__is_deleted=False).order_by('-sale_date')
+    sales = SalesReport.objects.filter(store_owner=user, is_deleted=False).order_by('-sale_date', 'pk')
     total_sales = sales.aggregate(total=Sum('total_price'))['total'] or Decimal('0.00')
     total_revenue = total_sales
 
@@ -651,14 +443,10 @@ def customer_details_list_view(request):
     customers = ShopCustomer.objects.filter(store_owner=request.user)
     
     if query:
-        customers = customers.filter(
-            Q(name__icontains=query) |
-            Q(phone__icontains=query) |
-            Q(email__icontains=query) |
-            Q(place__icontains=query)
-        )
-        
-    customers = customers.order_by('name', 'phone')
+        # Ranked: best match first
+        customers = search_customers(customers, query)
+    else:
+        customers = customers.order_by('name', 'phone')
     return render(request, 'customer_details.html', {
         'customers': customers,
         'search_query': query
@@ -669,7 +457,7 @@ def customer_details_list_view(request):
 def sales_dashboard_view(request):
     """Sales dashboard for the logged-in store owner"""
     user = request.user
-    sales = SalesReport.objects.filter(store_owner=user, order__is_deleted=False)
+    sales = SalesReport.objects.filter(store_owner=user, is_deleted=False)
     
     total_sales = sales.aggregate(total=Sum('total_price'))['total'] or Decimal('0.00')
     total_revenue = total_sales
@@ -690,107 +478,6 @@ def sales_dashboard_view(request):
 
 # -------------------- INVOICE GENERATION WITH GST --------------------
 
-def _compute_invoice_line_items(order):
-    """Attach per-line subtotals/GST/IGST to items; set order subtotal/total_* fields."""
-    invoice_items = order.items.all()
-    updated_items = []
-    gst_summary = {}
-    order_subtotal = Decimal('0.00')
-    order_total_cgst = Decimal('0.00')
-    order_total_sgst = Decimal('0.00')
-    order_total_igst = Decimal('0.00')
-    for item in invoice_items:
-        item_subtotal = item.item_price * item.quantity
-        product = item.product
-        uses_igst = product.igst is not None and product.igst > 0
-        
-        if uses_igst:
-            igst_rate = Decimal(str(product.igst))
-            igst_decimal = igst_rate / Decimal('100')
-            item_igst = item_subtotal * igst_decimal
-            item.subtotal = item_subtotal
-            item.cgst_amount = Decimal('0.00')
-            item.sgst_amount = Decimal('0.00')
-            item.gst_amount = Decimal('0.00')
-            item.igst_amount = item_igst
-            order_total_igst += item_igst
-            # Add to summary under IGST key
-            key = f'IGST_{float(igst_rate)}'
-            if key not in gst_summary:
-                gst_summary[key] = {
-                    'rate': float(igst_rate),
-                    'tax_type': 'IGST',
-                    'taxable_amount': Decimal('0.00'),
-                    'cgst': Decimal('0.00'),
-                    'sgst': Decimal('0.00'),
-                    'igst': Decimal('0.00'),
-                    'total_gst': Decimal('0.00'),
-                }
-            gst_summary[key]['taxable_amount'] += item_subtotal
-            gst_summary[key]['igst'] += item_igst
-            gst_summary[key]['total_gst'] += item_igst
-        else:
-            gst_rate = Decimal(str(product.gst))
-            gst_decimal = gst_rate / Decimal('100')
-            item_total_gst = item_subtotal * gst_decimal
-            item_cgst = item_total_gst / Decimal('2')
-            item_sgst = item_total_gst / Decimal('2')
-            item.subtotal = item_subtotal
-            item.cgst_amount = item_cgst
-            item.sgst_amount = item_sgst
-            item.gst_amount = item_total_gst
-            item.igst_amount = Decimal('0.00')
-            order_total_cgst += item_cgst
-            order_total_sgst += item_sgst
-            gst_rate_float = float(gst_rate)
-            key = f'GST_{gst_rate_float}'
-            if key not in gst_summary:
-                gst_summary[key] = {
-                    'rate': gst_rate_float,
-                    'tax_type': 'GST',
-                    'taxable_amount': Decimal('0.00'),
-                    'cgst': Decimal('0.00'),
-                    'sgst': Decimal('0.00'),
-                    'igst': Decimal('0.00'),
-                    'total_gst': Decimal('0.00'),
-                }
-            gst_summary[key]['taxable_amount'] += item_subtotal
-            gst_summary[key]['cgst'] += item_cgst
-            gst_summary[key]['sgst'] += item_sgst
-            gst_summary[key]['total_gst'] += item_total_gst
-        
-        updated_items.append(item)
-        order_subtotal += item_subtotal
-    order.subtotal = order_subtotal
-    order.total_cgst = order_total_cgst
-    order.total_sgst = order_total_sgst
-    order.total_gst = order_total_cgst + order_total_sgst
-    order.total_igst = order_total_igst
-    return updated_items, gst_summary
-
-
-def build_invoice_context(store_owner, order, *, as_pdf=False):
-    company_details = store_owner.get_company_details()
-    company = type('Company', (), company_details)()
-    updated_items, gst_summary = _compute_invoice_line_items(order)
-    order.get_amount_in_words = lambda: f"Rupees {int(order.total_price)} Only"
-    if not getattr(order, 'invoice_number', None):
-        order.invoice_number = f"INV-{order.id}-{order.order_date.strftime('%Y%m')}"
-    total_gst = order.total_gst if order.total_gst is not None else Decimal('0')
-    return {
-        'order': order,
-        'invoice': order,
-        'company': company,
-        'customer': order.customer,
-        'store_owner': store_owner,
-        'invoice_items': updated_items,
-        'gst_summary': list(gst_summary.values()),
-        'gst_total': total_gst,
-        'show_gst_summary': total_gst > 0,
-        'as_pdf': as_pdf,
-    }
-
-
 def _resolve_invoice_order(request, username, order_id):
     store_owner = get_store_owner(username)
     if hasattr(request.user, 'username') and request.user.username == username:
@@ -803,45 +490,6 @@ def _resolve_invoice_order(request, username, order_id):
     return order, store_owner, None
 
 
-def _invoice_html_to_pdf_xhtml2pdf(html_string: str) -> bytes:
-    """Render invoice HTML to PDF using xhtml2pdf (pure Python, no browser needed)."""
-    from io import BytesIO
-    from xhtml2pdf import pisa
-
-    result_buffer = BytesIO()
-    pisa_status = pisa.CreatePDF(html_string, dest=result_buffer)
-    if pisa_status.err:
-        raise RuntimeError(f'xhtml2pdf conversion error (code {pisa_status.err})')
-    return result_buffer.getvalue()
-
-
-def _invoice_html_to_pdf_playwright(html_string: str, base_url: str) -> bytes:
-    """Render invoice HTML to PDF with headless Chromium (Playwright). Fallback option."""
-    if re.search(r'<base\s', html_string, re.IGNORECASE) is None:
-        safe_href = html_stdlib.escape(base_url, quote=True)
-        html_string = re.sub(
-            r'(<head[^>]*>)',
-            rf'\1<base href="{safe_href}">',
-            html_string,
-            count=1,
-            flags=re.IGNORECASE,
-        )
-    from playwright.sync_api import sync_playwright
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        try:
-            page = browser.new_page()
-            page.set_content(html_string, wait_until='load', timeout=60_000)
-            return page.pdf(
-                format='A4',
-                print_background=True,
-                margin={'top': '7mm', 'right': '9mm', 'bottom': '7mm', 'left': '9mm'},
-            )
-        finally:
-            browser.close()
-
-
 def generate_invoice_view(request, username, order_id):
     """Generate HTML invoice for an order with CGST/SGST breakdown."""
     order, store_owner, err = _resolve_invoice_order(request, username, order_id)
@@ -852,36 +500,109 @@ def generate_invoice_view(request, username, order_id):
 
 
 def generate_invoice_pdf(request, username, order_id):
-    """Generate PDF invoice. Uses xhtml2pdf (primary) with Playwright as fallback."""
+    """
+    Generate PDF invoice. Uses Playwright (primary) with xhtml2pdf as fallback.
+    Rendered PDFs are cached under MEDIA_ROOT by a hash of the invoice inputs, so
+    repeat downloads skip rendering and any edit to the order, customer or company
+    produces a fresh file. With INVOICE_PDF_ASYNC a cache miss is queued for the
+    run_invoice_jobs worker and a page that polls the job is returned instead.
+    """
     order, store_owner, err = _resolve_invoice_order(request, username, order_id)
     if err:
         return err
-    context = build_invoice_context(store_owner, order, as_pdf=True)
-    html_string = render_to_string('invoice_template.html', context, request=request)
 
-    # Try Playwright first for pixel-perfect rendering
     base = request.build_absolute_uri('/')
-    try:
-        pdf_bytes = _invoice_html_to_pdf_playwright(html_string, base)
-    except Exception as playwright_err:
-        # Fallback to xhtml2pdf if Playwright fails
+    filename = invoice_pdf_filename(order)
+    items = order_lines(order)
+    digest = invoice_content_hash(store_owner, order, items, base)
+    pdf_path = cached_invoice_pdf(store_owner, order, digest)
+
+    if pdf_path is None and settings.INVOICE_PDF_ASYNC:
+        # Do not hold this worker for the render: queue it and let the page poll for the file
+        job = enqueue_invoice_pdf(store_owner, order, base)
+        return render(request, 'invoice_pdf_pending.html', {
+            'order': order,
+            'store_owner': store_owner,
+            'status_url': reverse('invoice_pdf_job_status', kwargs={'username': username, 'job_id': job.pk}),
+        }, status=202)
+
+    if pdf_path is None:
+        html_string = render_invoice_html(store_owner, order, as_pdf=True, request=request, items=items)
+        # Playwright first for pixel-perfect rendering, xhtml2pdf if that fails
         try:
-            pdf_bytes = _invoice_html_to_pdf_xhtml2pdf(html_string)
-        except Exception as xhtml_err:
+            pdf_bytes = invoice_html_to_pdf(html_string, base)
+        except PdfUnavailable as err:
             return HttpResponse(
                 f'Could not generate PDF.<br>'
-                f'Playwright error: {str(playwright_err)}<br>'
-                f'xhtml2pdf error: {str(xhtml_err)}<br><br>'
+                f'Playwright error: {str(err.playwright_error)}<br>'
+                f'xhtml2pdf error: {str(err.xhtml2pdf_error)}<br><br>'
                 f'<strong>Tip:</strong> Open the invoice in your browser, '
                 f'click Print, and select "Save as PDF".',
                 status=503,
             )
+        pdf_path = store_invoice_pdf(store_owner, order, digest, pdf_bytes)
+
+    return FileResponse(
+        open(pdf_path, 'rb'),
+        as_attachment=True,
+        filename=filename,
+        content_type='application/pdf',
+    )
 
-    inv = getattr(order, 'invoice_number', None) or f'INV-{order.id}'
-    safe_inv = ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(inv))
-    response = HttpResponse(pdf_bytes, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="invoice_{safe_inv}.pdf"'
-    return response
+
+def _invoice_pdf_job_payload(username, job):
+    payload = {
+        'job_id': job.pk,
+        'order_id': job.order_id,
+        'status': job.status,
+        'status_url': reverse('invoice_pdf_job_status', kwargs={'username': username, 'job_id': job.pk}),
+    }
+    if job.status == InvoicePdfJob.STATUS_DONE:
+        payload['download_url'] = reverse('invoice_pdf_job_download', kwargs={'username': username, 'job_id': job.pk})
+    if job.status == InvoicePdfJob.STATUS_FAILED:
+        payload['error'] = job.error
+    return payload
+
+
+def _resolve_invoice_pdf_job(request, username, job_id):
+    store_owner = get_store_owner(username)
+    job = get_object_or_404(InvoicePdfJob.objects.select_related('store_owner', 'order'), pk=job_id, store_owner=store_owner)
+    # Same access rule as the invoice itself: the owner, or the customer the order belongs to
+    _, _, err = _resolve_invoice_order(request, username, job.order_id)
+    return job, err
+
+
+@require_POST
+def enqueue_invoice_pdf_view(request, username, order_id):
+    """Queue a PDF render for the run_invoice_jobs worker; returns the job as JSON."""
+    order, store_owner, err = _resolve_invoice_order(request, username, order_id)
+    if err:
+        return err
+    job = enqueue_invoice_pdf(store_owner, order, request.build_absolute_uri('/'))
+    status = 200 if job.status == InvoicePdfJob.STATUS_DONE else 202
+    return JsonResponse(_invoice_pdf_job_payload(username, job), status=status)
+
+
+def invoice_pdf_job_status(request, username, job_id):
+    job, err = _resolve_invoice_pdf_job(request, username, job_id)
+    if err:
+        return err
+    return JsonResponse(_invoice_pdf_job_payload(username, job))
+
+
+def invoice_pdf_job_download(request, username, job_id):
+    job, err = _resolve_invoice_pdf_job(request, username, job_id)
+    if err:
+        return err
+    pdf_path = job_pdf_path(job)
+    if pdf_path is None:
+        return JsonResponse(_invoice_pdf_job_payload(username, job), status=409)
+    return FileResponse(
+        open(pdf_path, 'rb'),
+        as_attachment=True,
+        filename=invoice_pdf_filename(job.order),
+        content_type='application/pdf',
+    )
 
 
 # This is the existing generate_invoice function as well used for backward compatibility
@@ -890,6 +611,25 @@ def generate_invoice(request, username, order_id):
     return generate_invoice_pdf(request, username, order_id)
 
 
+@login_required
+def export_invoices_zip(request):
+    """All live invoices with an invoice date in ?start=..&end=.. (default: this month) as a ZIP of PDFs."""
+    today = timezone.now().date()
+    try:
+        start, end = parse_export_range(
+            request.GET.get('start') or today.replace(day=1).isoformat(),
+            request.GET.get('end') or today.isoformat(),
+        )
+    except ValueError:
+        messages.error(request, 'Invalid date range. Use YYYY-MM-DD for start and end.')
+        return redirect('sales_report')
+    return invoice_zip_response(
+        request.user, start, end,
+        base_url=request.build_absolute_uri('/'),
+        request=request,
+    )
+
+
 @require_POST
 def delete_invoice(request, username, order_id):
     """Delete an invoice (soft delete) and restore stock"""
@@ -903,42 +643,18 @@ def delete_invoice(request, username, order_id):
     
     # Prevent double deletion
     if not order.is_deleted:
-        # Restore stock for each order item
-        for item in order.items.all():
-            product = item.product
-            product.quantity += item.quantity
-            product.save()
-        
-        # Get the current number before we mark it as deleted
-        deleted_number = order.order_number
-        
-        # 1. Move ALL currently deleted orders of this user out of the way to avoid collisions
-        # This cleans up any legacy deleted orders that might be blocking the sequence
-        all_deleted_orders = Order.objects.filter(store_owner=store_owner, is_deleted=True)
-        for d_order in all_deleted_orders:
-            # We skip the current one if we want to handle it specifically, but it's easier to just do all
-            d_order.order_number = 1000000 + d_order.id
-            d_order.save()
-            
-        # 2. Mark the current order as deleted and move it out of the sequential range
-        order.is_deleted = True
-        order.order_number = 1000000 + order.id 
-        order.save()
-        
-        # 3. Re-normalize the sequence for all ACTIVE orders of this store owner
-        # We fetch all active orders and re-assign them numbers 1, 2, 3...
-        # This is more robust than just shifting subsequent ones
-        active_orders = Order.objects.filter(
-            store_owner=store_owner,
-            is_deleted=False
-        ).order_by('order_date', 'id') # Use a stable ordering
-        
-        for index, active_order in enumerate(active_orders, start=1):
-            if active_order.order_number != index:
-                active_order.order_number = index
-                active_order.invoice_number = f"INV-{active_order.order_number:02d}"
-                active_order.save()
-        
+        with transaction.atomic():
+            # Restore stock for each order item
+            move_order_stock(order, 1)
+
+            # Park the order outside the live range and move later invoices down by one
+            order.is_deleted = True
+            release_order_number(order)
+            SalesReport.objects.filter(order=order).update(is_deleted=True)
+
+            record_order_sales(order, sign=-1)
+            record_order_stock(order, StockMovement.INVOICE_DELETE)
+
         messages.success(request, f'Invoice {order.invoice_number or order.order_number} has been deleted and stock has been restored.')
     else:
         messages.warning(request, 'This invoice has already been deleted.')
@@ -959,26 +675,29 @@ def restore_invoice(request, username, order_id):
     
     # Only restore if it's deleted
     if order.is_deleted:
-        # Deduct stock for each order item
-        for item in order.items.all():
-            product = item.product
-            if product.quantity >= item.quantity:
-                product.quantity -= item.quantity
-                product.save()
-            else:
-                messages.error(request, f'Cannot restore: Insufficient stock for {product.name}.')
+        with transaction.atomic():
+            # Deduct stock for each order item, checked against the locked products
+            try:
+                move_order_stock(order, -1)
+            except InsufficientStock as exc:
+                transaction.set_rollback(True)
+                messages.error(request, f'Cannot restore: Insufficient stock for {exc.product.name}.')
                 return redirect('deleted_invoices', username=username)
+
+            # Unmark order as deleted
+            order.is_deleted = False
+            # Clear order_number so the model's save() method re-assigns a proper sequential one
+            order.order_number = None
+            order.save()
+            SalesReport.objects.filter(order=order).update(is_deleted=False)
         
-        # Unmark order as deleted
-        order.is_deleted = False
-        # Clear order_number so the model's save() method re-assigns a proper sequential one
-        order.order_number = None
-        order.save()
-        
-        # After saving, order_number is re-assigned. Update the invoice_number to match.
-        order.invoice_number = f"INV-{order.order_number:02d}"
-        order.save()
-        
+            # After saving, order_number is re-assigned. Update the invoice_number to match.
+            order.invoice_number = f"INV-{order.order_number:02d}"
+            order.save()
+
+            record_order_sales(order)
+            record_order_stock(order, StockMovement.INVOICE_RESTORE)
+
         messages.success(request, f'Invoice {order.invoice_number or order.order_number} has been restored.')
     else:
         messages.warning(request, 'This invoice is not deleted.')
@@ -1040,39 +759,10 @@ def repair_order_sequence_view(request):
     Removes gaps and ensures consistency.
     """
     store_owner = request.user
-    
-    # 1. Move ALL currently deleted orders of this user out of the way
-    all_deleted_orders = Order.objects.filter(store_owner=store_owner, is_deleted=True)
-    for d_order in all_deleted_orders:
-        d_order.order_number = 1000000 + d_order.id
-        d_order.save()
-        
-    # 2. Re-index ACTIVE orders starting from 1
-    active_orders = Order.objects.filter(
-        store_owner=store_owner,
-        is_deleted=False
-    ).order_by('order_date', 'id')
-    
-    count = 0
-    for index, active_order in enumerate(active_orders, start=1):
-        # Update if different
-        changed = False
-        if active_order.order_number != index:
-            active_order.order_number = index
-            changed = True
-        
-        # Always update invoice number format as per new requirement: INV-01, INV-02...
-        # Using :02d as requested in example, but :04d is typically safer. 
-        # I'll use :02d to match "INV-01" exactly.
-        expected_invoice = f"INV-{active_order.order_number:02d}"
-        if active_order.invoice_number != expected_invoice:
-            active_order.invoice_number = expected_invoice
-            changed = True
-            
-        if changed:
-            active_order.save()
-            count += 1
-            
+
+    # Active orders become 1..N by order date, deleted ones are parked out of range
+    count = len(resequence_orders(store_owner))
+
     messages.success(request, f'Sequence repaired! {count} orders were updated.')
     return redirect('sales_dashboard')
 
@@ -1124,267 +814,185 @@ def user_analytics_dashboard_view(request, username):
 
 # ------- Monthly Report Code ------
 
-import csv
+# STRICT COLUMN ORDER (shared by the monthly and yearly stock exports)
+STOCK_REPORT_EXPORT_HEADERS = [
+    'Product Name', 'Category', 'GST%', 'IGST%', 'HSN', 'Batch No', 
+    'Initial Stock', 'Current Stock', 'Units Sold', 'Taxable Sales Amt', 
+    'IGST', 'CGST', 'SGST', 'Total Sales Amt', 'Taxable Stock Val', 
+    'Stock Val GST amount', 'Total Stock Val', 'Status'
+]
 
-@login_required
-def monthly_stock_report(request):
-    """Monthly stock report (includes archived products for analytics integrity)."""
-    user = request.user
-    current_date = timezone.now()
+STOCK_REPORT_TOTAL_FIELDS = (
+    'taxable_sales_amount', 'igst_amount', 'cgst_amount', 'sgst_amount',
+    'total_sales_amount', 'taxable_stock_value', 'stock_val_gst_amt', 'total_stock_value',
+)
 
-    year = int(request.GET.get('year', current_date.year))
-    month = int(request.GET.get('month', current_date.month))
 
-    # Calculate month range using standard date objects
-    month_start = date(year, month, 1)
-    if month == 12:
-        month_end = date(year, 12, 31)
-    else:
-        month_end = date(year, month + 1, 1) - timedelta(days=1)
-
-    # Use Subqueries for optimized calculation of sales totals
-    sold_before = SalesReport.objects.filter(
-        product=OuterRef('pk'),
-        order__is_deleted=False,
-        sale_date__date__lt=month_start
-    ).values('product').annotate(total=Sum('quantity')).values('total')
-
-    sold_in = SalesReport.objects.filter(
-        product=OuterRef('pk'),
-        order__is_deleted=False,
-        sale_date__date__gte=month_start,
-        sale_date__date__lte=month_end
-    ).values('product').annotate(total=Sum('quantity')).values('total')
-
-    sales_total_in = SalesReport.objects.filter(
-        product=OuterRef('pk'),
-        order__is_deleted=False,
-        sale_date__date__gte=month_start,
-        sale_date__date__lte=month_end
-    ).values('product').annotate(total=Sum('total_price')).values('total')
-
-    # New subquery for user-entered taxable sales amount
-    taxable_sales_total_in = OrderItem.objects.filter(
-        product=OuterRef('pk'),
-        order__is_deleted=False,
-        order__order_date__date__gte=month_start,
-        order__order_date__date__lte=month_end
-    ).values('product').annotate(total=Sum('subtotal')).values('total')
-
-    # Get all products purchased on or before the end of the report month
-    products_annotated = Product.objects.filter(
-        store_owner=user,
-        purchase_date__lte=month_end
-    ).annotate(
-        qty_sold_before=Coalesce(Subquery(sold_before), 0),
-        qty_sold_in=Coalesce(Subquery(sold_in), 0),
-        amnt_sold_in=Coalesce(Subquery(sales_total_in), Decimal('0.00')),
-        taxable_amnt_sold_in=Coalesce(Subquery(taxable_sales_total_in), Decimal('0.00'))
-    ).order_by('category', 'name')
+def _stock_report_details(products):
+    """
+    Product rows of the monthly/yearly stock report. Each product carries the
+    qty_sold_in / taxable_amnt_sold_in (sales rollup) and opening_stock /
+    closing_stock (stock ledger) annotations for the period. Products with no
+    opening stock and no sales are skipped for clutter.
+    """
+    rows = []
+    for p in products:
+        if p.opening_stock > 0 or p.qty_sold_in != 0:
+            rows.append((p, p.opening_stock, p.closing_stock))
+    gst_rates = [p.gst for p, _, _ in rows]
+    igst_rates = [p.igst for p, _, _ in rows]
+    sales_tax = add_tax([p.taxable_amnt_sold_in for p, _, _ in rows], gst_rates, igst_rates)
+    # Stock Value Calculation as strictly defined
+    stock_tax = add_tax([current_stock * p.taxable_unit_amount for p, _, current_stock in rows], gst_rates, igst_rates)
+    # Money (int paise) so the totals, category summary and rate tables add ints
+    sales_money = {name: sales_tax.money(name) for name in ('taxable', 'igst', 'cgst', 'sgst', 'total')}
+    stock_money = {name: stock_tax.money(name) for name in ('taxable', 'tax', 'total')}
 
-    stock_details = []
-    total_taxable_stock_value = Decimal('0.00')
-    total_stock_value = Decimal('0.00')
-    total_taxable_sales_value = Decimal('0.00')
-    total_sales_value = Decimal('0.00')
-    total_gst_collected = Decimal('0.00')
-    total_igst_collected = Decimal('0.00')
-
-    for p in products_annotated:
-        # 'Initial Stock' for the month is the stock at the start of the month
-        # which is: (Initial batch size) - (Sold before this month)
-        initial_for_month = p.initial_stock - p.qty_sold_before
-        
-        # If product had no stock at start and no sales during month, skip it for clutter
-        if initial_for_month <= 0 and p.qty_sold_in == 0:
-            continue
-            
-        units_sold = p.qty_sold_in
-        total_sales_value_inclusive = p.amnt_sold_in
-        
-        # Tax/Amt extraction
-        taxable_sales_amt = p.taxable_amnt_sold_in
-        
-        if p.igst > 0:
-            rate = Decimal(str(p.igst))
-            # Keep existing tax derivation (or we could calculate from taxable_sales_amt)
-            igst_val = taxable_sales_amt * (rate / Decimal('100'))
-            cgst_val = Decimal('0.00')
-            sgst_val = Decimal('0.00')
-            total_sales_amt = taxable_sales_amt + igst_val
-        else:
-            rate = Decimal(str(p.gst))
-            item_total_gst = taxable_sales_amt * (rate / Decimal('100'))
-            igst_val = Decimal('0.00')
-            cgst_val = item_total_gst / Decimal('2')
-            sgst_val = item_total_gst / Decimal('2')
-            total_sales_amt = taxable_sales_amt + cgst_val + sgst_val
-            
-        current_stock = initial_for_month - units_sold
-        
-        # Stock Value Calculation as strictly defined
-        taxable_stock_val = current_stock * p.taxable_unit_amount
-        if p.igst > 0:
-            stock_val_gst_amt = taxable_stock_val * (p.igst / Decimal('100'))
-        else:
-            stock_val_gst_amt = taxable_stock_val * (p.gst / Decimal('100'))
-            
-        total_stock_val = taxable_stock_val + stock_val_gst_amt
-        status = "Available" if current_stock > 0 else "Out of Stock"
-        
-        detail = {
+    return [
+        {
             'product': p,
             'category': p.category or 'Uncategorized',
-            'initial_stock': initial_for_month,
+            'initial_stock': initial_stock,
             'current_stock': current_stock,
-            'sold_quantity': units_sold,
-            'taxable_sales_amount': taxable_sales_amt,
-            'igst_amount': igst_val,
-            'cgst_amount': cgst_val,
-            'sgst_amount': sgst_val,
-            'total_sales_amount': total_sales_amt,
-            'taxable_stock_value': taxable_stock_val,
-            'stock_val_gst_amt': stock_val_gst_amt,
-            'total_stock_value': total_stock_val,
-            'stock_status': status,
+            'sold_quantity': p.qty_sold_in,
+            'taxable_sales_amount': sales_money['taxable'][index],
+            'igst_amount': sales_money['igst'][index],
+            'cgst_amount': sales_money['cgst'][index],
+            'sgst_amount': sales_money['sgst'][index],
+            'total_sales_amount': sales_money['total'][index],
+            'taxable_stock_value': stock_money['taxable'][index],
+            'stock_val_gst_amt': stock_money['tax'][index],
+            'total_stock_value': stock_money['total'][index],
+            'stock_status': "Available" if current_stock > 0 else "Out of Stock",
             'batch_number': p.batch_number or '-',
         }
-        stock_details.append(detail)
-        
-        total_taxable_stock_value += taxable_stock_val
-        total_stock_value += total_stock_value
-        total_taxable_sales_value += taxable_sales_amt
-        total_sales_value += total_sales_amt
-        total_gst_collected += (cgst_val + sgst_val)
-        total_igst_collected += igst_val
+        for index, (p, initial_stock, current_stock) in enumerate(rows)
+    ]
+
+
+def _iter_stock_report_details(products):
+    return in_batches(_stock_report_details, products)
+
+
+def _stock_report_export_row(d):
+    p = d['product']
+    return [
+        p.name, p.category or '', str(p.gst), str(p.igst), p.hsn_code or '', p.batch_number or '',
+        d['initial_stock'], d['current_stock'], d['sold_quantity'],
+        f"{d['taxable_sales_amount']:.2f}", f"{d['igst_amount']:.2f}", f"{d['cgst_amount']:.2f}", f"{d['sgst_amount']:.2f}",
+        f"{d['total_sales_amount']:.2f}", f"{d['taxable_stock_value']:.2f}", f"{d['stock_val_gst_amt']:.2f}", f"{d['total_stock_value']:.2f}",
+        d['stock_status']
+    ]
+
 
+def _stock_report_total_row(kind, s):
+    return [
+        'TOTAL', '', '', '', '', '', '', '', '',
+        f"{s['taxable_sales_amount']:.2f}", f"{s['igst_amount']:.2f}", f"{s['cgst_amount']:.2f}", f"{s['sgst_amount']:.2f}",
+        f"{s['total_sales_amount']:.2f}", f"{s['taxable_stock_value']:.2f}", f"{s['stock_val_gst_amt']:.2f}", f"{s['total_stock_value']:.2f}", ''
+    ]
+
+
+# Rate-table layout shared by the CSV sections and the XLSX per-rate sheets
+STOCK_REPORT_TABLE_OPTIONS = {
+    'headers': STOCK_REPORT_EXPORT_HEADERS,
+    'rates_of': lambda d: (d['product'].gst, d['product'].igst),
+    'row_cells': _stock_report_export_row,
+    'total_fields': STOCK_REPORT_TOTAL_FIELDS,
+    'total_row': _stock_report_total_row,
+}
+
+
+def _stock_report_csv_rows(details):
+    """GST / IGST rate tables for details already ordered with order_by_tax_table()."""
+    return iter_tax_table_rows(details, **STOCK_REPORT_TABLE_OPTIONS)
+
+
+# Amount totals of the stock report page and its category summary
+STOCK_REPORT_SUMMARY_FIELDS = (
+    'total_taxable_stock_value', 'total_stock_value', 'total_taxable_sales_value',
+    'total_sales_value', 'total_gst_collected', 'total_igst_collected',
+)
+
+
+def _add_stock_report_paise(totals, d):
+    totals['total_taxable_stock_value'] += d['taxable_stock_value'].paise
+    totals['total_stock_value'] += d['total_stock_value'].paise
+    totals['total_taxable_sales_value'] += d['taxable_sales_amount'].paise
+    totals['total_sales_value'] += d['total_sales_amount'].paise
+    totals['total_gst_collected'] += d['cgst_amount'].paise + d['sgst_amount'].paise
+    totals['total_igst_collected'] += d['igst_amount'].paise
+
+
+def _paise_to_money(totals):
+    return {field: Money(paise) for field, paise in totals.items()}
+
+
+def _stock_report_category_summary(stock_details):
     category_summary = {}
+    paise = {}
     for detail in stock_details:
         category = detail['category']
         if category not in category_summary:
             category_summary[category] = {
                 'total_products': 0, 'total_stock': 0, 'total_sold': 0,
-                'total_taxable_sales_value': Decimal('0.00'),
-                'total_sales_value': Decimal('0.00'), 'total_stock_value': Decimal('0.00'),
-                'total_gst_collected': Decimal('0.00'), 'total_igst_collected': Decimal('0.00'),
                 'out_of_stock_count': 0, 'low_stock_count': 0,
             }
-        category_summary[category]['total_products'] += 1
-        category_summary[category]['total_stock'] += detail['current_stock']
-        category_summary[category]['total_sold'] += detail['sold_quantity']
-        category_summary[category]['total_taxable_sales_value'] += detail['taxable_sales_amount']
-        category_summary[category]['total_sales_value'] += detail['total_sales_amount']
-        category_summary[category]['total_stock_value'] += detail['total_stock_value']
-        category_summary[category]['total_gst_collected'] += (detail['cgst_amount'] + detail['sgst_amount'])
-        category_summary[category]['total_igst_collected'] += detail['igst_amount']
+            paise[category] = dict.fromkeys(STOCK_REPORT_SUMMARY_FIELDS, 0)
+        summary = category_summary[category]
+        summary['total_products'] += 1
+        summary['total_stock'] += detail['current_stock']
+        summary['total_sold'] += detail['sold_quantity']
         if detail['current_stock'] == 0:
-            category_summary[category]['out_of_stock_count'] += 1
+            summary['out_of_stock_count'] += 1
+        _add_stock_report_paise(paise[category], detail)
+    for category, summary in category_summary.items():
+        summary.update(_paise_to_money(paise[category]))
+    return category_summary
+
+
+def _stock_report_totals(stock_details):
+    totals = dict.fromkeys(STOCK_REPORT_SUMMARY_FIELDS, 0)
+    for d in stock_details:
+        _add_stock_report_paise(totals, d)
+    return _paise_to_money(totals)
+
+
+@login_required
+def monthly_stock_report(request):
+    """Monthly stock report (includes archived products for analytics integrity)."""
+    user = request.user
+    current_date = timezone.now()
+
+    year = int(request.GET.get('year', current_date.year))
+    month = int(request.GET.get('month', current_date.month))
+
+    # Products purchased on or before the end of the report month, with
+    # sales totals from the monthly rollup (one row per product per month)
+    products_annotated = monthly_report_products(user, year, month)
 
     month_name = calendar.month_name[month]
-    
-    # STRICT COLUMN ORDER
-    export_headers = [
-        'Product Name', 'Category', 'GST%', 'IGST%', 'HSN', 'Batch No', 
-        'Initial Stock', 'Current Stock', 'Units Sold', 'Taxable Sales Amt', 
-        'IGST', 'CGST', 'SGST', 'Total Sales Amt', 'Taxable Stock Val', 
-        'Stock Val GST amount', 'Total Stock Val', 'Status'
-    ]
+
+    if request.GET.get('format') == 'csv':
+        # Rows go out as the cursor yields them, already grouped by rate table
+        products = order_by_tax_table(products_annotated, 'category', 'name').iterator()
+        return stream_csv_response(
+            f'monthly_stock_report_{month_name}_{year}.csv',
+            _stock_report_csv_rows(_iter_stock_report_details(products)),
+        )
 
     if request.GET.get('format') == 'xlsx':
-        rows = []
-        for d in stock_details:
-            p = d['product']
-            rows.append([
-                p.name, p.category or '', str(p.gst), str(p.igst), p.hsn_code or '', p.batch_number or '',
-                d['initial_stock'], d['current_stock'], d['sold_quantity'],
-                f"{d['taxable_sales_amount']:.2f}", f"{d['igst_amount']:.2f}", f"{d['cgst_amount']:.2f}", f"{d['sgst_amount']:.2f}",
-                f"{d['total_sales_amount']:.2f}", f"{d['taxable_stock_value']:.2f}", f"{d['stock_val_gst_amt']:.2f}", f"{d['total_stock_value']:.2f}",
-                d['stock_status']
-            ])
-        buf, fname = build_workbook_response(
-            f'monthly_stock_{month_name}_{year}.xlsx', f'Monthly {month_name}'[:31],
-            export_headers, rows,
+        # Overview sheet plus one sheet per GST/IGST rate table
+        return tax_table_workbook_response(
+            f'monthly_stock_{month_name}_{year}.xlsx',
+            _iter_stock_report_details(products_annotated.iterator()),
+            sheet_title=f'Monthly {month_name}',
+            **STOCK_REPORT_TABLE_OPTIONS,
         )
-        response = HttpResponse(buf.getvalue(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="{fname}"'
-        return response
 
-    if request.GET.get('format') == 'csv':
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
-        filename = f'monthly_stock_report_{month_name}_{year}.csv'
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        writer = csv.writer(response)
-
-        # Section 1: GST TABLE
-        writer.writerow(["--- SECTION 1: GST TABLE (CGST + SGST) ---"])
-        writer.writerow([])
-        for rate in [5, 12, 18]:
-            writer.writerow([f"Table: {rate}% GST"])
-            writer.writerow(export_headers)
-            table_data = [d for d in stock_details if d['product'].igst == 0 and d['product'].gst == rate]
-            
-            s_tax_sales = s_igst = s_cgst = s_sgst = s_total_sales = s_tax_stock = s_stock_gst = s_total_stock = Decimal('0.00')
-            if table_data:
-                for d in table_data:
-                    p = d['product']
-                    writer.writerow([
-                        p.name, p.category or '', str(p.gst), str(p.igst), p.hsn_code or '', p.batch_number or '',
-                        d['initial_stock'], d['current_stock'], d['sold_quantity'],
-                        f"{d['taxable_sales_amount']:.2f}", f"{d['igst_amount']:.2f}", f"{d['cgst_amount']:.2f}", f"{d['sgst_amount']:.2f}",
-                        f"{d['total_sales_amount']:.2f}", f"{d['taxable_stock_value']:.2f}", f"{d['stock_val_gst_amt']:.2f}", f"{d['total_stock_value']:.2f}",
-                        d['stock_status']
-                    ])
-                    s_tax_sales += d['taxable_sales_amount']
-                    s_igst += d['igst_amount']
-                    s_cgst += d['cgst_amount']
-                    s_sgst += d['sgst_amount']
-                    s_total_sales += d['total_sales_amount']
-                    s_tax_stock += d['taxable_stock_value']
-                    s_stock_gst += d['stock_val_gst_amt']
-                    s_total_stock += d['total_stock_value']
-            
-            writer.writerow([
-                'TOTAL', '', '', '', '', '', '', '', '',
-                f"{s_tax_sales:.2f}", f"{s_igst:.2f}", f"{s_cgst:.2f}", f"{s_sgst:.2f}",
-                f"{s_total_sales:.2f}", f"{s_tax_stock:.2f}", f"{s_stock_gst:.2f}", f"{s_total_stock:.2f}", ''
-            ])
-            writer.writerow([])
-
-        # Section 2: IGST TABLE
-        writer.writerow(["--- SECTION 2: IGST TABLE ---"])
-        writer.writerow([])
-        for rate in [5, 12, 18]:
-            writer.writerow([f"Table: {rate}% IGST"])
-            writer.writerow(export_headers)
-            table_data = [d for d in stock_details if d['product'].igst == rate]
-            
-            s_tax_sales = s_igst = s_cgst = s_sgst = s_total_sales = s_tax_stock = s_stock_gst = s_total_stock = Decimal('0.00')
-            if table_data:
-                for d in table_data:
-                    p = d['product']
-                    writer.writerow([
-                        p.name, p.category or '', str(p.gst), str(p.igst), p.hsn_code or '', p.batch_number or '',
-                        d['initial_stock'], d['current_stock'], d['sold_quantity'],
-                        f"{d['taxable_sales_amount']:.2f}", f"{d['igst_amount']:.2f}", f"{d['cgst_amount']:.2f}", f"{d['sgst_amount']:.2f}",
-                        f"{d['total_sales_amount']:.2f}", f"{d['taxable_stock_value']:.2f}", f"{d['stock_val_gst_amt']:.2f}", f"{d['total_stock_value']:.2f}",
-                        d['stock_status']
-                    ])
-                    s_tax_sales += d['taxable_sales_amount']
-                    s_igst += d['igst_amount']
-                    s_cgst += d['cgst_amount']
-                    s_sgst += d['sgst_amount']
-                    s_total_sales += d['total_sales_amount']
-                    s_tax_stock += d['taxable_stock_value']
-                    s_stock_gst += d['stock_val_gst_amt']
-                    s_total_stock += d['total_stock_value']
-            
-            writer.writerow([
-                'TOTAL', '', '', '', '', '', '', '', '',
-                f"{s_tax_sales:.2f}", f"{s_igst:.2f}", f"{s_cgst:.2f}", f"{s_sgst:.2f}",
-                f"{s_total_sales:.2f}", f"{s_tax_stock:.2f}", f"{s_stock_gst:.2f}", f"{s_total_stock:.2f}", ''
-            ])
-            writer.writerow([])
-        return response
+    stock_details = list(_iter_stock_report_details(products_annotated))
+    totals = _stock_report_totals(stock_details)
+    category_summary = _stock_report_category_summary(stock_details)
 
     context = {
         'stock_details': stock_details,
@@ -1392,11 +1000,11 @@ def monthly_stock_report(request):
         'year': year,
         'month': month,
         'month_name': month_name,
-        'total_taxable_stock_value': total_taxable_stock_value,
-        'total_stock_value': total_stock_value,
-        'total_sales_value': total_sales_value,
-        'total_gst_collected': total_gst_collected,
-        'total_igst_collected': total_igst_collected,
+        'total_taxable_stock_value': totals['total_taxable_stock_value'],
+        'total_stock_value': totals['total_stock_value'],
+        'total_sales_value': totals['total_sales_value'],
+        'total_gst_collected': totals['total_gst_collected'],
+        'total_igst_collected': totals['total_igst_collected'],
         'report_date': f'{month_name} {year}',
         'user': user,
         'prev_month': month - 1 if month > 1 else 12,
@@ -1412,6 +1020,39 @@ def monthly_stock_report(request):
 
 #------- Yearly Report Code -------
 
+FY_MONTHS = (4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3)
+
+
+def _financial_year_monthly_sales(user, year):
+    """
+    Sales, GST and units per month of the April-March financial year, in one
+    query (financial_year_sales_groups). The GST contained in each group's line
+    total is extracted once (one extract_tax() pass) and multiplied by the
+    number of lines, which gives the same figures as extracting it line by
+    line. CGST + SGST only: IGST products count towards IGST, as in the product
+    table.
+    """
+    groups = list(financial_year_sales_groups(user, year))
+    taxes = extract_tax(
+        [group['total_price'] for group in groups],
+        [group['product__gst'] for group in groups],
+        [group['product__igst'] for group in groups],
+    )
+    gst = taxes.money('gst')
+
+    months = {month: {'total_sales': Money(), 'total_gst': Money(), 'quantity_sold': 0} for month in FY_MONTHS}
+    for index, group in enumerate(groups):
+        totals = months[group['month'].month]
+        lines = group['lines']
+        totals['total_sales'] += Money.from_decimal(group['total_price']) * lines
+        totals['total_gst'] += gst[index] * lines
+        totals['quantity_sold'] += group['quantity']
+    return [
+        {'month': month, 'month_name': calendar.month_name[month], **totals}
+        for month, totals in months.items()
+    ]
+
+
 @login_required
 def yearly_stock_summary(request):
     """Yearly overview plus per-product stock detail (same columns as monthly, aggregated by year)."""
@@ -1424,323 +1065,55 @@ def yearly_stock_summary(request):
     default_fy_year = current_date.year if current_date.month >= 4 else current_date.year - 1
     year = int(request.GET.get('year', default_fy_year))
     
-    fy_start = date(year, 4, 1)
-    fy_end = date(year + 1, 3, 31)
     fy_label = f"{year}–{year + 1}"
 
-    monthly_data = []
-    # Sequence: April to March
-    fy_months = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-    for month in fy_months:
-        target_year = year if month >= 4 else year + 1
-        try:
-            month_sales = SalesReport.objects.filter(
-                store_owner=user,
-                order__is_deleted=False,
-                sale_date__year=target_year,
-                sale_date__month=month,
-            )
-            total_sales = month_sales.aggregate(total=Sum('total_price'))['total'] or Decimal('0.00')
-            total_quantity_sold = month_sales.aggregate(qty=Sum('quantity'))['qty'] or 0
-
-            total_gst = Decimal('0.00')
-            for sale in month_sales:
-                if sale.product.gst > 0:
-                    gst_rate = Decimal(str(sale.product.gst)) / Decimal('100')
-                    base_amount = sale.total_price / (Decimal('1') + gst_rate)
-                    sale_gst = sale.total_price - base_amount
-                    total_gst += sale_gst
-
-        except Exception:
-            month_orders = Order.objects.filter(
-                store_owner=user,
-                is_deleted=False,
-                order_date__year=target_year,
-                order_date__month=month,
-            )
-
-            total_sales = Decimal('0.00')
-            total_gst = Decimal('0.00')
-            total_quantity_sold = 0
-
-            for order in month_orders:
-                total_sales += order.total_price or Decimal('0.00')
-                total_gst += getattr(order, 'total_gst', Decimal('0.00'))
-
-                for item in order.items.all():
-                    total_quantity_sold += item.quantity
-
-        monthly_data.append({
-            'month': month,
-            'month_name': calendar.month_name[month],
-            'total_sales': total_sales,
-            'total_gst': total_gst,
-            'quantity_sold': total_quantity_sold,
-        })
+    monthly_data = _financial_year_monthly_sales(user, year)
 
     yearly_sales = sum(data['total_sales'] for data in monthly_data)
     yearly_gst = sum(data['total_gst'] for data in monthly_data)
     yearly_quantity = sum(data['quantity_sold'] for data in monthly_data)
 
     # --- Products Section (Aligned with Financial Year Logic) ---
-    # Use Subqueries for optimized calculation
-    sold_before = SalesReport.objects.filter(
-        product=OuterRef('pk'),
-        order__is_deleted=False,
-        sale_date__date__lt=fy_start
-    ).values('product').annotate(total=Sum('quantity')).values('total')
-
-    sold_in = SalesReport.objects.filter(
-        product=OuterRef('pk'),
-        order__is_deleted=False,
-        sale_date__date__gte=fy_start,
-        sale_date__date__lte=fy_end
-    ).values('product').annotate(total=Sum('quantity')).values('total')
-
-    sales_total_in = SalesReport.objects.filter(
-        product=OuterRef('pk'),
-        order__is_deleted=False,
-        sale_date__date__gte=fy_start,
-        sale_date__date__lte=fy_end
-    ).values('product').annotate(total=Sum('total_price')).values('total')
-
-    taxable_sales_total_in = OrderItem.objects.filter(
-        product=OuterRef('pk'),
-        order__is_deleted=False,
-        order__order_date__date__gte=fy_start,
-        order__order_date__date__lte=fy_end
-    ).values('product').annotate(total=Sum('subtotal')).values('total')
-
-    products_annotated = Product.objects.filter(
-        store_owner=user,
-        purchase_date__lte=fy_end
-    ).annotate(
-        qty_sold_before=Coalesce(Subquery(sold_before), 0),
-        qty_sold_in=Coalesce(Subquery(sold_in), 0),
-        amnt_sold_in=Coalesce(Subquery(sales_total_in), Decimal('0.00')),
-        taxable_amnt_sold_in=Coalesce(Subquery(taxable_sales_total_in), Decimal('0.00'))
-    ).order_by('category', 'name')
-
-    stock_details = []
-    total_taxable_stock_value = Decimal('0.00')
-    total_stock_value = Decimal('0.00')
-    total_taxable_sales_value = Decimal('0.00')
-    total_sales_value_sum = Decimal('0.00')
-    total_gst_collected = Decimal('0.00')
-    total_igst_collected = Decimal('0.00')
-
-    for p in products_annotated:
-        initial_for_year = p.initial_stock - p.qty_sold_before
-        
-        # Consistent with monthly logic: exclude products with no starting stock and no sales this year
-        if initial_for_year <= 0 and p.qty_sold_in == 0:
-            continue
-            
-        units_sold = p.qty_sold_in
-        taxable_sales_amt = p.taxable_amnt_sold_in
-        
-        if p.igst > 0:
-            rate = Decimal(str(p.igst))
-            igst_val = taxable_sales_amt * (rate / Decimal('100'))
-            cgst_val = Decimal('0.00')
-            sgst_val = Decimal('0.00')
-            total_sales_amt = taxable_sales_amt + igst_val
-        else:
-            rate = Decimal(str(p.gst))
-            item_total_gst = taxable_sales_amt * (rate / Decimal('100'))
-            igst_val = Decimal('0.00')
-            cgst_val = item_total_gst / Decimal('2')
-            sgst_val = item_total_gst / Decimal('2')
-            total_sales_amt = taxable_sales_amt + cgst_val + sgst_val
-            
-        current_stock = initial_for_year - units_sold
-        taxable_stock_val = current_stock * p.taxable_unit_amount
-        
-        if p.igst > 0:
-            stock_val_gst_amt = taxable_stock_val * (p.igst / Decimal('100'))
-        else:
-            stock_val_gst_amt = taxable_stock_val * (p.gst / Decimal('100'))
-            
-        product_total_stock_val = taxable_stock_val + stock_val_gst_amt
-        status = "Available" if current_stock > 0 else "Out of Stock"
-        
-        detail = {
-            'product': p,
-            'category': p.category or 'Uncategorized',
-            'initial_stock': initial_for_year,
-            'current_stock': current_stock,
-            'sold_quantity': units_sold,
-            'taxable_sales_amount': taxable_sales_amt,
-            'igst_amount': igst_val,
-            'cgst_amount': cgst_val,
-            'sgst_amount': sgst_val,
-            'total_sales_amount': total_sales_amt,
-            'taxable_stock_value': taxable_stock_val,
-            'stock_val_gst_amt': stock_val_gst_amt,
-            'total_stock_value': product_total_stock_val,
-            'stock_status': status,
-            'batch_number': p.batch_number or '-',
-        }
-        stock_details.append(detail)
-        
-        total_taxable_stock_value += taxable_stock_val
-        total_stock_value += product_total_stock_val
-        total_taxable_sales_value += taxable_sales_amt
-        total_sales_value_sum += total_sales_amt
-        total_gst_collected += (cgst_val + sgst_val)
-        total_igst_collected += igst_val
-
-    category_summary = {}
-    for detail in stock_details:
-        category = detail['category']
-        if category not in category_summary:
-            category_summary[category] = {
-                'total_products': 0, 'total_stock': 0, 'total_sold': 0,
-                'total_taxable_sales_value': Decimal('0.00'),
-                'total_sales_value': Decimal('0.00'), 
-                'total_stock_value': Decimal('0.00'),
-                'total_gst_collected': Decimal('0.00'), 
-                'total_igst_collected': Decimal('0.00'),
-                'out_of_stock_count': 0, 'low_stock_count': 0,
-            }
+    # Sales totals come from the monthly rollup: April of `year` to March of `year + 1`
+    products_annotated = yearly_report_products(user, year)
 
-        category_summary[category]['total_products'] += 1
-        category_summary[category]['total_stock'] += detail['current_stock']
-        category_summary[category]['total_sold'] += detail['sold_quantity']
-        category_summary[category]['total_taxable_sales_value'] += detail['taxable_sales_amount']
-        category_summary[category]['total_sales_value'] += detail['total_sales_amount']
-        category_summary[category]['total_stock_value'] += detail['total_stock_value']
-        category_summary[category]['total_gst_collected'] += (detail['cgst_amount'] + detail['sgst_amount'])
-        category_summary[category]['total_igst_collected'] += detail['igst_amount']
+    if request.GET.get('format') == 'csv':
+        preamble = [
+            ['Financial Year Stock/Sales Summary', fy_label],
+            ['Store Owner:', user.company_name or user.username],
+            [],
+            ['YEARLY TOTALS (FY)'],
+            ['Total Sales:', f'Rs{yearly_sales:.2f}'],
+            ['Total GST Collected:', f'Rs{yearly_gst:.2f}'],
+            ['Units Sold:', yearly_quantity],
+            [],
+            ['MONTHLY BREAKDOWN'],
+            ['Month', 'Sales (Rs)', 'GST Collected (Rs)', 'Units Sold'],
+        ]
+        for data in monthly_data:
+            preamble.append([
+                data['month_name'], f"{data['total_sales']:.2f}",
+                f"{data['total_gst']:.2f}", data['quantity_sold'],
+            ])
+        preamble += [[], ['PRODUCT DETAILS (YEAR)']]
 
-        if detail['current_stock'] == 0:
-            category_summary[category]['out_of_stock_count'] += 1
-
-    # STRICT COLUMN ORDER (matches monthly report)
-    export_headers = [
-        'Product Name', 'Category', 'GST%', 'IGST%', 'HSN', 'Batch No', 
-        'Initial Stock', 'Current Stock', 'Units Sold', 'Taxable Sales Amt', 
-        'IGST', 'CGST', 'SGST', 'Total Sales Amt', 'Taxable Stock Val', 
-        'Stock Val GST amount', 'Total Stock Val', 'Status'
-    ]
+        products = order_by_tax_table(products_annotated, 'category', 'name').iterator()
+        return stream_csv_response(
+            f'yearly_summary_FY_{year}_{year+1}.csv',
+            itertools.chain(preamble, _stock_report_csv_rows(_iter_stock_report_details(products))),
+        )
 
     if request.GET.get('format') == 'xlsx':
-        rows = []
-        for d in stock_details:
-            p = d['product']
-            rows.append([
-                p.name, p.category or '', str(p.gst), str(p.igst), p.hsn_code or '', p.batch_number or '',
-                d['initial_stock'], d['current_stock'], d['sold_quantity'],
-                f"{d['taxable_sales_amount']:.2f}", f"{d['igst_amount']:.2f}", f"{d['cgst_amount']:.2f}", f"{d['sgst_amount']:.2f}",
-                f"{d['total_sales_amount']:.2f}", f"{d['taxable_stock_value']:.2f}", f"{d['stock_val_gst_amt']:.2f}", f"{d['total_stock_value']:.2f}",
-                d['stock_status']
-            ])
-        buf, fname = build_workbook_response(
+        return tax_table_workbook_response(
             f'yearly_stock_FY_{year}_{year+1}.xlsx',
-            f'FY {fy_label}'[:31],
-            export_headers,
-            rows,
+            _iter_stock_report_details(products_annotated.iterator()),
+            sheet_title=f'FY {fy_label}',
+            **STOCK_REPORT_TABLE_OPTIONS,
         )
-        response = HttpResponse(
-            buf.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        )
-        response['Content-Disposition'] = f'attachment; filename="{fname}"'
-        return response
 
-    if request.GET.get('format') == 'csv':
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
-        filename = f'yearly_summary_FY_{year}_{year+1}.csv'
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        writer = csv.writer(response)
-        writer.writerow(['Financial Year Stock/Sales Summary', fy_label])
-        writer.writerow(['Store Owner:', user.company_name or user.username])
-        writer.writerow([])
-        writer.writerow(['YEARLY TOTALS (FY)'])
-        writer.writerow(['Total Sales:', f'Rs{yearly_sales:.2f}'])
-        writer.writerow(['Total GST Collected:', f'Rs{yearly_gst:.2f}'])
-        writer.writerow(['Units Sold:', yearly_quantity])
-        writer.writerow([])
-        writer.writerow(['MONTHLY BREAKDOWN'])
-        writer.writerow(['Month', 'Sales (Rs)', 'GST Collected (Rs)', 'Units Sold'])
-        for data in monthly_data:
-            writer.writerow([
-                data['month_name'], f"{data['total_sales']:.2f}",
-                f"{data['total_gst']:.2f}", data['quantity_sold'],
-            ])
-        writer.writerow([])
-        writer.writerow(['PRODUCT DETAILS (YEAR)'])
-        
-        # Section 1: GST TABLE
-        writer.writerow(["--- SECTION 1: GST TABLE (CGST + SGST) ---"])
-        writer.writerow([])
-        for rate in [5, 12, 18]:
-            writer.writerow([f"Table: {rate}% GST"])
-            writer.writerow(export_headers)
-            table_data = [d for d in stock_details if d['product'].igst == 0 and d['product'].gst == rate]
-            
-            s_tax_sales = s_igst = s_cgst = s_sgst = s_total_sales = s_tax_stock = s_stock_gst = s_total_stock = Decimal('0.00')
-            if table_data:
-                for d in table_data:
-                    p = d['product']
-                    writer.writerow([
-                        p.name, p.category or '', str(p.gst), str(p.igst), p.hsn_code or '', p.batch_number or '',
-                        d['initial_stock'], d['current_stock'], d['sold_quantity'],
-                        f"{d['taxable_sales_amount']:.2f}", f"{d['igst_amount']:.2f}", f"{d['cgst_amount']:.2f}", f"{d['sgst_amount']:.2f}",
-                        f"{d['total_sales_amount']:.2f}", f"{d['taxable_stock_value']:.2f}", f"{d['stock_val_gst_amt']:.2f}", f"{d['total_stock_value']:.2f}",
-                        d['stock_status']
-                    ])
-                    s_tax_sales += d['taxable_sales_amount']
-                    s_igst += d['igst_amount']
-                    s_cgst += d['cgst_amount']
-                    s_sgst += d['sgst_amount']
-                    s_total_sales += d['total_sales_amount']
-                    s_tax_stock += d['taxable_stock_value']
-                    s_stock_gst += d['stock_val_gst_amt']
-                    s_total_stock += d['total_stock_value']
-            
-            writer.writerow([
-                'TOTAL', '', '', '', '', '', '', '', '',
-                f"{s_tax_sales:.2f}", f"{s_igst:.2f}", f"{s_cgst:.2f}", f"{s_sgst:.2f}",
-                f"{s_total_sales:.2f}", f"{s_tax_stock:.2f}", f"{s_stock_gst:.2f}", f"{s_total_stock:.2f}", ''
-            ])
-            writer.writerow([])
-
-        # Section 2: IGST TABLE
-        writer.writerow(["--- SECTION 2: IGST TABLE ---"])
-        writer.writerow([])
-        for rate in [5, 12, 18]:
-            writer.writerow([f"Table: {rate}% IGST"])
-            writer.writerow(export_headers)
-            table_data = [d for d in stock_details if d['product'].igst == rate]
-            
-            s_tax_sales = s_igst = s_cgst = s_sgst = s_total_sales = s_tax_stock = s_stock_gst = s_total_stock = Decimal('0.00')
-            if table_data:
-                for d in table_data:
-                    p = d['product']
-                    writer.writerow([
-                        p.name, p.category or '', str(p.gst), str(p.igst), p.hsn_code or '', p.batch_number or '',
-                        d['initial_stock'], d['current_stock'], d['sold_quantity'],
-                        f"{d['taxable_sales_amount']:.2f}", f"{d['igst_amount']:.2f}", f"{d['cgst_amount']:.2f}", f"{d['sgst_amount']:.2f}",
-                        f"{d['total_sales_amount']:.2f}", f"{d['taxable_stock_value']:.2f}", f"{d['stock_val_gst_amt']:.2f}", f"{d['total_stock_value']:.2f}",
-                        d['stock_status']
-                    ])
-                    s_tax_sales += d['taxable_sales_amount']
-                    s_igst += d['igst_amount']
-                    s_cgst += d['cgst_amount']
-                    s_sgst += d['sgst_amount']
-                    s_total_sales += d['total_sales_amount']
-                    s_tax_stock += d['taxable_stock_value']
-                    s_stock_gst += d['stock_val_gst_amt']
-                    s_total_stock += d['total_stock_value']
-            
-            writer.writerow([
-                'TOTAL', '', '', '', '', '', '', '', '',
-                f"{s_tax_sales:.2f}", f"{s_igst:.2f}", f"{s_cgst:.2f}", f"{s_sgst:.2f}",
-                f"{s_total_sales:.2f}", f"{s_tax_stock:.2f}", f"{s_stock_gst:.2f}", f"{s_total_stock:.2f}", ''
-            ])
-            writer.writerow([])
-        return response
+    stock_details = list(_iter_stock_report_details(products_annotated))
+    totals = _stock_report_totals(stock_details)
+    category_summary = _stock_report_category_summary(stock_details)
 
     context = {
         'monthly_data': monthly_data,
@@ -1750,11 +1123,11 @@ def yearly_stock_summary(request):
         'yearly_sales': yearly_sales,
         'yearly_gst': yearly_gst,
         'yearly_quantity': yearly_quantity,
-        'total_taxable_stock_value': total_taxable_stock_value,
-        'total_stock_value': total_stock_value,
-        'total_sales_value': total_sales_value_sum,
-        'total_gst_collected': total_gst_collected,
-        'total_igst_collected': total_igst_collected,
+        'total_taxable_stock_value': totals['total_taxable_stock_value'],
+        'total_stock_value': totals['total_stock_value'],
+        'total_sales_value': totals['total_sales_value'],
+        'total_gst_collected': totals['total_gst_collected'],
+        'total_igst_collected': totals['total_igst_collected'],
         'fy_label': fy_label,
         'user': user,
         'years': list(range(2020, current_date.year + 2)),
@@ -1762,11 +1135,67 @@ def yearly_stock_summary(request):
 
     return render(request, 'yearly_stock_summary.html', context)
 
+STOCK_AT_DATE_EXPORT_HEADERS = [
+    'Company Name', 'Company GSTIN', 'Purchase date', 'Purchase invoice number',
+    'Product name', 'Category', 'GST (%)', 'IGST', 'HSN', 'Batch no.',
+    'Quantity', 'Measurement type', 'Unit Capacity', 'Taxable unit value',
+    'Taxable total value', 'IGST AMT', 'CGST AMT', 'SGST AMT', 'Total amount'
+]
+
+
+def _stock_at_date_rows(products):
+    """Stock value rows for products annotated with calculated_remaining_stock."""
+    # IGST takes priority; gst_amount is the GST or IGST on the remaining stock
+    taxes = add_tax(
+        [p.calculated_remaining_stock * p.taxable_unit_amount for p in products],
+        [p.gst for p in products],
+        [p.igst for p in products],
+    )
+    money = {name: taxes.money(name) for name in ('taxable', 'tax', 'cgst', 'sgst', 'igst', 'total')}
+    return [
+        {
+            'purchased_from': p.purchased_from,
+            'company_gstin': p.company_gstin,
+            'purchase_date': p.purchase_date,
+            'purchase_invoice_number': p.purchase_invoice_number,
+            'name': p.name,
+            'category': p.category,
+            'gst': p.gst,
+            'igst': p.igst,
+            'hsn': p.hsn_code,
+            'batch_no': p.batch_number,
+            'remaining_stock': p.calculated_remaining_stock,
+            'measurement_type': p.get_measurement_type_display(),
+            'measurement': p.get_unit_label(),
+            'unit_capacity': p.unit_capacity,
+            'taxable_unit_value': p.taxable_unit_amount,
+            'taxable_total_value': money['taxable'][index],
+            'gst_amount': money['tax'][index],
+            'cgst_amount': money['cgst'][index],
+            'sgst_amount': money['sgst'][index],
+            'igst_amount': money['igst'][index],
+            'total_amount': money['total'][index],
+        }
+        for index, p in enumerate(products)
+    ]
+
+
+def _stock_at_date_export_row(row):
+    return [
+        row['purchased_from'], row['company_gstin'], row['purchase_date'], row['purchase_invoice_number'],
+        row['name'], row['category'], row['gst'], row['igst'], row['hsn'], row['batch_no'],
+        row['remaining_stock'], row['measurement_type'], row['unit_capacity'],
+        row['taxable_unit_value'], row['taxable_total_value'], 
+        row['igst_amount'], row['cgst_amount'], row['sgst_amount'], row['total_amount']
+    ]
+
+
 @login_required
 def stock_at_date_view(request):
     """
-    View to show stock remaining as of a particular date.
-    Stock = Purchases (Product Add) - Sales (Orders) till that date.
+    View to show stock remaining as of a particular date: each product's
+    balance in the stock ledger at the end of that date (purchases - sales -
+    purchase returns +/- stock edits).
     """
     selected_date_str = request.GET.get('date') or request.POST.get('date')
     selected_date = timezone.now().date()
@@ -1777,147 +1206,36 @@ def stock_at_date_view(request):
         except (ValueError, TypeError):
             pass
 
-    # 1. Efficiently calculate total sold per product up to selected date
-    # Only consider orders with order_date <= selected_date
-    sold_subquery = OrderItem.objects.filter(
-        product=OuterRef('pk'),
-        order__is_deleted=False,
-        order__order_date__date__lte=selected_date
-    ).values('product').annotate(total=Sum('quantity')).values('total')
-
-    # 2. Get products purchased till the selected date
-    # Only show products where stock > 0
+    # 1. Products purchased till the selected date, with their stock on that
+    # date (one indexed ledger lookup each); only those with stock > 0
     products = Product.objects.filter(
         store_owner=request.user,
         purchase_date__lte=selected_date
     ).annotate(
-        total_sold=Coalesce(Subquery(sold_subquery), 0)
-    ).annotate(
-        calculated_remaining_stock=F('initial_stock') - F('total_sold')
-    ).filter(calculated_remaining_stock__gt=0)
-
-    results = []
-    for p in products:
-        rem_stock = p.calculated_remaining_stock
-        
-        # Calculations as per strict rules
-        taxable_total_value = rem_stock * p.taxable_unit_amount
-        
-        # IGST priority for tax calculation
-        is_igst = p.igst and p.igst > 0
-        tax_rate = p.igst if is_igst else p.gst
-        
-        # Missing calculation fix
-        gst_amount = taxable_total_value * (tax_rate / Decimal('100'))
-        total_amt = taxable_total_value + gst_amount
-        
-        gst_val = Decimal('0.00')
-        cgst_val = Decimal('0.00')
-        sgst_val = Decimal('0.00')
-        igst_val = Decimal('0.00')
-        if is_igst:
-            igst_val = gst_amount
-        else:
-            gst_val = gst_amount
-            cgst_val = gst_val / Decimal('2')
-            sgst_val = gst_val / Decimal('2')
-
-        results.append({
-            'purchased_from': p.purchased_from,
-            'company_gstin': p.company_gstin,
-            'purchase_date': p.purchase_date,
-            'purchase_invoice_number': p.purchase_invoice_number,
-            'name': p.name,
-            'category': p.category,
-            'gst': p.gst,
-            'igst': p.igst,
-            'hsn': p.hsn_code,
-            'batch_no': p.batch_number,
-            'remaining_stock': rem_stock,
-            'measurement_type': p.get_measurement_type_display(),
-            'measurement': p.get_unit_label(),
-            'unit_capacity': p.unit_capacity,
-            'taxable_unit_value': p.taxable_unit_amount,
-            'taxable_total_value': taxable_total_value,
-            'gst_amount': gst_amount,
-            'cgst_amount': cgst_val,
-            'sgst_amount': sgst_val,
-            'igst_amount': igst_val,
-            'total_amount': total_amt
-        })
+        calculated_remaining_stock=stock_on(selected_date)
+    ).filter(calculated_remaining_stock__gt=0).order_by('pk')
 
-    # 3. CSV Export Handle
+    # 2. CSV Export Handle
     if request.GET.get('export') == 'csv':
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="stock_grouped_{selected_date}.csv"'
-        writer = csv.writer(response)
-        headers = [
-            'Company Name', 'Company GSTIN', 'Purchase date', 'Purchase invoice number',
-            'Product name', 'Category', 'GST (%)', 'IGST', 'HSN', 'Batch no.',
-            'Quantity', 'Measurement type', 'Unit Capacity', 'Taxable unit value',
-            'Taxable total value', 'IGST AMT', 'CGST AMT', 'SGST AMT', 'Total amount'
-        ]
+        rows = in_batches(_stock_at_date_rows, order_by_tax_table(products, 'pk').iterator())
+        return stream_csv_response(
+            f"stock_grouped_{selected_date}.csv",
+            iter_tax_table_rows(
+                rows,
+                headers=STOCK_AT_DATE_EXPORT_HEADERS,
+                rates_of=lambda row: (row['gst'], row['igst']),
+                row_cells=_stock_at_date_export_row,
+                total_fields=('taxable_total_value', 'igst_amount', 'cgst_amount', 'sgst_amount', 'total_amount'),
+                total_row=lambda kind, s: [
+                    'TOTAL', '', '', '', '', '', '', '', '', '', '', '', '', '',
+                    f"{s['taxable_total_value']:.2f}", f"{s['igst_amount']:.2f}", f"{s['cgst_amount']:.2f}",
+                    f"{s['sgst_amount']:.2f}", f"{s['total_amount']:.2f}"
+                ],
+            ),
+            content_type='text/csv',
+        )
 
-        # Section 1: GST TABLE
-        writer.writerow(["--- SECTION 1: GST TABLE (CGST + SGST) ---"])
-        writer.writerow([])
-        for rate in [5, 12, 18]:
-            writer.writerow([f"Table: {rate}% GST"])
-            writer.writerow(headers)
-            table_data = [r for r in results if r['igst'] == 0 and r['gst'] == rate]
-            
-            s_taxable = s_igst = s_cgst = s_sgst = s_total = Decimal('0.00')
-            if table_data:
-                for row in table_data:
-                    writer.writerow([
-                        row['purchased_from'], row['company_gstin'], row['purchase_date'], row['purchase_invoice_number'],
-                        row['name'], row['category'], row['gst'], row['igst'], row['hsn'], row['batch_no'],
-                        row['remaining_stock'], row['measurement_type'], row['unit_capacity'],
-                        row['taxable_unit_value'], row['taxable_total_value'], 
-                        row['igst_amount'], row['cgst_amount'], row['sgst_amount'], row['total_amount']
-                    ])
-                    s_taxable += row['taxable_total_value']
-                    s_igst += row['igst_amount']
-                    s_cgst += row['cgst_amount']
-                    s_sgst += row['sgst_amount']
-                    s_total += row['total_amount']
-            
-            writer.writerow([
-                'TOTAL', '', '', '', '', '', '', '', '', '', '', '', '', '',
-                f"{s_taxable:.2f}", f"{s_igst:.2f}", f"{s_cgst:.2f}", f"{s_sgst:.2f}", f"{s_total:.2f}"
-            ])
-            writer.writerow([])
-
-        # Section 2: IGST TABLE
-        writer.writerow(["--- SECTION 2: IGST TABLE ---"])
-        writer.writerow([])
-        for rate in [5, 12, 18]:
-            writer.writerow([f"Table: {rate}% IGST"])
-            writer.writerow(headers)
-            table_data = [r for r in results if r['igst'] == rate]
-            
-            s_taxable = s_igst = s_cgst = s_sgst = s_total = Decimal('0.00')
-            if table_data:
-                for row in table_data:
-                    writer.writerow([
-                        row['purchased_from'], row['company_gstin'], row['purchase_date'], row['purchase_invoice_number'],
-                        row['name'], row['category'], row['gst'], row['igst'], row['hsn'], row['batch_no'],
-                        row['remaining_stock'], row['measurement_type'], row['unit_capacity'],
-                        row['taxable_unit_value'], row['taxable_total_value'], 
-                        row['igst_amount'], row['cgst_amount'], row['sgst_amount'], row['total_amount']
-                    ])
-                    s_taxable += row['taxable_total_value']
-                    s_igst += row['igst_amount']
-                    s_cgst += row['cgst_amount']
-                    s_sgst += row['sgst_amount']
-                    s_total += row['total_amount']
-            
-            writer.writerow([
-                'TOTAL', '', '', '', '', '', '', '', '', '', '', '', '', '',
-                f"{s_taxable:.2f}", f"{s_igst:.2f}", f"{s_cgst:.2f}", f"{s_sgst:.2f}", f"{s_total:.2f}"
-            ])
-            writer.writerow([])
-        return response
+    results = _stock_at_date_rows(list(products))
 
     return render(request, 'stock_at_date.html', {
         'results': results,
@@ -1941,10 +1259,10 @@ def monthly_purchase_details(request):
         purchase_date__month=month
     ).order_by('category', 'name')
 
-    details = _calculate_purchase_report_data(products)
-    
     if request.GET.get('format') == 'csv':
-        return _export_purchase_csv(details, f"Monthly_Purchase_{calendar.month_name[month]}_{year}.csv")
+        return _export_purchase_csv(products, f"Monthly_Purchase_{calendar.month_name[month]}_{year}.csv")
+
+    details = _calculate_purchase_report_data(products)
 
     context = {
         'details': details,
@@ -1973,10 +1291,10 @@ def yearly_purchase_details(request):
         purchase_date__range=(fy_start, fy_end)
     ).order_by('category', 'name')
 
-    details = _calculate_purchase_report_data(products)
-
     if request.GET.get('format') == 'csv':
-        return _export_purchase_csv(details, f"Yearly_Purchase_FY_{year}_{year+1}.csv")
+        return _export_purchase_csv(products, f"Yearly_Purchase_FY_{year}_{year+1}.csv")
+
+    details = _calculate_purchase_report_data(products)
 
     context = {
         'details': details,
@@ -1994,115 +1312,76 @@ def _calculate_purchase_report_data(products):
     NOT product.quantity (which changes after sales/returns).
     This ensures purchase data remains static and never changes after checkout.
     """
-    results = []
-    for p in products:
-        # Use initial_stock: the ORIGINAL purchase quantity snapshot.
-        # product.quantity is dynamic (decreases after sales) — must NOT be used here.
-        qty = p.initial_stock
-        
-        # Taxable Unit Amt: prefer unit_amount, fallback to taxable_unit_amount
-        taxable_unit_amt = p.unit_amount
-        if taxable_unit_amt == 0 or taxable_unit_amt is None:
-            taxable_unit_amt = p.taxable_unit_amount
-            
-        # Calculation (STRICT): taxable_total = unit_amount × quantity
-        taxable_total = taxable_unit_amt * qty
-        
-        if p.igst > 0:
-            igst_amt = taxable_total * (p.igst / Decimal('100'))
-            cgst_amt = Decimal('0.00')
-            sgst_amt = Decimal('0.00')
-        else:
-            igst_amt = Decimal('0.00')
-            # IF CGST/SGST: cgst = taxable_total × (gst/2) / 100
-            gst_rate = p.gst
-            cgst_amt = taxable_total * (gst_rate / 2) / Decimal('100')
-            sgst_amt = taxable_total * (gst_rate / 2) / Decimal('100')
-            
-        total_amt = taxable_total + igst_amt + cgst_amt + sgst_amt
-        
-        results.append({
+    return list(_iter_purchase_report_data(products))
+
+def _purchase_report_rows(products):
+    # Use initial_stock: the ORIGINAL purchase quantity snapshot.
+    # product.quantity is dynamic (decreases after sales) — must NOT be used here.
+    # Taxable Unit Amt: prefer unit_amount, fallback to taxable_unit_amount
+    unit_amounts = [p.unit_amount or p.taxable_unit_amount for p in products]
+    # Calculation (STRICT): taxable_total = unit_amount × quantity, tax via store.tax
+    taxes = add_tax(
+        [unit_amount * p.initial_stock for p, unit_amount in zip(products, unit_amounts)],
+        [p.gst for p in products],
+        [p.igst for p in products],
+    )
+    money = {name: taxes.money(name) for name in ('taxable', 'igst', 'cgst', 'sgst', 'total')}
+    return [
+        {
             'product': p,
-            'taxable_unit_amt': taxable_unit_amt,
-            'quantity': qty,
-            'taxable_total': taxable_total,
-            'igst_amt': igst_amt,
-            'cgst_amt': cgst_amt,
-            'sgst_amt': sgst_amt,
-            'total_amt': total_amt,
-        })
-    return results
+            'taxable_unit_amt': unit_amount,
+            'quantity': p.initial_stock,
+            'taxable_total': money['taxable'][index],
+            'igst_amt': money['igst'][index],
+            'cgst_amt': money['cgst'][index],
+            'sgst_amt': money['sgst'][index],
+            'gst_amt': money['cgst'][index] + money['sgst'][index],
+            'total_amt': money['total'][index],
+        }
+        for index, (p, unit_amount) in enumerate(zip(products, unit_amounts))
+    ]
 
-def _export_purchase_csv(details, filename):
-    """Export purchase data to CSV grouped by GST slabs."""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    writer = csv.writer(response)
-    
-    # Columns as specified in the requirement (must match UI exactly)
-    headers = [
-        'Product Name', 'Invoice Number', 'GSTIN', 'Category', 'GST %', 'IGST %', 'HSN', 'Batch No',
-        'Stock Purchased', 'Unit Capacity', 'Taxable Unit Amt', 'Taxable Total Amt',
-        'IGST Amt', 'CGST Amt', 'SGST Amt', 'Total Amt'
+
+def _iter_purchase_report_data(products):
+    return in_batches(_purchase_report_rows, products)
+
+
+# Columns as specified in the requirement (must match UI exactly)
+PURCHASE_EXPORT_HEADERS = [
+    'Product Name', 'Invoice Number', 'GSTIN', 'Category', 'GST %', 'IGST %', 'HSN', 'Batch No',
+    'Stock Purchased', 'Unit Capacity', 'Taxable Unit Amt', 'Taxable Total Amt',
+    'IGST Amt', 'CGST Amt', 'SGST Amt', 'Total Amt'
+]
+
+
+def _purchase_export_row(d):
+    p = d['product']
+    return [
+        p.name, p.purchase_invoice_number or '-', p.company_gstin or '-', p.category or '', f"{p.gst}%", f"{p.igst}%", p.hsn_code or '', p.batch_number or '',
+        d['quantity'], f"{p.unit_capacity} {p.measurement_type}" if p.unit_capacity else "-",
+        f"{d['taxable_unit_amt']:.2f}", f"{d['taxable_total']:.2f}",
+        f"{d['igst_amt']:.2f}", f"{d['cgst_amt']:.2f}", f"{d['sgst_amt']:.2f}", f"{d['total_amt']:.2f}"
     ]
 
-    # Section 1: GST TABLE
-    writer.writerow(["--- SECTION 1: GST TABLE (CGST + SGST) ---"])
-    writer.writerow([])
-    for rate in [5, 12, 18]:
-        writer.writerow([f"Table: {rate}% GST"])
-        writer.writerow(headers)
-        table_data = [d for d in details if d['product'].igst == 0 and d['product'].gst == rate]
-        
-        sum_taxable_total = sum_igst = sum_cgst = sum_sgst = sum_total = Decimal('0.00')
-        if table_data:
-            for d in table_data:
-                p = d['product']
-                writer.writerow([
-                    p.name, p.purchase_invoice_number or '-', p.company_gstin or '-', p.category or '', f"{p.gst}%", f"{p.igst}%", p.hsn_code or '', p.batch_number or '',
-                    d['quantity'], f"{p.unit_capacity} {p.measurement_type}" if p.unit_capacity else "-",
-                    f"{d['taxable_unit_amt']:.2f}", f"{d['taxable_total']:.2f}",
-                    f"{d['igst_amt']:.2f}", f"{d['cgst_amt']:.2f}", f"{d['sgst_amt']:.2f}", f"{d['total_amt']:.2f}"
-                ])
-                sum_taxable_total += d['taxable_total']
-                sum_igst += d['igst_amt']
-                sum_cgst += d['cgst_amt']
-                sum_sgst += d['sgst_amt']
-                sum_total += d['total_amt']
-        
-        writer.writerow([
-            'TOTAL', '', '', '', '', '', '', '', '', '', '',
-            f"{sum_taxable_total:.2f}", f"{sum_igst:.2f}", f"{sum_cgst:.2f}", f"{sum_sgst:.2f}", f"{sum_total:.2f}"
-        ])
-        writer.writerow([])
-
-    # Section 2: IGST TABLE
-    writer.writerow(["--- SECTION 2: IGST TABLE ---"])
-    writer.writerow([])
-    for rate in [5, 12, 18]:
-        writer.writerow([f"Table: {rate}% IGST"])
-        writer.writerow(headers)
-        table_data = [d for d in details if d['product'].igst == rate]
-        
-        sum_taxable_total = sum_igst = sum_cgst = sum_sgst = sum_total = Decimal('0.00')
-        if table_data:
-            for d in table_data:
-                p = d['product']
-                writer.writerow([
-                    p.name, p.purchase_invoice_number or '-', p.company_gstin or '-', p.category or '', f"{p.gst}%", f"{p.igst}%", p.hsn_code or '', p.batch_number or '',
-                    d['quantity'], f"{p.unit_capacity} {p.measurement_type}" if p.unit_capacity else "-",
-                    f"{d['taxable_unit_amt']:.2f}", f"{d['taxable_total']:.2f}",
-                    f"{d['igst_amt']:.2f}", f"{d['cgst_amt']:.2f}", f"{d['sgst_amt']:.2f}", f"{d['total_amt']:.2f}"
-                ])
-                sum_taxable_total += d['taxable_total']
-                sum_igst += d['igst_amt']
-                sum_cgst += d['cgst_amt']
-                sum_sgst += d['sgst_amt']
-                sum_total += d['total_amt']
-        
-        writer.writerow([
-            'TOTAL', '', '', '', '', '', '', '', '', '', '',
-            f"{sum_taxable_total:.2f}", f"{sum_igst:.2f}", f"{sum_cgst:.2f}", f"{sum_sgst:.2f}", f"{sum_total:.2f}"
-        ])
-        writer.writerow([])
-    return response
\ No newline at end of file
+
+def _export_purchase_csv(products, filename):
+    """Stream purchase data as CSV grouped by GST slabs (one pass over the product cursor)."""
+    details = _iter_purchase_report_data(
+        order_by_tax_table(products, 'category', 'name').iterator()
+    )
+    return stream_csv_response(
+        filename,
+        iter_tax_table_rows(
+            details,
+            headers=PURCHASE_EXPORT_HEADERS,
+            rates_of=lambda d: (d['product'].gst, d['product'].igst),
+            row_cells=_purchase_export_row,
+            total_fields=('taxable_total', 'igst_amt', 'cgst_amt', 'sgst_amt', 'total_amt'),
+            total_row=lambda kind, s: [
+                'TOTAL', '', '', '', '', '', '', '', '', '', '',
+                f"{s['taxable_total']:.2f}", f"{s['igst_amt']:.2f}", f"{s['cgst_amt']:.2f}",
+                f"{s['sgst_amt']:.2f}", f"{s['total_amt']:.2f}"
+            ],
+        ),
+        content_type='text/csv',
+    )